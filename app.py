@@ -1,17 +1,47 @@
 import os
 import json
-import re
 import time
 import base64
 import hashlib
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import streamlit as st
 import streamlit.components.v1 as components
 
+from asset_pipeline import BANNER_BOX, LOGO_BOX, AssetPipeline
+from catalog import Catalog, VenueIndex, venue_index_for
+from catalog_watcher import CatalogWatcher
+from llm_cache import LLMCache
+from llm_gateway import DEFAULT_MODEL, LLMGateway
+from planning import (
+    TEAM_OPTIONS,
+    PlanMemo,
+    PlanObjective,
+    add_travel_times_to_slots,
+    bachelorette_day_headline,
+    category_reservation_providers,
+    generate_html,
+    generate_ical,
+    get_recommended_cluster,
+    must_haves_from_votes,
+    parse_emails,
+    preferences_to_vibes,
+    reconcile_preferences,
+    static_day_description,
+    swap_alternatives,
+    team_label_from_key,
+    theme_summary,
+    time_to_minutes,
+    venue_booking_hint,
+    venues_json_path,
+)
+from trip_store import TripStore, open_trip_store
+
 
 # ----------------------------
 # Page config
@@ -394,19 +424,29 @@ BANNERS_BY_THEME = {
 }
 
 
+@st.cache_resource
+def get_asset_pipeline() -> AssetPipeline:
+    """
+    Process-wide image pipeline. When Streamlit static serving is on
+    (server.enableStaticServing), images are written to static/img/ and
+    referenced by URL instead of being inlined as base64 on every rerun.
+    """
+    static_dir = None
+    if st.get_option("server.enableStaticServing"):
+        static_dir = os.path.join(_APP_DIR, "static", "img")
+    return AssetPipeline(static_dir=static_dir)
+
+
 def _banner_src(path_or_url: str) -> str:
-    """Return a valid src for banner: base64 data URL if path exists, else treat as URL."""
+    """Return a valid src for banner: display-size image if path exists, else treat as URL."""
     if not path_or_url:
         return ""
     p = path_or_url.strip()
     if p.startswith(("http://", "https://")):
         return p
-    if os.path.isfile(p):
-        with open(p, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode()
-        ext = os.path.splitext(p)[1].lower()
-        mime = "image/jpeg" if ext in (".jpg", ".jpeg") else "image/png"
-        return f"data:{mime};base64,{b64}"
+    local = p if os.path.isfile(p) else os.path.join(_APP_DIR, p)
+    if os.path.isfile(local):
+        return get_asset_pipeline().src(local, BANNER_BOX) or ""
     return p
 
 
@@ -479,383 +519,74 @@ def safe_read_json(path: str) -> Any:
         return json.load(f)
 
 
-def normalize_venues(raw: Any) -> List[Dict[str, Any]]:
+@st.cache_resource
+def get_catalog_watcher(path: str) -> CatalogWatcher:
     """
-    Accepts venues.json in any of these shapes:
-      1) list[dict]
-      2) dict with "venues" key -> use raw["venues"] (e.g. {"venues": [...], "spring_training_teams": ...})
-      3) dict[str, dict] (like {"0": {...}, "1": {...}}) -> use values
-    Returns a clean list[dict].
-
-    Normalization rules:
-      - Only allow themes in ALLOWED_THEMES_RAW; drop others (e.g. legacy "bachelor").
-      - Map legacy theme label "WMPO" to internal key "wmpo".
-      - If a venue ends up with no themes, default it to all three themes.
-      - Convert legacy category "shopping" -> "activity" and ensure "shopping" is in vibes.
+    Process-wide catalog holder. Polls venues.json every
+    PLAYBOOK_CATALOG_POLL_SECS (default 2; 0 checks on every rerun instead)
+    and applies edits incrementally, so ops fixes go live without a restart.
     """
-    if raw is None:
-        return []
+    try:
+        poll_secs = float(os.getenv("PLAYBOOK_CATALOG_POLL_SECS", "") or 2.0)
+    except ValueError:
+        poll_secs = 2.0
+    return CatalogWatcher(path, poll_secs=poll_secs, live=True).start()
 
-    if isinstance(raw, list):
-        venues = raw
-    elif isinstance(raw, dict):
-        if "venues" in raw and isinstance(raw["venues"], list):
-            venues = raw["venues"]
-        else:
-            venues = list(raw.values())
-    else:
-        return []
 
-    # Themes as they may appear in the JSON.
-    ALLOWED_THEMES_RAW = {"spring_training", "bachelorette", "WMPO"}
-
-    cleaned: List[Dict[str, Any]] = []
-    for v in venues:
-        if not isinstance(v, dict):
-            continue
-
-        name = str(v.get("name", "")).strip()
-        category_raw = (v.get("category", "") or "").strip().lower()
-        if not name or not category_raw:
-            continue
-
-        # Start from raw vibes/themes.
-        vibes = [str(x).strip().lower() for x in (v.get("vibes") or [])]
-        raw_themes = [str(x).strip() for x in (v.get("themes") or [])]
-
-        # Normalize category: treat legacy "shopping" as an activity with a
-        # "shopping" vibe so it appears in the daytime activity pool.
-        if category_raw == "shopping":
-            category = "activity"
-            if "shopping" not in vibes:
-                vibes.append("shopping")
-        else:
-            category = category_raw
+def load_catalog() -> Catalog:
+    """The shared catalog for the current venues.json contents."""
+    path = venues_json_path()
+    if not path:
+        st.error("venues.json not found in the project folder.")
+        return Catalog([])
 
-        # Normalize / filter themes.
-        norm_themes: List[str] = []
-        for t in raw_themes:
-            if t not in ALLOWED_THEMES_RAW:
-                # Drop legacy labels like "bachelor" but do not fail.
-                continue
-            if t == "WMPO":
-                norm_themes.append("wmpo")
-            else:
-                norm_themes.append(t.lower())
-
-        # If there are no remaining themes, default to all three.
-        if not norm_themes:
-            norm_themes = ["spring_training", "bachelorette", "wmpo"]
-
-        v2 = {
-            "name": name,
-            "category": category,
-            "price_tier": v.get("price_tier", 0),
-            "vibes": vibes,
-            "themes": norm_themes,
-            "teams": [str(x).strip() for x in (v.get("teams") or [])],
-        }
-        if v.get("lat") is not None and v.get("lon") is not None:
-            try:
-                v2["lat"] = float(v["lat"])
-                v2["lon"] = float(v["lon"])
-            except (TypeError, ValueError):
-                pass
-        if v.get("area"):
-            v2["area"] = str(v["area"]).strip()
-        cleaned.append(v2)
+    watcher = get_catalog_watcher(path)
+    catalog = watcher.current()
+    if not catalog.venues:
+        st.error(watcher.last_error or "venues.json loaded, but no valid venues were found. Check the JSON structure.")
+    return catalog
 
-    return cleaned
 
+def load_venues() -> Tuple[Dict[str, Any], ...]:
+    return load_catalog().venues
 
-@st.cache_data(ttl=300)
-def load_venues() -> List[Dict[str, Any]]:
-    app_dir = os.path.dirname(os.path.abspath(__file__))
-    path = os.path.join(app_dir, "venues.json")
-    if not os.path.exists(path):
-        path = os.path.join(os.getcwd(), "venues.json")
-    if not os.path.exists(path):
-        st.error("venues.json not found in the project folder.")
-        return []
 
-    try:
-        raw = safe_read_json(path)
-    except (json.JSONDecodeError, OSError) as e:
-        st.error(f"Could not load venues.json: {e}")
-        return []
-    venues = normalize_venues(raw)
-    if not venues:
-        st.error("venues.json loaded, but no valid venues were found. Check the JSON structure.")
-    return venues
-
-
-def get_stripe_payment_link() -> str:
-    payment_link = (
-        st.secrets.get("stripe", {}).get("payment_link", "")
-        or os.getenv("PLAYBOOK_STRIPE_PAYMENT_LINK", "")
-    )
-    return payment_link.strip() if isinstance(payment_link, str) else ""
+def load_venue_index() -> VenueIndex:
+    """Shared posting-list index over the catalog."""
+    return load_catalog().index
 
 
-def category_reservation_providers(category: str, provider_name: str = "") -> str:
+@st.cache_resource
+def get_plan_memo() -> PlanMemo:
     """
-    Human-friendly hint for how bookings are handled.
-    
-    PlayBook handles all bookings via APIs (OpenTable, Resy, Ticketmaster, etc.),
-    so these messages indicate what PlayBook will book, not what the user needs to do.
+    Process-wide memo of built itineraries, keyed by catalog version and the
+    normalized request. Holds PLAYBOOK_PLAN_MEMO_SIZE plans (default 512).
     """
-    category = (category or "").lower()
-    name = (provider_name or "").strip().lower()
-
-    # Concerts, WMPO, stadium/arena/ballpark-style events -> tickets via PlayBook.
-    concert_keywords = (
-        "concert",
-        "birds nest",
-        "wm phoenix open",
-        "stadium",
-        "ballpark",
-        "arena",
-        "game",
-    )
-    if any(k in name for k in concert_keywords):
-        return "PlayBook will book tickets via Ticketmaster or event site"
-
-    # Golf-specific booking via PlayBook.
-    if category == "golf":
-        return "PlayBook will book tee times via GolfNow"
-
-    # Ball games that are categorized as baseball.
-    if category == "baseball":
-        return "PlayBook will book tickets via MLB or Ticketmaster"
-
-    # Topgolf / PopStroke / Puttshack and similar golf-entertainment venues.
-    if any(k in name for k in ("topgolf", "popstroke", "puttshack")):
-        return "PlayBook will handle reservations"
-
-    # Dining / brunch / nightlife (restaurants, bars, clubs).
-    if category in {"dining", "brunch", "nightlife"}:
-        return "PlayBook will book via OpenTable, Resy, or venue"
-
-    if category == "activity":
-        return "PlayBook will handle booking"
-    if category == "spa":
-        return "PlayBook will book via resort or spa site"
-    if category == "pool":
-        return "PlayBook will book resort or daybed reservation"
-    if category == "shopping":
-        return "PlayBook will coordinate shopping stops"
-    if category == "transport":
-        pretty_name = provider_name.strip() if provider_name else ""
-        if pretty_name:
-            return f"PlayBook will arrange {pretty_name}"
-        return "PlayBook will arrange transportation"
-    return ""
-
-
-def _bachelorette_ok_venue(v: Dict[str, Any]) -> bool:
-    if not isinstance(v, dict):
-        return False
-    name = (v.get("name") or "").lower()
-    vibes = [x.lower() for x in (v.get("vibes") or [])]
-    skip_names = (
-        "golf", "baseball", "popstroke", "topgolf", "puttshack", "stadium", "sloan",
-        "salt river", "talking stick", "hohokam", "diablo", "dback", "octane",
-        "dbat", "taroko", "baseballism"
-    )
-    if any(s in name for s in skip_names) or "golf" in vibes or "baseball" in vibes:
-        return False
-    return True
-
-
-def filter_venues(
-    venues: List[Dict[str, Any]],
-    theme: str,
-    vibes: List[str],
-    category: str,
-) -> List[Dict[str, Any]]:
-    theme = (theme or "").lower()
-    category = (category or "").lower()
-    vibes = [v.lower() for v in vibes]
-
-    active_aliases = {"active", "hiking", "gym", "outdoor", "fitness"}
-    party_aliases = {"party", "drinks", "dancing"}
-    out: List[Dict[str, Any]] = []
-    for v in venues:
-        if not isinstance(v, dict):
-            continue
-        if (v.get("category") or "").strip().lower() != category:
-            continue
-        # Brunch is valid across all themes; for other categories, only
-        # apply theme filtering when the venue has explicit themes set.
-        venue_themes = [str(x).strip().lower() for x in (v.get("themes") or [])]
-        if category != "brunch" and theme and venue_themes and theme not in venue_themes:
-            continue
-        vv = [x.lower() for x in (v.get("vibes") or [])]
-        if vibes:
-            def vibe_match(user_v: str, venue_vibes: List[str]) -> bool:
-                if user_v in venue_vibes:
-                    return True
-                if user_v == "active" and any(a in venue_vibes for a in active_aliases):
-                    return True
-                # Party should behave like "party + drinks + dancing"
-                if user_v == "party" and any(a in venue_vibes for a in party_aliases):
-                    return True
-                return False
-            if not any(vibe_match(uv, vv) for uv in vibes):
-                continue
-        out.append(v)
-
-    return out
-
-
-def pick_best(candidates: List[Dict[str, Any]], exclude_names: Optional[set] = None) -> Optional[Dict[str, Any]]:
-    if not candidates:
-        return None
-    exclude_names = exclude_names or set()
-    for v in candidates:
-        if v.get("name") not in exclude_names:
-            return v
-    return candidates[0]
-
-
-def pick_best_rotating(
-    candidates: List[Dict[str, Any]],
-    used_names: set,
-    day_index: int,
-    last_used_name: Optional[str] = None,
-) -> Optional[Dict[str, Any]]:
-    if not candidates:
-        return None
-    available = [v for v in candidates if v.get("name") not in used_names]
-    if available:
-        if last_used_name and len(available) > 1:
-            available = [v for v in available if v.get("name") != last_used_name] or available
-        return available[day_index % len(available)]
-    if last_used_name:
-        other = [v for v in candidates if v.get("name") != last_used_name]
-        if other:
-            return other[day_index % len(other)]
-    return candidates[day_index % len(candidates)]
-
-
-def _time_to_minutes(time_str: str) -> int:
-    if not time_str or not isinstance(time_str, str):
-        return 0
-    time_str = time_str.strip().upper()
     try:
-        parts = time_str.replace(".", "").split()
-        if len(parts) < 2:
-            return 0
-        hm = parts[0]
-        am_pm = parts[1] if len(parts) > 1 else ""
-        if ":" in hm:
-            h, m = hm.split(":", 1)
-            hour, minute = int(h.strip()), int(m.strip()[:2])
-        else:
-            hour, minute = int(hm[:2]), 0
-        if "PM" in am_pm and hour != 12:
-            hour += 12
-        elif "AM" in am_pm and hour == 12:
-            hour = 0
-        return hour * 60 + minute
-    except (ValueError, IndexError):
-        return 0
-
-
-def fmt_day(d: date) -> str:
-    if hasattr(d, "strftime"):
-        try:
-            return d.strftime("%a %b %-d")
-        except ValueError:
-            day_str = d.strftime("%d").lstrip("0") or "0"
-            return d.strftime(f"%a %b {day_str}")
-    return str(d)
-
-
-def generate_ical(itinerary: List[Dict[str, Any]]) -> str:
-    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//PlayBook//EN"]
-    for s in itinerary:
-        if s.get("venue") or s.get("type") == "Transportation":
-            day = s.get("day", "")
-            time_str = (s.get("time") or "12:00 PM").replace(".", "").strip()
-            try:
-                dt_str = f"{day} {time_str}"
-                dt_obj = datetime.strptime(dt_str, "%Y-%m-%d %I:%M %p")
-            except Exception:
-                dt_obj = datetime.strptime(day + " 12:00", "%Y-%m-%d %H:%M")
-            start = dt_obj.strftime("%Y%m%dT%H%M00")
-            end_dt = dt_obj + timedelta(hours=1)
-            end = end_dt.strftime("%Y%m%dT%H%M00")
-            v = s.get("venue") or {}
-            name = v.get("name", s.get("type", "Event"))
-            desc = s.get("type", "")
-            lines.append("BEGIN:VEVENT")
-            lines.append(f"DTSTART:{start}")
-            lines.append(f"DTEND:{end}")
-            lines.append(f"SUMMARY:{name} ({desc})")
-            lines.append("END:VEVENT")
-    lines.append("END:VCALENDAR")
-    return "\r\n".join(lines)
-
-
-def generate_html(itinerary: List[Dict[str, Any]], title: str = "PlayBook Plan", theme: str = "", day_descriptions: Optional[Dict[str, str]] = None) -> str:
-    by_day_iso: Dict[str, List[Dict]] = {}
-    for s in itinerary:
-        by_day_iso.setdefault(s.get("day", ""), []).append(s)
-    for slist in by_day_iso.values():
-        slist.sort(key=lambda x: (_time_to_minutes(x.get("time") or ""), x.get("type") or ""))
-    day_order = sorted(by_day_iso.keys())
-    total_days = len(day_order)
-    day_descriptions = day_descriptions or {}
+        max_entries = int(os.getenv("PLAYBOOK_PLAN_MEMO_SIZE", "") or 512)
+    except ValueError:
+        max_entries = 512
+    return PlanMemo(max_entries=max_entries)
 
-    rows = []
-    for day_index, day_iso in enumerate(day_order):
-        slots = by_day_iso[day_iso]
-        day_label = slots[0].get("day_label", day_iso) if slots else day_iso
-        is_arrival = day_index == 0
-        is_departure = day_index == total_days - 1
-        day_key = f"{theme}_{day_index}"
-        desc = day_descriptions.get(day_key)
 
-        if theme == "bachelorette":
-            headline, one_liner, _ = bachelorette_day_headline(day_index, is_arrival, is_departure, total_days)
-            desc = desc or one_liner
-            rows.append(f"<h2>{day_label} — <em>{headline}</em></h2>")
-        else:
-            if not desc and theme == "spring_training":
-                _, desc = _spring_training_day_headline(day_index, is_arrival, is_departure, total_days)
-            if not desc and theme == "wmpo":
-                _, desc = _wmpo_day_headline(day_index, is_arrival, is_departure, total_days)
-            rows.append(f"<h2>{day_label}</h2>")
-        if desc:
-            desc_html = (desc or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\n", "<br/>")
-            rows.append(f"<p class=\"day-intro\">{desc_html}</p>")
-
-        for s in slots:
-            v = s.get("venue") or {}
-            name = v.get("name", "—")
-            rows.append(f"<p><strong>{s.get('time', '')}</strong> {s.get('type', '')}: {name}</p>")
-    body = "\n".join(rows)
-    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title>
-<style>body{{font-family:sans-serif;max-width:640px;margin:2rem auto;padding:1rem;}} h1{{margin-bottom:0.5rem;}} h2{{margin-top:1.5rem;margin-bottom:0.25rem;}} .day-intro{{margin-top:0;margin-bottom:1rem;opacity:0.9;font-size:0.95rem;}} p{{margin:0.4rem 0;}}</style></head>
-<body><h1>{title}</h1>{body}</body></html>"""
+def plan_objective(
+    vibes: List[str], preferences: Optional[Dict[str, float]], budget_min: float, budget_max: float
+) -> Optional[PlanObjective]:
+    """
+    Beam-search objective when PLAYBOOK_SCHEDULER=beam (weighted by the
+    reconciled votes when there are any); None keeps the greedy scheduler.
+    """
+    if os.getenv("PLAYBOOK_SCHEDULER", "greedy").strip().lower() != "beam":
+        return None
+    return PlanObjective.for_trip(vibes, preferences, budget_min, budget_max)
 
 
-def parse_emails(text: str) -> List[str]:
-    if not text:
-        return []
-    parts = re.split(r"[,\n; ]+", text.strip())
-    emails = []
-    for p in parts:
-        if re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", p):
-            emails.append(p)
-    seen = set()
-    out = []
-    for e in emails:
-        if e not in seen:
-            seen.add(e)
-            out.append(e)
-    return out
+def get_stripe_payment_link() -> str:
+    payment_link = (
+        st.secrets.get("stripe", {}).get("payment_link", "")
+        or os.getenv("PLAYBOOK_STRIPE_PAYMENT_LINK", "")
+    )
+    return payment_link.strip() if isinstance(payment_link, str) else ""
 
 
 # ----------------------------
@@ -863,21 +594,6 @@ def parse_emails(text: str) -> List[str]:
 # ----------------------------
 _APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
-TEAM_OPTIONS = [
-    {"key": "dbacks", "label": "Diamondbacks", "logo": "assets/dbacks.png"},
-    {"key": "rockies", "label": "Rockies", "logo": "assets/rockies.png"},
-    {"key": "cubs", "label": "Cubs", "logo": "assets/cubs.png"},
-    {"key": "as", "label": "A's", "logo": "assets/as.png"},
-    {"key": "giants", "label": "SF Giants", "logo": "assets/giants.png"},
-]
-TEAM_KEY_TO_VENUE_NAMES = {
-    "dbacks": ["AZ Diamondbacks"],
-    "rockies": ["CO Rockies"],
-    "cubs": ["Chicago Cubs"],
-    "as": ["A's"],
-    "giants": ["SF Giants"],
-}
-
 
 # ----------------------------
 # Trip Management & Group Voting
@@ -895,25 +611,24 @@ def get_trips_dir() -> str:
     return trips_dir
 
 
+@st.cache_resource
+def get_trip_store() -> TripStore:
+    """
+    Process-wide trip repository shared by all sessions.
+    PLAYBOOK_TRIP_STORE=sqlite switches from per-trip JSON files (default)
+    to trips/trips.db; import existing trips with `python -m planning migrate-trips`.
+    """
+    return open_trip_store(os.getenv("PLAYBOOK_TRIP_STORE", "json"), get_trips_dir())
+
+
 def save_trip(trip_id: str, trip_data: Dict[str, Any]) -> None:
-    """Save trip data to a JSON file."""
-    trips_dir = get_trips_dir()
-    trip_file = os.path.join(trips_dir, f"{trip_id}.json")
-    with open(trip_file, "w", encoding="utf-8") as f:
-        json.dump(trip_data, f, indent=2, default=str)
+    """Save trip data to the configured trip store."""
+    get_trip_store().save(trip_id, trip_data)
 
 
 def load_trip(trip_id: str) -> Optional[Dict[str, Any]]:
-    """Load trip data from a JSON file."""
-    trips_dir = get_trips_dir()
-    trip_file = os.path.join(trips_dir, f"{trip_id}.json")
-    if not os.path.exists(trip_file):
-        return None
-    try:
-        with open(trip_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return None
+    """Load trip data from the configured trip store."""
+    return get_trip_store().load(trip_id)
 
 
 def create_trip(
@@ -951,134 +666,20 @@ def create_trip(
 
 def submit_vote(trip_id: str, voter_name: str, vibes: List[str], free_text: Optional[str] = None) -> bool:
     """Submit a vote for a trip. Returns True if successful."""
-    trip = load_trip(trip_id)
-    if not trip:
-        return False
-    
-    # Check if this voter already voted
-    existing_vote_idx = None
-    for idx, vote in enumerate(trip.get("votes", [])):
-        if vote.get("voter_name", "").strip().lower() == voter_name.strip().lower():
-            existing_vote_idx = idx
-            break
-    
     vote_data = {
         "voter_name": voter_name.strip(),
         "vibes": [v.lower().strip() for v in vibes],
         "free_text": free_text.strip() if free_text else None,
         "submitted_at": datetime.now().isoformat(),
     }
-    
-    if existing_vote_idx is not None:
-        trip["votes"][existing_vote_idx] = vote_data
-    else:
-        trip.setdefault("votes", []).append(vote_data)
-    
-    save_trip(trip_id, trip)
-    return True
+    # Locked read-modify-write: concurrent voters on the same share link
+    # can't overwrite each other's votes.
+    return get_trip_store().record_vote(trip_id, vote_data)
 
 
-def reconcile_preferences(votes: List[Dict[str, Any]], group_size: int) -> Dict[str, float]:
-    """
-    Reconcile group votes into a weighted preference profile.
-    Returns a dict mapping vibe names to weights (0.0 to 1.0).
-    """
-    if not votes:
-        return {}
-    
-    # Count votes per vibe
-    vibe_counts: Dict[str, int] = {}
-    total_voters = len(votes)
-    
-    for vote in votes:
-        vibes = vote.get("vibes", [])
-        for vibe in vibes:
-            vibe_counts[vibe] = vibe_counts.get(vibe, 0) + 1
-    
-    # Convert counts to weights (normalize by total voters)
-    # Also apply a boost for vibes that appear in multiple votes
-    reconciled: Dict[str, float] = {}
-    for vibe, count in vibe_counts.items():
-        # Base weight: percentage of voters who selected this vibe
-        base_weight = count / total_voters
-        
-        # Boost: if a vibe appears in many votes, it's more important
-        # This handles conflicts: if 70% vote "party" and 30% vote "relax",
-        # party gets 0.7 weight, relax gets 0.3 weight
-        reconciled[vibe] = min(1.0, base_weight * 1.2)  # Slight boost for consensus
-    
-    # Normalize so top vibes are more prominent
-    if reconciled:
-        max_weight = max(reconciled.values())
-        if max_weight > 0:
-            for vibe in reconciled:
-                reconciled[vibe] = reconciled[vibe] / max_weight
-    
-    return reconciled
-
-
-# Must-have keywords: free text phrase -> internal key
-MUST_HAVE_KEYWORDS: Dict[str, List[str]] = {
-    "pool": ["pool", "pool day", "must have pool"],
-    "spa": ["spa", "spa day", "must have spa"],
-    "nice_dinner": ["nice dinner", "fancy dinner", "one nice dinner", "upscale dinner", "fine dining"],
-    "golf": ["golf", "tee time", "round of golf"],
-    "baseball": ["baseball", "game", "spring training", "ball game"],
-    "brunch": ["brunch", "must have brunch"],
-}
-
-
-def extract_must_haves_from_text(text: Optional[str]) -> List[str]:
-    """
-    Extract must-have preferences from free text (e.g. "must have pool day", "we want spa").
-    Returns a list of normalized keys: pool, spa, nice_dinner, golf, baseball, brunch.
-    """
-    if not text or not str(text).strip():
-        return []
-    t = str(text).strip().lower()
-    found: List[str] = []
-    for key, phrases in MUST_HAVE_KEYWORDS.items():
-        if any(p in t for p in phrases):
-            found.append(key)
-    return found
-
-
-# Trip clusters: theme + area recommendations (e.g. "WMPO + North Scottsdale")
-TRIP_CLUSTERS = [
-    {"theme": "wmpo", "area": "North Scottsdale", "label": "WMPO + North Scottsdale"},
-    {"theme": "wmpo", "area": "Old Town", "label": "WMPO + Old Town"},
-    {"theme": "bachelorette", "area": "Old Town", "label": "Bachelorette + Old Town"},
-    {"theme": "bachelorette", "area": "North Scottsdale", "label": "Bachelorette + North Scottsdale"},
-    {"theme": "spring_training", "area": "Old Town", "label": "Spring Training + Old Town"},
-    {"theme": "spring_training", "area": "Talking Stick", "label": "Spring Training + Talking Stick"},
-]
-
-
-def get_recommended_cluster(theme: str, vibes: List[str], venues: List[Dict[str, Any]]) -> Optional[str]:
-    """
-    Recommend a trip cluster (theme + area) based on theme and vibes.
-    Uses venue counts per area for the theme; returns cluster label or None.
-    """
-    if not theme or not venues:
-        return None
-    theme_lower = (theme or "").lower()
-    area_counts: Dict[str, int] = {}
-    for v in venues:
-        if not isinstance(v, dict):
-            continue
-        if theme_lower not in [t.lower() for t in (v.get("themes") or [])]:
-            continue
-        area = (v.get("area") or "").strip()
-        if not area:
-            continue
-        area_counts[area] = area_counts.get(area, 0) + 1
-    if not area_counts:
-        return None
-    best_area = max(area_counts, key=area_counts.get)
-    for c in TRIP_CLUSTERS:
-        if c.get("theme", "").lower() == theme_lower and (c.get("area") or "").strip() == best_area:
-            return c.get("label")
-    return f"{theme.replace('_', ' ').title()} + {best_area}"
+def update_trip(trip_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+    """Set fields on a stored trip under the trip lock (keeps votes that arrived meanwhile)."""
+    return get_trip_store().update(trip_id, lambda trip: trip.update(fields))
 
 
 def get_must_haves_for_trip() -> List[str]:
@@ -1092,78 +693,7 @@ def get_must_haves_for_trip() -> List[str]:
     trip = load_trip(trip_id)
     if not trip:
         return []
-    votes = trip.get("votes", [])
-    all_keys: set = set()
-    for v in votes:
-        for key in extract_must_haves_from_text(v.get("free_text")):
-            all_keys.add(key)
-    return list(all_keys)
-
-
-def preferences_to_vibes(preferences: Dict[str, float], max_vibes: int = 3) -> List[str]:
-    """
-    Convert weighted preferences back to a list of vibes.
-    Takes top N vibes by weight.
-    """
-    if not preferences:
-        return []
-    
-    # Sort by weight (descending) and take top N
-    sorted_vibes = sorted(preferences.items(), key=lambda x: x[1], reverse=True)
-    return [vibe for vibe, weight in sorted_vibes[:max_vibes]]
-
-
-def compare_plans(plan_a: List[Dict[str, Any]], plan_b: List[Dict[str, Any]], venues: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """
-    Compare Plan A and Plan B to generate trade-off metrics.
-    Returns a dict with comparison data.
-    """
-    def get_venue_price_tier(slot: Dict[str, Any]) -> int:
-        venue = slot.get("venue") or {}
-        venue_name = venue.get("name", "")
-        if not venue_name:
-            return 0
-        for v in venues:
-            if v.get("name") == venue_name:
-                return v.get("price_tier", 0)
-        return 0
-    
-    def calculate_avg_price_tier(plan: List[Dict[str, Any]]) -> float:
-        price_tiers = [get_venue_price_tier(slot) for slot in plan if slot.get("venue")]
-        if not price_tiers:
-            return 0.0
-        return sum(price_tiers) / len(price_tiers)
-    
-    def count_venue_types(plan: List[Dict[str, Any]]) -> Dict[str, int]:
-        counts = {}
-        for slot in plan:
-            venue = slot.get("venue") or {}
-            category = venue.get("category", "")
-            if category:
-                counts[category] = counts.get(category, 0) + 1
-        return counts
-    
-    avg_tier_a = calculate_avg_price_tier(plan_a)
-    avg_tier_b = calculate_avg_price_tier(plan_b)
-    
-    venues_a = count_venue_types(plan_a)
-    venues_b = count_venue_types(plan_b)
-    
-    # Estimate budget difference (rough: higher price_tier = higher cost)
-    budget_diff_per_person = int((avg_tier_a - avg_tier_b) * 50)  # Rough estimate
-    
-    return {
-        "plan_a_avg_price_tier": round(avg_tier_a, 1),
-        "plan_b_avg_price_tier": round(avg_tier_b, 1),
-        "budget_difference_per_person": budget_diff_per_person,
-        "plan_a_label": "Premium Experience",
-        "plan_b_label": "Balanced & Value",
-        "key_differences": [
-            f"Plan A focuses on higher-end venues (avg tier {avg_tier_a:.1f})",
-            f"Plan B balances quality and value (avg tier {avg_tier_b:.1f})",
-            f"Estimated difference: ${abs(budget_diff_per_person)}/person" if budget_diff_per_person != 0 else "Similar budget impact",
-        ],
-    }
+    return must_haves_from_votes(trip.get("votes", []))
 
 
 def get_active_vibes() -> List[str]:
@@ -1258,521 +788,121 @@ def scroll_main_to_top_once(flag_key: str = "scroll_itinerary_to_top"):
         )
 
 
-# ----------------------------
-# Travel time (distance-based)
-# ----------------------------
-def _haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Distance between two points in miles (Haversine)."""
-    import math
-    R = 3959  # Earth radius in miles
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlam = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
-
-
-def _estimate_drive_minutes(miles: float) -> int:
-    """Rough drive time in minutes (~25 mph avg in metro area)."""
-    if miles <= 0:
-        return 0
-    mph = 25.0
-    return max(5, int(round((miles / mph) * 60)))
-
-
-def _venue_coords(venue: Optional[Dict[str, Any]]) -> Optional[Tuple[float, float]]:
-    """Return (lat, lon) if venue has coordinates."""
-    if not venue or not isinstance(venue, dict):
-        return None
-    lat, lon = venue.get("lat"), venue.get("lon")
-    if lat is not None and lon is not None:
-        try:
-            return (float(lat), float(lon))
-        except (TypeError, ValueError):
-            pass
-    return None
-
-
-def add_travel_times_to_slots(slots: List[Dict[str, Any]], venues: List[Dict[str, Any]]) -> None:
-    """Fill travel_minutes (and from/to names) on transport slots using venue lat/lon."""
-    name_to_venue: Dict[str, Dict[str, Any]] = {}
-    for v in venues:
-        if isinstance(v, dict) and v.get("name"):
-            name_to_venue[str(v["name"]).strip()] = v
-
-    for i, slot in enumerate(slots):
-        if "Transport" not in (slot.get("type") or ""):
-            continue
-        prev_slot = slots[i - 1] if i > 0 else None
-        next_slot = slots[i + 1] if i < len(slots) - 1 else None
-        prev_venue = (prev_slot or {}).get("venue") or {}
-        next_venue = (next_slot or {}).get("venue") or {}
-        prev_name = prev_venue.get("name") if isinstance(prev_venue, dict) else None
-        next_name = next_venue.get("name") if isinstance(next_venue, dict) else None
-
-        # Look up full venue for coords (slot venue may be minimal)
-        from_venue = name_to_venue.get(prev_name) if prev_name else prev_venue
-        to_venue = name_to_venue.get(next_name) if next_name else next_venue
-        from_coords = _venue_coords(from_venue)
-        to_coords = _venue_coords(to_venue)
-
-        if from_coords and to_coords:
-            miles = _haversine_miles(from_coords[0], from_coords[1], to_coords[0], to_coords[1])
-            slot["travel_minutes"] = _estimate_drive_minutes(miles)
-            slot["from_venue_name"] = prev_name
-            slot["to_venue_name"] = next_name
+DAY_DESCRIPTION_TIMEOUT_SECS = 8.0
+DAY_DESCRIPTION_MAX_WORKERS = 6
 
 
-# ----------------------------
-# Itinerary generation
-# ----------------------------
-def build_itinerary(
-    venues: List[Dict[str, Any]],
-    theme: str,
-    vibes: List[str],
-    arrival: date,
-    departure: date,
-    team: str,
-    variant: str = "balanced",  # "premium" or "balanced"
-    must_haves: Optional[List[str]] = None,  # from free text: pool, spa, nice_dinner, etc.
-) -> List[Dict[str, Any]]:
-    if departure <= arrival:
-        raise ValueError("Departure date must be after arrival date.")
-
-    days: List[date] = []
-    d = arrival
-    while d <= departure:
-        days.append(d)
-        d += timedelta(days=1)
-
-    brunch = filter_venues(venues, theme, vibes, "brunch")
-    dining = filter_venues(venues, theme, vibes, "dining")
-    nightlife = filter_venues(venues, theme, vibes, "nightlife")
-    activities = filter_venues(venues, theme, vibes, "activity")
-    transport = filter_venues(venues, theme, vibes, "transport")
-    shopping = filter_venues(venues, theme, vibes, "shopping")
-    
-    # Apply variant preference: premium prefers higher price_tier, balanced prefers mid-range
-    def apply_variant_preference(venue_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        if not venue_list or variant == "balanced":
-            return venue_list
-        # Premium: sort by price_tier descending (higher tier first)
-        # Balanced: keep original order (already filtered by vibes)
-        if variant == "premium":
-            return sorted(venue_list, key=lambda v: v.get("price_tier", 0), reverse=True)
-        return venue_list
-    
-    brunch = apply_variant_preference(brunch)
-    dining = apply_variant_preference(dining)
-    nightlife = apply_variant_preference(nightlife)
-    activities = apply_variant_preference(activities)
+def _openai_api_key() -> str:
+    return os.getenv("OPENAI_API_KEY") or (st.secrets.get("openai", {}) or {}).get("api_key", "")
 
-    team_venue_names = TEAM_KEY_TO_VENUE_NAMES.get(team, [])
-    baseball_venues = []
-    if theme == "spring_training":
-        for v in venues:
-            if not isinstance(v, dict) or (v.get("category") or "").lower() != "activity":
-                continue
-            if "baseball" not in (v.get("vibes") or []):
-                continue
-            if theme not in (v.get("themes") or []):
-                continue
-            if team_venue_names and not any(tn in (v.get("teams") or []) for tn in team_venue_names):
-                continue
-            baseball_venues.append(v)
-        if not baseball_venues:
-            baseball_venues = [
-                v for v in venues
-                if isinstance(v, dict)
-                and "baseball" in (v.get("vibes") or [])
-                and (v.get("category") or "").lower() == "activity"
-            ]
 
-    if not brunch:
-        brunch = [v for v in venues if v.get("category") == "brunch"]
-    if not dining:
-        dining = [v for v in venues if v.get("category") == "dining"]
-    if not nightlife:
-        nightlife = [v for v in venues if v.get("category") == "nightlife"]
-    if not transport:
-        transport = [v for v in venues if v.get("category") == "transport"]
-
-    slots: List[Dict[str, Any]] = []
-    slot_id = 0
-
-    used_brunch_names: set = set()
-    used_dining_names: set = set()
-    used_nightlife_names: set = set()
-    used_activity_names: set = set()
-    used_golf_names: set = set()
-    used_transport_names: set = set()
-
-    last_brunch_name: Optional[str] = None
-    last_dining_name: Optional[str] = None
-    last_nightlife_name: Optional[str] = None
-    last_activity_name: Optional[str] = None
-    last_golf_name: Optional[str] = None
-    last_transport_name: Optional[str] = None
-
-    # Simple, predictable rotation for transport recommendations so it
-    # doesn't always suggest "Party Bus".
-    transport_rotation = ["Lyft", "Uber", "Party Bus", "Private SUV"]
-    transport_index = 0
-
-    def next_transport_slot() -> Optional[Dict[str, Any]]:
-        nonlocal transport_index, last_transport_name
-        # If we ever want to return real transport venues from venues.json again,
-        # we can fall back to pick_best_rotating here.
-        if transport_rotation:
-            name = transport_rotation[transport_index % len(transport_rotation)]
-            transport_index += 1
-            last_transport_name = name
-            return {"name": name, "category": "transport"}
-        # Fallback to venue-based transport list (not expected for now)
-        v = pick_best_rotating(transport, used_transport_names, transport_index, last_used_name=last_transport_name)
-        if v:
-            used_transport_names.add(v.get("name"))
-            last_transport_name = v.get("name")
-        return v
-
-    def add_slot(day: date, time_label: str, slot_type: str, venue: Optional[Dict[str, Any]]):
-        nonlocal slot_id
-        slot_id += 1
-        slots.append(
-            {
-                "id": f"s{slot_id}",
-                "day": day.isoformat(),
-                "day_label": fmt_day(day),
-                "time": time_label,
-                "type": slot_type,
-                "venue": venue,
-            }
-        )
+@st.cache_resource
+def get_llm_gateway(api_key: str) -> LLMGateway:
+    """One pooled OpenAI client (timeouts + bounded retries) per API key, shared by all sessions."""
+    return LLMGateway.from_env(api_key)
 
-    full_days = days[1:-1] if len(days) > 2 else []
-    game_times_by_day = ["1:00 PM", "6:00 PM"]  # Day 2 = 1 PM, Day 3 = 6 PM
-
-    must_haves_set = set(must_haves or [])
-    placed_nice_dinner = False
-    placed_pool = False
-    placed_spa = False
-
-    for i, day in enumerate(days):
-        is_arrival_day = (day == arrival)
-        is_departure_day = (day == departure)
-        full_day_index = full_days.index(day) if day in full_days else -1
-
-        if is_arrival_day:
-            add_slot(day, "5:30 PM", "Welcome drinks at accommodations", {"name": "At your accommodations", "category": "welcome"})
-            # Must-have: one "nice dinner" from free text -> prefer high-tier dining
-            if "nice_dinner" in must_haves_set and not placed_nice_dinner:
-                high_tier_dining = [v for v in dining if (v.get("price_tier") or 0) >= 3]
-                dinner_venue = pick_best_rotating(high_tier_dining or dining, used_dining_names, i, last_used_name=last_dining_name)
-                if dinner_venue:
-                    placed_nice_dinner = True
-            else:
-                dinner_venue = pick_best_rotating(dining, used_dining_names, i, last_used_name=last_dining_name)
-            if dinner_venue:
-                used_dining_names.add(dinner_venue.get("name"))
-                last_dining_name = dinner_venue.get("name")
 
-            transport_venue = next_transport_slot()
+@st.cache_resource
+def get_llm_cache() -> LLMCache:
+    """Persistent LLM response cache shared across sessions (PLAYBOOK_LLM_CACHE overrides the path)."""
+    return LLMCache(os.getenv("PLAYBOOK_LLM_CACHE") or os.path.join(_APP_DIR, ".cache", "llm.db"))
 
-            add_slot(day, "6:00 PM", "Transportation", transport_venue)
-            add_slot(day, "7:30 PM", "Dinner", dinner_venue)
 
-            night_venue = pick_best_rotating(
-                nightlife, used_nightlife_names, i, last_used_name=last_nightlife_name
-            )
-            if night_venue:
-                used_nightlife_names.add(night_venue.get("name"))
-                last_nightlife_name = night_venue.get("name")
-            add_slot(day, "10:15 PM", "Nightlife", night_venue)
-
-            transport_venue2 = next_transport_slot()
-            add_slot(day, "11:30 PM", "Transportation", transport_venue2)
-            continue
-
-        if is_departure_day:
-            brunch_venue = pick_best_rotating(brunch, used_brunch_names, i, last_used_name=last_brunch_name)
-            if brunch_venue:
-                used_brunch_names.add(brunch_venue.get("name"))
-                last_brunch_name = brunch_venue.get("name")
-            add_slot(day, "9:00 AM", "Breakfast / Brunch", brunch_venue)
-
-            dep_transport = next_transport_slot()
-            add_slot(day, "10:30 AM", "Transportation (departure)", dep_transport)
-            continue
-
-        brunch_venue = pick_best_rotating(brunch, used_brunch_names, i, last_used_name=last_brunch_name)
-        if brunch_venue:
-            used_brunch_names.add(brunch_venue.get("name"))
-            last_brunch_name = brunch_venue.get("name")
-        add_slot(day, "10:00 AM", "Breakfast / Brunch", brunch_venue)
-
-        transport_am = next_transport_slot()
-        add_slot(day, "11:45 AM", "Transportation", transport_am)
-
-        if theme == "spring_training" and baseball_venues and 0 <= full_day_index < len(game_times_by_day):
-            game_time = game_times_by_day[full_day_index]
-            add_slot(day, game_time, "Baseball Game", pick_best(baseball_venues))
-        elif theme == "bachelorette":
-            spa_venues = [v for v in venues if isinstance(v, dict) and (v.get("category") or "").lower() == "spa" and theme in (v.get("themes") or [])]
-            pool_venues = [v for v in venues if isinstance(v, dict) and (v.get("category") or "").lower() == "pool" and theme in (v.get("themes") or [])]
-            shopping_venues = shopping
-            # Must-haves from free text: prefer pool or spa on one day if requested
-            if "pool" in must_haves_set and not placed_pool and pool_venues:
-                act_venue = pick_best(pool_venues, exclude_names=used_activity_names)
-                if act_venue:
-                    placed_pool = True
-                    used_activity_names.add(act_venue.get("name"))
-                    last_activity_name = act_venue.get("name")
-            elif "spa" in must_haves_set and not placed_spa and spa_venues:
-                act_venue = pick_best(spa_venues, exclude_names=used_activity_names)
-                if act_venue:
-                    placed_spa = True
-                    used_activity_names.add(act_venue.get("name"))
-                    last_activity_name = act_venue.get("name")
-            else:
-                act_venue = None
-            if not act_venue:
-                activity_venues = [v for v in (activities + pool_venues + shopping_venues) if isinstance(v, dict) and _bachelorette_ok_venue(v)]
-                if not activity_venues:
-                    activity_venues = [{"name": "Hiking", "category": "activity"}, {"name": "Pool Day", "category": "pool"}, {"name": "Shopping at Fashion Square Mall", "category": "shopping"}, {"name": "Rancher Hat Bar", "category": "activity"}]
-                act_venue = pick_best_rotating(activity_venues, used_activity_names, i, last_used_name=last_activity_name)
-            if act_venue:
-                used_activity_names.add(act_venue.get("name"))
-                last_activity_name = act_venue.get("name")
-            add_slot(day, "12:30 PM", "Activity", act_venue)
-        elif theme == "wmpo":
-            # WM Phoenix Open theme: ALWAYS prioritize the actual tournament day
-            # over golf entertainment venues like PopStroke/Topgolf.
-            def _name(vdict: Dict[str, Any]) -> str:
-                return str((vdict.get("name") or "")).lower()
-
-            activity_venues = [
-                v
-                for v in venues
-                if isinstance(v, dict)
-                and (v.get("category") or "").lower() == "activity"
-            ]
+def _day_description_prompts(theme: str, day_index: int, is_arrival: bool, is_departure: bool, total_days: int, draft: str) -> Tuple[str, str]:
+    theme_desc = "Spring Training baseball trip" if theme == "spring_training" else "WM Phoenix Open golf trip" if theme == "wmpo" else "bachelorette weekend"
+    system = f"You write exactly two short sentences (each under 25 words) describing this upcoming day of a Scottsdale {theme_desc}. No bullet points. Output only two sentences separated by a newline."
+    user = f"Day {day_index + 1} of {total_days}. Arrival: {is_arrival}, Departure: {is_departure}. Current draft: {draft}"
+    return system, user
 
-            # 1) True WM Phoenix Open tournament experiences (MUST come first).
-            tournament_venues = [
-                v for v in activity_venues if "wm phoenix open" in _name(v)
-            ]
 
-            # 2) Golf / golf-entertainment (Topgolf, PopStroke, Puttshack, etc.).
-            golf_entertainment = [
-                v
-                for v in activity_venues
-                if v not in tournament_venues
-                and (
-                    "golf" in (v.get("vibes") or [])
-                    or any(
-                        g in _name(v)
-                        for g in ("golf", "topgolf", "popstroke", "putt", "puttshack")
-                    )
-                )
-            ]
-
-            # CRITICAL: Always try tournament venues first, only fall back to
-            # golf entertainment if all tournament days are already used.
-            day_venue = None
-            if tournament_venues:
-                # Try to pick an unused tournament venue.
-                available_tournament = [
-                    v for v in tournament_venues if v.get("name") not in used_golf_names
-                ]
-                if available_tournament:
-                    day_venue = available_tournament[i % len(available_tournament)]
-                elif tournament_venues:
-                    # All tournament venues used, but still prefer tournament over golf entertainment.
-                    day_venue = tournament_venues[i % len(tournament_venues)]
-            
-            # Only if no tournament venues exist or all are exhausted, use golf entertainment.
-            if not day_venue and golf_entertainment:
-                day_venue = pick_best_rotating(
-                    golf_entertainment, used_golf_names, i, last_used_name=last_golf_name
-                )
-            
-            # Final fallback to generic activities.
-            if not day_venue:
-                day_venue = pick_best(activities)
-
-            if day_venue:
-                used_golf_names.add(day_venue.get("name"))
-                last_golf_name = day_venue.get("name")
-
-            is_tournament = "wm phoenix open" in _name(day_venue or {})
-            slot_label = (
-                "WM Phoenix Open — Tournament Day"
-                if is_tournament
-                else "Golf / WM Phoenix Open Day"
-            )
-            add_slot(day, "12:30 PM", slot_label, day_venue)
-        else:
-            add_slot(day, "12:30 PM", "Activity", pick_best(activities))
-
-        # Must-have: one "nice dinner" on a full day if not yet placed
-        if "nice_dinner" in must_haves_set and not placed_nice_dinner:
-            high_tier_dining = [v for v in dining if (v.get("price_tier") or 0) >= 3]
-            dinner_venue = pick_best_rotating(high_tier_dining or dining, used_dining_names, i, last_used_name=last_dining_name)
-            if dinner_venue:
-                placed_nice_dinner = True
-        else:
-            dinner_venue = pick_best_rotating(dining, used_dining_names, i, last_used_name=last_dining_name)
-        if dinner_venue:
-            used_dining_names.add(dinner_venue.get("name"))
-            last_dining_name = dinner_venue.get("name")
-        add_slot(day, "7:30 PM", "Dinner", dinner_venue)
-
-        night_venue = pick_best_rotating(nightlife, used_nightlife_names, i, last_used_name=last_nightlife_name)
-        if night_venue:
-            used_nightlife_names.add(night_venue.get("name"))
-            last_nightlife_name = night_venue.get("name")
-        add_slot(day, "10:15 PM", "Nightlife", night_venue)
-
-        transport_pm = next_transport_slot()
-        add_slot(day, "11:30 PM", "Transportation", transport_pm)
-
-    add_travel_times_to_slots(slots, venues)
-    return slots
+@dataclass
+class DayDescriptionBatch:
+    """Day descriptions for one render: text so far per day index, plus LLM calls still in flight."""
 
+    theme: str
+    out: Dict[int, str]
+    prompts: Dict[int, Tuple[str, str]]
+    futures: Dict[Any, int]
+    pool: Optional[ThreadPoolExecutor] = None
+    deadline: float = 0.0
 
-def bachelorette_day_headline(day_index: int, is_arrival: bool, is_departure: bool, total_days: int) -> Tuple[str, str, str]:
-    if is_arrival:
-        return (
-            "We're here — let's get this weekend started",
-            "Welcome drinks at the place, then we're hitting dinner and going out. The ultimate Scottsdale weekend starts now.",
-            "Your table and experience are ready for the squad.",
-        )
-    if is_departure:
-        return (
-            "One last brunch before we head out",
-            "Final brunch and one more photo op. Don't forget Old Town or a cactus pic on the way.",
-            "One last stop in Old Town or at a cactus garden if you have time.",
-        )
-    if day_index == 1:
-        return (
-            "Brunch, pool & bottle service",
-            "The full day: brunch, pool or cabana, then dinner and going out. This is what we came for.",
-            "Reserve cabana or glam ahead if you want the full vibe.",
-        )
-    if day_index >= 2:
-        return (
-            "Recovery & recharge — your pace",
-            "Spa or chill time, then dinner and nightlife. We can go hard or take it easy—your call.",
-            "Yoga by the pool, ATV, hot air balloon, or wine tasting—on the table if the squad wants it.",
-        )
-    return ("Your day in Scottsdale", "Brunch, activity, dinner, and nightlife—built for the ultimate weekend.", "")
-
-
-def _spring_training_day_headline(day_index: int, is_arrival: bool, is_departure: bool, total_days: int) -> Tuple[str, str]:
-    if is_arrival:
-        return ("Touchdown — let's go", "Welcome to Scottsdale. Check in, then dinner and a night out to start the trip.\nGet some rest — game day is tomorrow.")
-    if is_departure:
-        return ("One more brunch, then head out", "Final brunch and hit the road.\nSafe travels — see you next spring.")
-    if day_index == 1:
-        return ("Game day — early game", "Brunch, then head to the ballpark for a 1 PM game.\nAfter the game, dinner and nightlife.")
-    if day_index == 2:
-        return ("Game day — evening game", "Brunch and activity or rest during the day.\n6 PM game, then dinner and nightlife.")
-    return ("Spring Training in Scottsdale", "Brunch, baseball, dinner, and nightlife.\nFull day at the ballpark and around town.")
-
-
-def _wmpo_day_headline(day_index: int, is_arrival: bool, is_departure: bool, total_days: int) -> Tuple[str, str]:
-    if is_arrival:
-        return (
-            "Arrival — warm up",
-            "You’ll roll in, grab dinner, and get ready for golf and the tournament. Think of this as your warm‑up day before the WM Phoenix Open action.",
-        )
-    if is_departure:
-        return (
-            "Last round or brunch, then out",
-            "You’ll squeeze in one more round or brunch, then head out after an easy morning. Travel day, with one last Scottsdale stop if you want it.",
-        )
-    if day_index == 1:
-        return (
-            "Tournament day + Birds Nest",
-            "You’ll spend the day at the WM Phoenix Open with on-course food, drinks, cabanas, and party tents, then head to the Coors Light Birds Nest or another concert that night.",
-        )
-    if day_index == 2:
-        return (
-            "More WM Phoenix Open action",
-            "You’ll be back at the WM Phoenix Open or on the course all day with plenty of food and drinks on-site, then go out for a concert, Birds Nest, or Old Town afterward.",
-        )
-    return (
-        "Golf and Scottsdale",
-        "You’ll mix tee times or tournament time with dinners and nightlife around Scottsdale, keeping the WM Phoenix Open energy going.",
-    )
 
+def start_day_descriptions(theme: str, days: List[Tuple[int, bool, bool]], total_days: int) -> DayDescriptionBatch:
+    """
+    Begin describing every (day_index, is_arrival, is_departure) not in
+    st.session_state["day_descriptions"] yet. Each day starts with its
+    static headline, or the shared LLM cache's answer; the rest fan out on
+    a thread pool without blocking, to be collected by
+    finish_day_descriptions.
+    """
+    cache = st.session_state.setdefault("day_descriptions", {})
+    pending = [d for d in days if f"{theme}_{d[0]}" not in cache]
+    batch = DayDescriptionBatch(theme, {}, {}, {})
+    if not pending:
+        return batch
 
-def get_day_description(theme: str, day_index: int, is_arrival: bool, is_departure: bool, total_days: int, day_label: str) -> str:
-    day_key = f"{theme}_{day_index}"
-    cache = st.session_state.get("day_descriptions", {})
-    if day_key in cache:
-        return cache[day_key]
-
-    if theme == "bachelorette":
-        _, one_liner, _ = bachelorette_day_headline(day_index, is_arrival, is_departure, total_days)
-        out = one_liner
-    elif theme == "spring_training":
-        _, one_liner = _spring_training_day_headline(day_index, is_arrival, is_departure, total_days)
-        out = one_liner
-    elif theme == "wmpo":
-        _, one_liner = _wmpo_day_headline(day_index, is_arrival, is_departure, total_days)
-        out = one_liner
-    else:
-        out = "Your day in Scottsdale."
+    batch.out = {d[0]: static_day_description(theme, d[0], d[1], d[2], total_days) for d in pending}
 
-    api_key = os.getenv("OPENAI_API_KEY") or (st.secrets.get("openai", {}) or {}).get("api_key", "")
+    api_key = _openai_api_key()
     if api_key and theme in ("spring_training", "wmpo", "bachelorette"):
         try:
-            import openai
-            client = openai.OpenAI(api_key=api_key)
-            theme_desc = "Spring Training baseball trip" if theme == "spring_training" else "WM Phoenix Open golf trip" if theme == "wmpo" else "bachelorette weekend"
-            r = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": f"You write exactly two short sentences (each under 25 words) describing this upcoming day of a Scottsdale {theme_desc}. No bullet points. Output only two sentences separated by a newline."},
-                    {"role": "user", "content": f"Day {day_index + 1} of {total_days}. Arrival: {is_arrival}, Departure: {is_departure}. Current draft: {out}"},
-                ],
-                max_tokens=120,
-            )
-            llm_out = (r.choices[0].message.content or "").strip()
-            if llm_out:
-                out = llm_out
+            llm_cache = get_llm_cache()
+            for day_index, is_arrival, is_departure in pending:
+                system, user = _day_description_prompts(theme, day_index, is_arrival, is_departure, total_days, batch.out[day_index])
+                cached = llm_cache.get(DEFAULT_MODEL, system, user)
+                if cached:
+                    batch.out[day_index] = cached
+                else:
+                    batch.prompts[day_index] = (system, user)
+
+            if batch.prompts:
+                gateway = get_llm_gateway(api_key)
+                batch.pool = ThreadPoolExecutor(max_workers=min(DAY_DESCRIPTION_MAX_WORKERS, len(batch.prompts)))
+                batch.deadline = time.monotonic() + DAY_DESCRIPTION_TIMEOUT_SECS
+                batch.futures = {
+                    batch.pool.submit(gateway.chat, system, user, 120, read_timeout=DAY_DESCRIPTION_TIMEOUT_SECS): day_index
+                    for day_index, (system, user) in batch.prompts.items()
+                }
         except Exception:
             pass
+    return batch
 
-    st.session_state.setdefault("day_descriptions", {})[day_key] = out
-    return out
 
+def finish_day_descriptions(batch: DayDescriptionBatch, on_ready: Optional[Callable[[int, str], None]] = None) -> None:
+    """
+    Collect the batch's LLM descriptions as they arrive (calling
+    on_ready(day_index, text) for each), waiting at most until
+    DAY_DESCRIPTION_TIMEOUT_SECS after the batch started, then store every
+    day in st.session_state["day_descriptions"]. Any day that fails or
+    times out keeps its static headline.
+    """
+    if batch.futures:
+        try:
+            for fut in as_completed(batch.futures, timeout=max(0.0, batch.deadline - time.monotonic())):
+                try:
+                    llm_out = fut.result()
+                except Exception:
+                    continue
+                if llm_out:
+                    day_index = batch.futures[fut]
+                    batch.out[day_index] = llm_out
+                    get_llm_cache().put(DEFAULT_MODEL, *batch.prompts[day_index], llm_out)
+                    if on_ready is not None:
+                        on_ready(day_index, llm_out)
+        except FuturesTimeout:
+            pass
+        finally:
+            batch.pool.shutdown(wait=False, cancel_futures=True)
+            batch.futures = {}
 
-def theme_summary(theme: str, vibes: List[str], arrival: date, departure: date, team_label: str) -> str:
-    days = (departure - arrival).days + 1
-    vibe_txt = ", ".join([v.title() for v in vibes]) if vibes else "Balanced"
+    cache = st.session_state.setdefault("day_descriptions", {})
+    for day_index, text in batch.out.items():
+        cache[f"{batch.theme}_{day_index}"] = text
 
-    if theme == "spring_training":
-        return (
-            f"Your {days}-day Scottsdale trip will be a mix of a friends trip and baseball. Spring Training with {vibe_txt}, "
-            f"team: {team_label}. Games, dinners, and nightlife—confirm or swap any slot, then lock in tickets and reservations."
-        )
-    if theme == "bachelorette":
-        return (
-            f"Your {days}-day Scottsdale bachelorette will be planned for the ultimate weekend. "
-            f"Welcome drinks, brunch, pool, spa, dinner, and nightlife will all be lined up so you and the squad can focus on having the best time."
-        )
-    if theme == "wmpo":
-        return (
-            f"Your {days}-day Scottsdale trip will be built for the WM Phoenix Open—golf, watching golf, and going out. "
-            f"Tee times, dinners, and nightlife will be set up for the crew. Confirm or swap slots, then lock in reservations."
-        )
-    return (
-        f"Your {days}-day Scottsdale trip will be reserved and curated with {vibe_txt}. "
-        f"Confirm or swap any slot, then export and invite your group."
-    )
+
+def _day_description_html(text: str) -> str:
+    day_desc_html = (text or "").replace("\n", "<br/>")
+    return f"<p style='opacity:0.95; margin-top:-6px; margin-bottom:12px; font-size:15px;'>{day_desc_html}</p>"
 
 
 def _summary_system_prompt(theme: str) -> str:
@@ -1806,53 +936,50 @@ def _summary_system_prompt(theme: str) -> str:
     )
 
 
-def generate_enthusiastic_summary(base_summary: str, itinerary_by_day: str, theme: str = "") -> str:
-    api_key = os.getenv("OPENAI_API_KEY") or (st.secrets.get("openai", {}) or {}).get("api_key", "")
+def _summary_prompts(base_summary: str, itinerary_by_day: str, theme: str = "") -> Tuple[str, str]:
+    system = _summary_system_prompt(theme)
+    user = (
+        "Write the upcoming trip summary in the tone described. "
+        "Give 2–3 lines with the big highlights: golf, the baseball game (name the team), spa or pool party—using what’s actually in the itinerary.\n\n"
+        f"Base context: {base_summary}\n\nItinerary by day:\n{itinerary_by_day}"
+    )
+    return system, user
+
+
+def stream_enthusiastic_summary(base_summary: str, itinerary_by_day: str, theme: str = "") -> Iterator[str]:
+    """
+    Yield the trip summary as it grows (each value is the full text so far).
+    Cache hits, a missing key, and failures yield a single final value; the
+    last value yielded is always the text to keep (base_summary on failure).
+    """
+    api_key = _openai_api_key()
     if not api_key:
-        return base_summary
+        yield base_summary
+        return
+    system, user = _summary_prompts(base_summary, itinerary_by_day, theme)
+    llm_cache = get_llm_cache()
+    cached = llm_cache.get(DEFAULT_MODEL, system, user)
+    if cached:
+        yield cached
+        return
+
+    text = ""
     try:
-        import openai
-        client = openai.OpenAI(api_key=api_key)
-        system = _summary_system_prompt(theme)
-        user = (
-            "Write the upcoming trip summary in the tone described. "
-            "Give 2–3 lines with the big highlights: golf, the baseball game (name the team), spa or pool party—using what’s actually in the itinerary.\n\n"
-            f"Base context: {base_summary}\n\nItinerary by day:\n{itinerary_by_day}"
-        )
-        r = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            max_tokens=400,
-        )
-        text = (r.choices[0].message.content or "").strip()
-        return text if text else base_summary
+        for delta in get_llm_gateway(api_key).stream_chat(system, user, max_tokens=400):
+            text += delta
+            yield text
     except Exception:
-        return base_summary
+        yield base_summary
+        return
+    text = text.strip()
+    if text:
+        llm_cache.put(DEFAULT_MODEL, system, user, text)
+    yield text or base_summary
 
 
 # ----------------------------
 # UI helpers
 # ----------------------------
-def team_label_from_key(key: str) -> str:
-    for t in TEAM_OPTIONS:
-        if t["key"] == key:
-            return t["label"]
-    return key
-
-
-def _is_valid_image(path: str) -> bool:
-    try:
-        from PIL import Image
-        with Image.open(path) as img:
-            img.load()
-        return True
-    except Exception:
-        return False
-
-
 def render_team_picker():
     try:
         st.markdown('<div class="section-label">Teams</div>', unsafe_allow_html=True)
@@ -1867,12 +994,11 @@ def render_team_picker():
                 is_selected = st.session_state.team == t["key"]
                 
                 # --- LOGO & SQUEEZED BUTTON ---
-                if os.path.exists(logo_path) and _is_valid_image(logo_path):
-                    with open(logo_path, "rb") as f:
-                        b64 = base64.b64encode(f.read()).decode()
+                logo_src = get_asset_pipeline().src(logo_path, LOGO_BOX)
+                if logo_src:
                     st.markdown(
                         f'<div style="height: 65px; display: flex; justify-content: center; align-items: center; margin-bottom: 8px;">'
-                        f'<img src="data:image/png;base64,{b64}" style="max-height: 100%; max-width: 100%; object-fit: contain;">'
+                        f'<img src="{logo_src}" style="max-height: 100%; max-width: 100%; object-fit: contain;">'
                         f'</div>', 
                         unsafe_allow_html=True
                     )
@@ -1897,132 +1023,6 @@ def render_team_picker():
                     st.session_state.team = t["key"]
 
 
-def swap_alternatives(
-    venues: List[Dict[str, Any]],
-    theme: str,
-    vibes: List[str],
-    slot: Dict[str, Any],
-    k: int = 2,
-) -> List[Dict[str, Any]]:
-    venue = slot.get("venue") or {}
-    category = ""
-    slot_type = slot.get("type", "").lower()
-    if "breakfast" in slot_type or "brunch" in slot_type:
-        category = "brunch"
-    elif "dinner" in slot_type:
-        category = "dining"
-    elif "nightlife" in slot_type:
-        category = "nightlife"
-    elif "transport" in slot_type:
-        category = "transport"
-    else:
-        category = "activity"
-
-    # Special handling for WMPO tournament day swaps: include golf entertainment
-    # (PopStroke, Topgolf, Puttshack) and actual golf tee times as alternatives.
-    is_wmpo_tournament_swap = (
-        theme == "wmpo"
-        and ("wm phoenix open" in slot_type.lower() or "wm phoenix open" in str((venue.get("name") or "")).lower())
-    )
-
-    if is_wmpo_tournament_swap:
-        def _name(vdict: Dict[str, Any]) -> str:
-            return str((vdict.get("name") or "")).lower()
-
-        # Collect golf-related alternatives:
-        # 1) Golf entertainment venues (PopStroke, Topgolf, Puttshack)
-        golf_ent = [
-            v
-            for v in venues
-            if isinstance(v, dict)
-            and (v.get("category") or "").lower() == "activity"
-            and theme in (v.get("themes") or [])
-            and (
-                "golf" in (v.get("vibes") or [])
-                or any(
-                    g in _name(v)
-                    for g in ("topgolf", "popstroke", "putt", "puttshack")
-                )
-            )
-        ]
-
-        # 2) Actual golf courses (category "golf" or venues with golf tee time vibes)
-        golf_courses = [
-            v
-            for v in venues
-            if isinstance(v, dict)
-            and (
-                (v.get("category") or "").lower() == "golf"
-                or (
-                    (v.get("category") or "").lower() == "activity"
-                    and "golf" in (v.get("vibes") or [])
-                    and theme in (v.get("themes") or [])
-                    and not any(
-                        ent in _name(v)
-                        for ent in ("topgolf", "popstroke", "putt", "puttshack")
-                    )
-                )
-            )
-        ]
-
-        # Combine: golf entertainment first, then golf courses
-        cands = golf_ent + golf_courses
-        current_name = (venue.get("name") or "").strip()
-        exclude = {current_name} if current_name else set()
-
-        out = []
-        for v in cands:
-            if v.get("name") in exclude:
-                continue
-            out.append(v)
-            if len(out) >= k:
-                break
-
-        # If we still need more options, fall back to generic activity filtering
-        if len(out) < k:
-            fallback = filter_venues(venues, theme, vibes, "activity")
-            for v in fallback:
-                if v.get("name") in exclude or v in out:
-                    continue
-                out.append(v)
-                if len(out) >= k:
-                    break
-
-        return out
-
-    # Standard swap logic for non-WMPO tournament swaps
-    cands = filter_venues(venues, theme, vibes, category)
-    if theme == "bachelorette":
-        cands = [v for v in cands if _bachelorette_ok_venue(v)]
-    current_name = (venue.get("name") or "").strip()
-    exclude = {current_name} if current_name else set()
-
-    out = []
-    for v in cands:
-        if v.get("name") in exclude:
-            continue
-        out.append(v)
-        if len(out) >= k:
-            break
-
-    if len(out) < k:
-        all_in_category = [
-            v
-            for v in venues
-            if isinstance(v, dict)
-            and (v.get("category") or "").strip().lower() == category
-        ]
-        if theme == "bachelorette":
-            all_in_category = [v for v in all_in_category if _bachelorette_ok_venue(v)]
-        for v in all_in_category:
-            if v.get("name") in exclude or v in out:
-                continue
-            out.append(v)
-            if len(out) >= k:
-                break
-    return out
-
-
 def _dedupe_future_venue_occurrences(
     anchor_slot_id: str,
     chosen_venue: Dict[str, Any],
@@ -2039,6 +1039,10 @@ def _dedupe_future_venue_occurrences(
         if not chosen_name:
             return
 
+        # Resolve against the catalog lookup so a minimal slot dict still
+        # carries the real category.
+        chosen_venue = venue_index_for(venues).by_name(chosen_name) or chosen_venue
+
         # Don't dedupe transport suggestions – it's fine to see Lyft/Uber, etc.
         cat = (chosen_venue.get("category") or "").strip().lower()
         if cat == "transport":
@@ -2105,7 +1109,10 @@ def _render_one_slot(s: Dict[str, Any], venues: List[Dict[str, Any]], theme: str
     else:
         slot_category = vcat
 
-    providers = category_reservation_providers(slot_category, vname)
+    if is_skipped or not v.get("name"):
+        providers = category_reservation_providers(slot_category, vname)
+    else:
+        providers = venue_booking_hint(v, slot_category)
     travel_note = ""
     if (s.get("type") or "").startswith("Transport") and s.get("travel_minutes"):
         from_n = s.get("from_venue_name") or "previous stop"
@@ -2174,6 +1181,7 @@ def _render_one_slot(s: Dict[str, Any], venues: List[Dict[str, Any]], theme: str
                     st.session_state.theme,
                     st.session_state.vibes,
                 )
+                add_travel_times_to_slots(st.session_state.itinerary, venues)
 
         if c2:
             alts = swap_alternatives(venues, st.session_state.theme, st.session_state.vibes, s, k=2)
@@ -2212,14 +1220,22 @@ def _render_one_slot(s: Dict[str, Any], venues: List[Dict[str, Any]], theme: str
                         st.session_state.theme,
                         st.session_state.vibes,
                     )
+                    # Drive times around the swapped slot are stale; refresh them
+                    # from the catalog's travel matrix.
+                    add_travel_times_to_slots(st.session_state.itinerary, venues)
                 st.session_state.swap_choices[sid] = []
 
 
-def render_itinerary(venues: List[Dict[str, Any]]):
+def render_itinerary(venues: List[Dict[str, Any]]) -> Optional[Callable[[], None]]:
+    """
+    Draw the itinerary. Day descriptions still waiting on the LLM show their
+    draft; the returned callable waits for them and fills them in, so the
+    caller can run it after the rest of the page (and the summary stream).
+    """
     itin = st.session_state.itinerary
     if not itin:
         st.info("Choose theme, vibes, dates, group size, budget. Then click Generate Itinerary.")
-        return
+        return None
 
     theme = st.session_state.get("theme", "")
     arrival = st.session_state.get("arrival")
@@ -2240,15 +1256,26 @@ def render_itinerary(venues: List[Dict[str, Any]]):
     for s in itin:
         by_day_iso.setdefault(s["day"], []).append(s)
     for slist in by_day_iso.values():
-        slist.sort(key=lambda x: (_time_to_minutes(x.get("time") or ""), x.get("type") or ""))
+        slist.sort(key=lambda x: (time_to_minutes(x.get("time") or ""), x.get("type") or ""))
     day_order = sorted(by_day_iso.keys())
     total_days = len(day_order)
 
+    def _day_flags(day_index: int, day_iso: str) -> Tuple[int, bool, bool]:
+        is_arrival = (day_iso == arrival.isoformat()) if arrival else (day_index == 0)
+        is_departure = (day_iso == departure.isoformat()) if departure else (day_index == total_days - 1)
+        return day_index, is_arrival, is_departure
+
+    batch: Optional[DayDescriptionBatch] = None
+    desc_slots: Dict[int, Any] = {}
+    if theme != "bachelorette":
+        # Start every day's description up front (concurrently); nothing
+        # waits on the LLM until the returned callable runs.
+        batch = start_day_descriptions(theme, [_day_flags(i, d) for i, d in enumerate(day_order)], total_days)
+
     for day_index, day_iso in enumerate(day_order):
         slots = by_day_iso[day_iso]
         day_label = slots[0]["day_label"] if slots else day_iso
-        is_arrival = (day_iso == arrival.isoformat()) if arrival else (day_index == 0)
-        is_departure = (day_iso == departure.isoformat()) if departure else (day_index == total_days - 1)
+        _, is_arrival, is_departure = _day_flags(day_index, day_iso)
 
         if theme == "bachelorette":
             headline, one_liner, optional_tip = bachelorette_day_headline(day_index, is_arrival, is_departure, total_days)
@@ -2258,11 +1285,10 @@ def render_itinerary(venues: List[Dict[str, Any]]):
             if optional_tip:
                 st.caption(f"💡 {optional_tip}")
         else:
-            day_desc = get_day_description(theme, day_index, is_arrival, is_departure, total_days, day_label)
+            day_desc = batch.out.get(day_index) or st.session_state["day_descriptions"].get(f"{theme}_{day_index}", "")
             st.markdown(f"### {day_label}")
-            day_desc_html = (day_desc or "").replace("\n", "<br/>")
-            st.markdown(f"<p style='opacity:0.95; margin-top:-6px; margin-bottom:12px; font-size:15px;'>{day_desc_html}</p>", unsafe_allow_html=True)
-            st.session_state.setdefault("day_descriptions", {})[f"{theme}_{day_index}"] = day_desc
+            desc_slots[day_index] = st.empty()
+            desc_slots[day_index].markdown(_day_description_html(day_desc), unsafe_allow_html=True)
 
         for s in slots:
             def _make_slot_fragment(slot: Dict[str, Any], vens: List[Dict[str, Any]], th: str):
@@ -2281,12 +1307,36 @@ def render_itinerary(venues: List[Dict[str, Any]]):
             unsafe_allow_html=True,
         )
 
+    if batch is None:
+        return None
+    if not batch.futures:
+        finish_day_descriptions(batch)
+        return None
+
+    def fill_day(day_index: int, text: str) -> None:
+        desc_slots[day_index].markdown(_day_description_html(text), unsafe_allow_html=True)
+
+    return lambda: finish_day_descriptions(batch, on_ready=fill_day)
+
+
+def render_debug_sidebar() -> None:
+    """Process-wide cache stats in the sidebar, only when PLAYBOOK_DEBUG is set."""
+    if not os.getenv("PLAYBOOK_DEBUG"):
+        return
+    stats = get_plan_memo().stats()
+    with st.sidebar.expander("Debug: plan memo", expanded=False):
+        st.caption(
+            f"Hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits / {stats['misses']} misses), "
+            f"{stats['entries']} of {get_plan_memo().max_entries} plans cached"
+        )
+
 
 # ----------------------------
 # Main layout
 # ----------------------------
-venues = load_venues()
+venues = load_venue_index().venues
 theme = st.session_state.theme
+render_debug_sidebar()
 
 # Check for trip ID in URL query params (for voting links)
 query_params = st.query_params
@@ -2744,7 +1794,7 @@ if current_page == "welcome":
                             
                             # Store emails in trip data
                             trip["invited_emails"] = emails
-                            save_trip(trip_id, trip)
+                            update_trip(trip_id, invited_emails=emails)
                             
                             share_link = f"http://localhost:8502/?trip={trip_id}"
                             vote_count = len(trip.get("votes", []))
@@ -2823,46 +1873,39 @@ if current_page == "welcome":
                     
                     # Save reconciled preferences to trip
                     trip["reconciled_preferences"] = reconciled
-                    save_trip(trip_id, trip)
+                    update_trip(trip_id, reconciled_preferences=reconciled)
                     st.session_state.reconciled_preferences = reconciled
                     
                     # Generate Plan A (premium) and Plan B (balanced)
-                    must_haves = get_must_haves_for_trip()
-                    plan_a = build_itinerary(
-                        venues=venues,
-                        theme=st.session_state.theme,
-                        vibes=active_vibes,
-                        arrival=st.session_state.arrival,
-                        departure=st.session_state.departure,
-                        team=st.session_state.team,
-                        variant="premium",
-                        must_haves=must_haves,
-                    )
-                    
-                    plan_b = build_itinerary(
-                        venues=venues,
+                    built = get_plan_memo().plans(
+                        catalog=load_catalog(),
                         theme=st.session_state.theme,
                         vibes=active_vibes,
                         arrival=st.session_state.arrival,
                         departure=st.session_state.departure,
                         team=st.session_state.team,
-                        variant="balanced",
-                        must_haves=must_haves,
+                        variants=("premium", "balanced"),
+                        must_haves=get_must_haves_for_trip(),
+                        objective=plan_objective(
+                            active_vibes, reconciled, st.session_state.budget_min, st.session_state.budget_max
+                        ),
                     )
+                    plan_a = built["plans"]["premium"]
+                    plan_b = built["plans"]["balanced"]
                     
                     st.session_state.itinerary_plan_a = plan_a
                     st.session_state.itinerary_plan_b = plan_b
                     
-                    # Calculate comparison metrics
-                    st.session_state.plan_comparison = compare_plans(plan_a, plan_b, venues)
+                    # Comparison metrics
+                    st.session_state.plan_comparison = built["comparison"]
                     
                     # Default to Plan A
                     st.session_state.selected_plan = "A"
                     st.session_state.itinerary = plan_a
                 else:
                     # Solo organizer: generate single plan (backward compatible)
-                    st.session_state.itinerary = build_itinerary(
-                        venues=venues,
+                    st.session_state.itinerary = get_plan_memo().itinerary(
+                        catalog=load_catalog(),
                         theme=st.session_state.theme,
                         vibes=active_vibes,
                         arrival=st.session_state.arrival,
@@ -2870,6 +1913,9 @@ if current_page == "welcome":
                         team=st.session_state.team,
                         variant="balanced",
                         must_haves=get_must_haves_for_trip(),
+                        objective=plan_objective(
+                            active_vibes, None, st.session_state.budget_min, st.session_state.budget_max
+                        ),
                     )
                     st.session_state.selected_plan = None
                 
@@ -3180,35 +2226,32 @@ elif current_page == "vote_results":
                     group_size = trip.get("group_size", 6)
                     reconciled = reconcile_preferences(votes, group_size)
                     trip["reconciled_preferences"] = reconciled
-                    save_trip(trip_id, trip)
+                    update_trip(trip_id, reconciled_preferences=reconciled)
                     st.session_state.reconciled_preferences = reconciled
 
                     active_vibes = preferences_to_vibes(reconciled, max_vibes=3)
-                    must_haves = get_must_haves_for_trip()
-                    plan_a = build_itinerary(
-                        venues=venues,
-                        theme=trip.get("theme", st.session_state.theme),
-                        vibes=active_vibes,
-                        arrival=date.fromisoformat(trip.get("arrival", st.session_state.arrival.isoformat())),
-                        departure=date.fromisoformat(trip.get("departure", st.session_state.departure.isoformat())),
-                        team=trip.get("team", st.session_state.team),
-                        variant="premium",
-                        must_haves=must_haves,
-                    )
-                    plan_b = build_itinerary(
-                        venues=venues,
+                    built = get_plan_memo().plans(
+                        catalog=load_catalog(),
                         theme=trip.get("theme", st.session_state.theme),
                         vibes=active_vibes,
                         arrival=date.fromisoformat(trip.get("arrival", st.session_state.arrival.isoformat())),
                         departure=date.fromisoformat(trip.get("departure", st.session_state.departure.isoformat())),
                         team=trip.get("team", st.session_state.team),
-                        variant="balanced",
-                        must_haves=must_haves,
+                        variants=("premium", "balanced"),
+                        must_haves=get_must_haves_for_trip(),
+                        objective=plan_objective(
+                            active_vibes,
+                            reconciled,
+                            trip.get("budget_min", st.session_state.budget_min),
+                            trip.get("budget_max", st.session_state.budget_max),
+                        ),
                     )
+                    plan_a = built["plans"]["premium"]
+                    plan_b = built["plans"]["balanced"]
 
                     st.session_state.itinerary_plan_a = plan_a
                     st.session_state.itinerary_plan_b = plan_b
-                    st.session_state.plan_comparison = compare_plans(plan_a, plan_b, venues)
+                    st.session_state.plan_comparison = built["comparison"]
                     st.session_state.selected_plan = "A"
                     st.session_state.itinerary = plan_a
                     # Sync trip dates/theme/team to session in case we came from vote results only
@@ -3271,7 +2314,7 @@ elif current_page == "itinerary":
             st.markdown(
                 f'<div class="card" style="text-align:center; padding:20px;">'
                 f'<h3 style="margin:0 0 10px 0;">Plan A: {comparison.get("plan_a_label", "Premium Experience")}</h3>'
-                f'<p style="margin:0; opacity:0.9;">Higher-end venues<br/>Avg tier: {comparison.get("plan_a_avg_price_tier", "N/A")}</p>'
+                f'<p style="margin:0; opacity:0.9;">Higher-end venues<br/>Avg tier: {comparison.get("plan_a_avg_price_tier", "N/A")}<br/>Drive time: ~{comparison.get("plan_a_drive_minutes", "N/A")} min</p>'
                 f'</div>',
                 unsafe_allow_html=True,
             )
@@ -3279,7 +2322,7 @@ elif current_page == "itinerary":
             st.markdown(
                 f'<div class="card" style="text-align:center; padding:20px;">'
                 f'<h3 style="margin:0 0 10px 0;">Plan B: {comparison.get("plan_b_label", "Balanced & Value")}</h3>'
-                f'<p style="margin:0; opacity:0.9;">Balanced quality & value<br/>Avg tier: {comparison.get("plan_b_avg_price_tier", "N/A")}</p>'
+                f'<p style="margin:0; opacity:0.9;">Balanced quality & value<br/>Avg tier: {comparison.get("plan_b_avg_price_tier", "N/A")}<br/>Drive time: ~{comparison.get("plan_b_drive_minutes", "N/A")} min</p>'
                 f'</div>',
                 unsafe_allow_html=True,
             )
@@ -3330,6 +2373,10 @@ elif current_page == "itinerary":
         st.session_state.arrival, st.session_state.departure, team_lbl,
     )
 
+    # Paint the local summary now; the LLM version streams into this slot
+    # once the rest of the page has rendered, before waiting on any day
+    # descriptions still in flight.
+    summary_itinerary_by_day = None
     if st.session_state.itinerary and not st.session_state.get("enthusiastic_summary"):
         by_day: Dict[str, List[Dict]] = {}
         for s in st.session_state.itinerary:
@@ -3340,18 +2387,28 @@ elif current_page == "itinerary":
             day_label = slots[0].get("day_label", day_iso) if slots else day_iso
             parts = [f"{s.get('time', '')} {s.get('type', '')}: {(s.get('venue') or {}).get('name', 'TBD')}" for s in slots]
             lines.append(f"{day_label}: " + " | ".join(parts))
-        itinerary_by_day = "\n".join(lines)
-        st.session_state.enthusiastic_summary = generate_enthusiastic_summary(
-            base_summary, itinerary_by_day, theme=st.session_state.get("theme", "")
-        )
+        summary_itinerary_by_day = "\n".join(lines)
 
     display_summary = st.session_state.get("enthusiastic_summary") or base_summary
-    st.markdown(f"<div class='card'>{display_summary}</div>", unsafe_allow_html=True)
+    summary_slot = st.empty()
+    summary_slot.markdown(f"<div class='card'>{display_summary}</div>", unsafe_allow_html=True)
     st.markdown("")
 
+    # A full run waits on in-flight day descriptions only at the end of the
+    # page, after the summary has streamed; once it has, fragment reruns
+    # (which never reach the end of the page) finish their batch in place.
+    finish_descriptions: List[Callable[[], None]] = []
+    defer_descriptions = [True]
+
     @st.fragment
     def itinerary_slots_fragment():
-        render_itinerary(venues)
+        finish = render_itinerary(venues)
+        if finish is None:
+            return
+        if defer_descriptions[0]:
+            finish_descriptions.append(finish)
+        else:
+            finish()
 
     itinerary_slots_fragment()
 
@@ -3436,6 +2493,17 @@ payment_link = "https://buy.stripe.com/test_..." """,
     with inv_col:
         invite_fragment()
 
+    if summary_itinerary_by_day is not None:
+        final_summary = base_summary
+        for final_summary in stream_enthusiastic_summary(
+            base_summary, summary_itinerary_by_day, theme=st.session_state.get("theme", "")
+        ):
+            summary_slot.markdown(f"<div class='card'>{final_summary}</div>", unsafe_allow_html=True)
+        st.session_state.enthusiastic_summary = final_summary
+    defer_descriptions[0] = False
+    for finish in finish_descriptions:
+        finish()
+
 elif current_page == "confirmed":
     scroll_main_to_top_once("scroll_confirmed_to_top")
     render_page_banner(_banner_for_page(st.session_state.theme, "itinerary"), "Your confirmed trip")
@@ -3482,7 +2550,7 @@ elif current_page == "confirmed":
         for s in itin:
             by_day_iso.setdefault(s.get("day", ""), []).append(s)
         for slist in by_day_iso.values():
-            slist.sort(key=lambda x: (_time_to_minutes(x.get("time") or ""), x.get("type") or ""))
+            slist.sort(key=lambda x: (time_to_minutes(x.get("time") or ""), x.get("type") or ""))
         day_order = sorted(by_day_iso.keys())
         day_descriptions = st.session_state.get("day_descriptions", {})
 
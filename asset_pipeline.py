@@ -0,0 +1,151 @@
+import base64
+import hashlib
+import io
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+
+# Display boxes (width, height) at 2x for high-DPI screens.
+BANNER_BOX: Tuple[int, int] = (1600, 960)
+LOGO_BOX: Tuple[int, int] = (320, 130)
+
+_RAW_MIME = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+
+
+class AssetPipeline:
+    """
+    Validates, downscales and re-encodes local images once per file version.
+
+    Each image is opened with PIL (which doubles as the validity check),
+    shrunk to fit the display box, and re-encoded as WebP (PNG if this Pillow
+    build has no WebP). Results are memoized by (path, mtime, size, box), so
+    reruns reuse the small encoded bytes and an edited file is picked up on
+    the next render.
+
+    With static_dir set, encoded images are written there under a content
+    hash (computed once, when the image is encoded) and src() returns
+    static_url + filename instead of an inline data URI (pair it with
+    Streamlit's server.enableStaticServing, which serves <app dir>/static/
+    at app/static/).
+    """
+
+    def __init__(self, static_dir: Optional[str] = None, static_url: str = "app/static/img/", quality: int = 80):
+        self.static_dir = static_dir
+        self.static_url = static_url
+        self.quality = quality
+        self._memo: Dict[Tuple, Optional[Tuple[str, bytes, str]]] = {}
+        self._uris: Dict[Tuple, str] = {}
+        self._static: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+
+    def _encode(self, path: str, box: Tuple[int, int]) -> Optional[Tuple[str, bytes]]:
+        """(mime, bytes) for the display-size image, or None if it isn't a readable image."""
+        try:
+            from PIL import Image, features
+        except ImportError:
+            ext = os.path.splitext(path)[1].lower()
+            with open(path, "rb") as f:
+                return _RAW_MIME.get(ext, "image/png"), f.read()
+        try:
+            with Image.open(path) as img:
+                img.load()
+                original_size = img.size
+                img.thumbnail(box, Image.LANCZOS)
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+                buf = io.BytesIO()
+                if features.check("webp"):
+                    mime = "image/webp"
+                    img.save(buf, format="WEBP", quality=self.quality, method=4)
+                else:
+                    mime = "image/png"
+                    img.save(buf, format="PNG", optimize=True)
+                data = buf.getvalue()
+        except Exception:
+            return None
+        # Already display-size and smaller as-is: keep the original bytes.
+        ext = os.path.splitext(path)[1].lower()
+        if img.size == original_size and ext in _RAW_MIME and os.path.getsize(path) <= len(data):
+            with open(path, "rb") as f:
+                return _RAW_MIME[ext], f.read()
+        return mime, data
+
+    @staticmethod
+    def _key(path: str, box: Tuple[int, int]) -> Optional[Tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, box)
+
+    def _get(self, path: str, box: Tuple[int, int]) -> Optional[Tuple[str, bytes, str]]:
+        """(mime, bytes, static filename) for the display-size image, memoized per file version."""
+        key = self._key(path, box)
+        if key is None:
+            return None
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        encoded = self._encode(path, box)
+        entry = None
+        if encoded is not None:
+            mime, data = encoded
+            entry = (mime, data, f"{hashlib.sha1(data).hexdigest()[:16]}.{mime.split('/')[-1]}")
+        with self._lock:
+            # Drop entries for older versions of the same file/box.
+            for old in [k for k in self._memo if k[0] == key[0] and k[3] == box]:
+                del self._memo[old]
+                self._uris.pop(old, None)
+                self._static.pop(old, None)
+            self._memo[key] = entry
+        return entry
+
+    def data_uri(self, path: str, box: Tuple[int, int]) -> Optional[str]:
+        """Inline data: URI for the display-size image, or None if unreadable."""
+        encoded = self._get(path, box)
+        if encoded is None:
+            return None
+        key = self._key(path, box)
+        uri = self._uris.get(key)
+        if uri is None:
+            mime, data, _ = encoded
+            uri = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+            with self._lock:
+                if key in self._memo:
+                    self._uris[key] = uri
+        return uri
+
+    def static_src(self, path: str, box: Tuple[int, int]) -> Optional[str]:
+        """URL of the display-size image written under static_dir, or None."""
+        if not self.static_dir:
+            return None
+        encoded = self._get(path, box)
+        if encoded is None:
+            return None
+        key = self._key(path, box)
+        url = self._static.get(key)
+        if url is None:
+            _, data, name = encoded
+            out = os.path.join(self.static_dir, name)
+            if not os.path.exists(out):
+                os.makedirs(self.static_dir, exist_ok=True)
+                tmp = f"{out}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, out)
+            url = self.static_url + name
+            with self._lock:
+                if key in self._memo:
+                    self._static[key] = url
+        return url
+
+    def src(self, path: str, box: Tuple[int, int]) -> Optional[str]:
+        """Static URL when static serving is configured, else a data: URI."""
+        return self.static_src(path, box) or self.data_uri(path, box)
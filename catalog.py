@@ -0,0 +1,502 @@
+import bisect
+import hashlib
+import itertools
+import os
+import re
+import threading
+import weakref
+from collections.abc import Mapping
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from records import THEME_BITS, TEAM_BITS, VIBE_BITS, Venue, team_mask_of, theme_mask_of, vibe_mask_of
+from text_index import VenueTextIndex, text_index_for
+from travel_matrix import TravelMatrix, travel_matrix_for
+
+
+# User-facing vibes that also match a family of venue vibes.
+ACTIVE_ALIASES: FrozenSet[str] = frozenset({"active", "hiking", "gym", "outdoor", "fitness"})
+# Party should behave like "party + drinks + dancing".
+PARTY_ALIASES: FrozenSet[str] = frozenset({"party", "drinks", "dancing"})
+VIBE_ALIASES: Dict[str, FrozenSet[str]] = {
+    "active": ACTIVE_ALIASES,
+    "party": PARTY_ALIASES,
+}
+
+
+def venue_id_for_name(name: str) -> str:
+    """Stable slug id for venues that don't carry an explicit id in venues.json."""
+    slug = re.sub(r"[^a-z0-9]+", "-", (name or "").strip().lower()).strip("-")
+    return slug or "venue"
+
+
+# Bump when normalize_venues' output changes so stale catalog snapshots are rebuilt.
+NORMALIZE_VERSION = 1
+
+
+def raw_venue_records(raw: Any) -> List[Any]:
+    """The venue records of a parsed venues.json, whichever shape it uses (see normalize_venues)."""
+    if isinstance(raw, list):
+        return raw
+    if isinstance(raw, dict):
+        if "venues" in raw and isinstance(raw["venues"], list):
+            return raw["venues"]
+        return list(raw.values())
+    return []
+
+
+def normalize_venues(raw: Any) -> List[Dict[str, Any]]:
+    """
+    Accepts venues.json in any of these shapes:
+      1) list[dict]
+      2) dict with "venues" key -> use raw["venues"] (e.g. {"venues": [...], "spring_training_teams": ...})
+      3) dict[str, dict] (like {"0": {...}, "1": {...}}) -> use values
+    Returns a clean list[dict].
+
+    Normalization rules:
+      - Every venue gets an "id" (explicit id from the JSON, else a slug of the name).
+      - Only allow themes in ALLOWED_THEMES_RAW; drop others (e.g. legacy "bachelor").
+      - Map legacy theme label "WMPO" to internal key "wmpo".
+      - If a venue ends up with no themes, default it to all three themes.
+      - Convert legacy category "shopping" -> "activity" and ensure "shopping" is in vibes.
+    """
+    venues = raw_venue_records(raw)
+
+    # Themes as they may appear in the JSON.
+    ALLOWED_THEMES_RAW = {"spring_training", "bachelorette", "WMPO"}
+
+    cleaned: List[Dict[str, Any]] = []
+    for v in venues:
+        if not isinstance(v, dict):
+            continue
+
+        name = str(v.get("name", "")).strip()
+        category_raw = (v.get("category", "") or "").strip().lower()
+        if not name or not category_raw:
+            continue
+
+        # Start from raw vibes/themes.
+        vibes = [str(x).strip().lower() for x in (v.get("vibes") or [])]
+        raw_themes = [str(x).strip() for x in (v.get("themes") or [])]
+
+        # Normalize category: treat legacy "shopping" as an activity with a
+        # "shopping" vibe so it appears in the daytime activity pool.
+        if category_raw == "shopping":
+            category = "activity"
+            if "shopping" not in vibes:
+                vibes.append("shopping")
+        else:
+            category = category_raw
+
+        # Normalize / filter themes.
+        norm_themes: List[str] = []
+        for t in raw_themes:
+            if t not in ALLOWED_THEMES_RAW:
+                # Drop legacy labels like "bachelor" but do not fail.
+                continue
+            if t == "WMPO":
+                norm_themes.append("wmpo")
+            else:
+                norm_themes.append(t.lower())
+
+        # If there are no remaining themes, default to all three.
+        if not norm_themes:
+            norm_themes = ["spring_training", "bachelorette", "wmpo"]
+
+        v2 = {
+            "id": str(v.get("id") or "").strip() or venue_id_for_name(name),
+            "name": name,
+            "category": category,
+            "price_tier": v.get("price_tier", 0),
+            "vibes": vibes,
+            "themes": norm_themes,
+            "teams": [str(x).strip() for x in (v.get("teams") or [])],
+        }
+        if v.get("lat") is not None and v.get("lon") is not None:
+            try:
+                v2["lat"] = float(v["lat"])
+                v2["lon"] = float(v["lon"])
+            except (TypeError, ValueError):
+                pass
+        if v.get("area"):
+            v2["area"] = str(v["area"]).strip()
+        cleaned.append(v2)
+
+    return cleaned
+
+
+def freeze_venue(v: Dict[str, Any]) -> Venue:
+    return Venue.from_dict(v)
+
+
+# Alias groups as vibe masks; their bits are assigned up front so these stay constant.
+VIBE_ALIAS_MASKS: Dict[str, int] = {uv: VIBE_BITS.mask(sorted(aliases)) for uv, aliases in VIBE_ALIASES.items()}
+
+
+def query_vibe_mask(vibes: Iterable[str]) -> int:
+    """Mask matching any of the user's vibes, with the active/party aliases expanded."""
+    m = 0
+    for uv in vibes:
+        uv = uv.lower()
+        m |= VIBE_ALIAS_MASKS.get(uv) or VIBE_BITS.lookup((uv,))
+    return m
+
+
+_WORD = (1 << 64) - 1
+
+
+def _mask_array(masks: List[int], vocab_size: int) -> np.ndarray:
+    # Vocabularies past 64 terms no longer fit a machine word; numpy still
+    # vectorizes over Python ints, just more slowly.
+    return np.array(masks, dtype=np.uint64 if vocab_size <= 64 else object)
+
+
+def _hits(column: np.ndarray, mask: int) -> np.ndarray:
+    """Boolean column: which rows share at least one bit with mask."""
+    if column.dtype != object:
+        # Bits added to the vocabulary after the column was built can't be
+        # set on any of its rows.
+        mask &= _WORD
+    return (column & mask) != 0
+
+
+class _MaskColumns:
+    """Per-position category code and vibe/theme/team mask columns of a VenueIndex."""
+
+    __slots__ = ("codes", "category", "vibe", "theme", "team")
+
+    def __init__(self, venues: Sequence[Dict[str, Any]], by_category: Dict[str, Set[int]]):
+        self.codes: Dict[str, int] = {c: i for i, c in enumerate(by_category)}
+        n = len(venues)
+        self.category = np.full(n, -1, dtype=np.int32)
+        vibe, theme, team = [0] * n, [0] * n, [0] * n
+        for pos, v in enumerate(venues):
+            if not isinstance(v, Mapping):
+                continue
+            self.category[pos] = self.codes[(v.get("category") or "").strip().lower()]
+            vibe[pos], theme[pos], team[pos] = vibe_mask_of(v), theme_mask_of(v), team_mask_of(v)
+        self.vibe = _mask_array(vibe, len(VIBE_BITS))
+        self.theme = _mask_array(theme, len(THEME_BITS))
+        self.team = _mask_array(team, len(TEAM_BITS))
+
+
+class VenueIndex:
+    """
+    Lookups over a normalized venue list, built once per catalog.
+
+      - category -> positions (set and catalog-ordered list)
+      - name -> venue and id -> venue, used by plan comparison and travel-time
+        annotation (first occurrence wins)
+      - per-position category code and vibe/theme/team bitmask columns, so a
+        filter over the whole catalog is a handful of vectorized AND/compare
+        ops (see filter() and where())
+
+    Results are always returned in catalog order, which the itinerary
+    rotation depends on.
+    """
+
+    def __init__(self, venues: Sequence[Dict[str, Any]]):
+        self.venues = venues
+        self._by_category: Dict[str, Set[int]] = {}
+        self._category_order: Dict[str, List[int]] = {}
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._columns: Optional[_MaskColumns] = None
+        # ids of posting containers inherited from a parent index (see patched()).
+        self._shared: Optional[Set[int]] = None
+
+        for pos, v in enumerate(venues):
+            self._add(pos, v)
+        _INDEXES[id(venues)] = self
+
+    def _writable(self, table: Dict[str, Any], key: str, factory: Any) -> Any:
+        cur = table.get(key)
+        if cur is None or (self._shared is not None and id(cur) in self._shared):
+            cur = factory(cur or ())
+            table[key] = cur
+        return cur
+
+    def _add(self, pos: int, v: Dict[str, Any]) -> None:
+        if not isinstance(v, Mapping):
+            return
+        name = str(v.get("name") or "").strip()
+        if name:
+            self._by_name.setdefault(name, v)
+        if v.get("id"):
+            self._by_id.setdefault(str(v["id"]), v)
+        category = (v.get("category") or "").strip().lower()
+        self._writable(self._by_category, category, set).add(pos)
+        bisect.insort(self._writable(self._category_order, category, list), pos)
+
+    def _remove(self, pos: int, v: Dict[str, Any]) -> None:
+        if not isinstance(v, Mapping):
+            return
+        name = str(v.get("name") or "").strip()
+        if self._by_name.get(name) is v:
+            del self._by_name[name]
+        if v.get("id") and self._by_id.get(str(v["id"])) is v:
+            del self._by_id[str(v["id"])]
+        category = (v.get("category") or "").strip().lower()
+        self._writable(self._by_category, category, set).discard(pos)
+        order = self._writable(self._category_order, category, list)
+        if pos in order:
+            order.remove(pos)
+
+    def _renumber(self, remap: Dict[int, int]) -> None:
+        for key, postings in self._by_category.items():
+            self._by_category[key] = {remap[p] for p in postings if p in remap}
+        for key, order in self._category_order.items():
+            self._category_order[key] = [remap[p] for p in order if p in remap]
+        self._shared = set()
+
+    def patched(
+        self,
+        venues: Sequence[Dict[str, Any]],
+        dropped: Iterable[Tuple[int, Dict[str, Any]]],
+        added: Iterable[Tuple[int, Dict[str, Any]]],
+        remap: Optional[Dict[int, int]] = None,
+    ) -> "VenueIndex":
+        """
+        Index for ``venues`` derived from this one instead of rebuilt: entries
+        for ``dropped`` (old position, venue) pairs are removed, positions are
+        renumbered through ``remap`` (old -> new; None when no position moved),
+        then ``added`` (new position, venue) pairs are inserted. Mask columns
+        are rebuilt lazily from the venues' precomputed masks.
+
+        Containers are copied on first write, so this index, which sessions
+        holding the previous catalog may still be reading, is never mutated.
+        Assumes venue names are unique.
+        """
+        idx = VenueIndex.__new__(VenueIndex)
+        idx.venues = venues
+        idx._by_category = dict(self._by_category)
+        idx._category_order = dict(self._category_order)
+        idx._by_name = dict(self._by_name)
+        idx._by_id = dict(self._by_id)
+        idx._columns = None
+        idx._shared = {id(c) for table in (idx._by_category, idx._category_order) for c in table.values()}
+        for pos, v in dropped:
+            idx._remove(pos, v)
+        if remap is not None:
+            idx._renumber(remap)
+        for pos, v in sorted(added, key=lambda pv: pv[0]):
+            idx._add(pos, v)
+        idx._shared = None
+        _INDEXES[id(venues)] = idx
+        return idx
+
+    def __len__(self) -> int:
+        return len(self.venues)
+
+    def _cols(self) -> "_MaskColumns":
+        if self._columns is None:
+            self._columns = _MaskColumns(self.venues, self._by_category)
+        return self._columns
+
+    def by_name(self, name: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Catalog venue with this (stripped) name, or None."""
+        if not name:
+            return None
+        return self._by_name.get(str(name).strip())
+
+    def by_id(self, venue_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Catalog venue with this id, or None."""
+        if not venue_id:
+            return None
+        return self._by_id.get(str(venue_id))
+
+    def category(self, category: str) -> List[Dict[str, Any]]:
+        """All venues in a category, in catalog order."""
+        category = (category or "").lower()
+        return [self.venues[i] for i in self._category_order.get(category, [])]
+
+    def _select(self, sel: np.ndarray) -> List[Dict[str, Any]]:
+        return [self.venues[i] for i in np.flatnonzero(sel)]
+
+    def where(
+        self,
+        category: Optional[str] = None,
+        any_vibes: Optional[Iterable[str]] = None,
+        theme: Optional[str] = None,
+        any_teams: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Venues matching every given condition, in catalog order:
+          - category: exact (case-insensitive) category
+          - any_vibes: at least one of these venue vibes (no alias expansion)
+          - theme: the venue lists this theme
+          - any_teams: the venue lists at least one of these teams
+        """
+        cols = self._cols()
+        sel = np.ones(len(self.venues), dtype=bool)
+        if category is not None:
+            code = cols.codes.get(category.strip().lower())
+            if code is None:
+                return []
+            sel &= cols.category == code
+        if any_vibes is not None:
+            sel &= _hits(cols.vibe, VIBE_BITS.lookup(str(x).lower() for x in any_vibes))
+        if theme is not None:
+            sel &= _hits(cols.theme, THEME_BITS.lookup((theme.strip().lower(),)))
+        if any_teams is not None:
+            sel &= _hits(cols.team, TEAM_BITS.lookup(any_teams))
+        return self._select(sel)
+
+    def filter(self, theme: str, vibes: Iterable[str], category: str) -> List[Dict[str, Any]]:
+        """
+        Same semantics as the original linear filter:
+          - category must match exactly (case-insensitive)
+          - brunch is valid across all themes; other categories only apply the
+            theme filter when the venue has explicit themes
+          - at least one selected vibe must match (with active/party aliases)
+        """
+        theme = (theme or "").lower()
+        category = (category or "").lower()
+        vibes = list(vibes)
+
+        cols = self._cols()
+        code = cols.codes.get(category)
+        if code is None:
+            return []
+        sel = cols.category == code
+
+        if category != "brunch" and theme:
+            sel &= _hits(cols.theme, THEME_BITS.lookup((theme,))) | (cols.theme == 0)
+
+        if vibes:
+            sel &= _hits(cols.vibe, query_vibe_mask(vibes))
+
+        return self._select(sel)
+
+
+_INDEXES: "weakref.WeakValueDictionary[int, VenueIndex]" = weakref.WeakValueDictionary()
+
+
+def venue_index_for(venues: Sequence[Dict[str, Any]]) -> VenueIndex:
+    """
+    Return the index built for this exact venue list, building one if needed.
+
+    Lists are matched by identity: the cached catalog list reuses its index,
+    while ad-hoc lists (e.g. a pre-filtered pool) get a throwaway index.
+    """
+    idx: Optional[VenueIndex] = _INDEXES.get(id(venues))
+    if idx is not None and idx.venues is venues:
+        return idx
+    return VenueIndex(venues)
+
+
+_CATALOG_VERSIONS = itertools.count(1)
+
+
+class Catalog:
+    """
+    Immutable, process-wide venue catalog: frozen records plus their index.
+
+    content_hash is the sha256 of the venues.json bytes it was built from.
+    version is unique and increasing within the process, so downstream caches
+    can key on it; every reload (full or incremental) produces a new Catalog
+    while sessions keep sharing the previous one until their next rerun.
+    """
+
+    def __init__(self, venues: Iterable[Dict[str, Any]], content_hash: str = ""):
+        self.venues: Tuple[Venue, ...] = tuple(freeze_venue(v) for v in venues)
+        self.content_hash = content_hash
+        self.index = VenueIndex(self.venues)
+        self.version = next(_CATALOG_VERSIONS)
+        self._text_index: Optional[VenueTextIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.venues)
+
+    @property
+    def text_index(self) -> VenueTextIndex:
+        """Inverted token / n-gram index over the venues' search text, built on first use."""
+        if self._text_index is None:
+            self._text_index = text_index_for(self.venues)
+        return self._text_index
+
+    @property
+    def travel(self) -> Optional[TravelMatrix]:
+        """Drive-time matrix over the located venues, once CatalogWatcher has registered one for this version."""
+        return travel_matrix_for(self.venues)
+
+    def updated(self, venues: Iterable[Dict[str, Any]], content_hash: str) -> Tuple["Catalog", Dict[str, List[str]]]:
+        """
+        New catalog for ``venues`` diffed against this one by venue name.
+
+        Unchanged records keep their identity and only added, removed and
+        changed venues touch the index (VenueIndex.patched). Falls back to a
+        full rebuild when names aren't unique or surviving venues were
+        reordered. Returns (catalog, {"added", "removed", "changed": names}).
+        """
+        new = [freeze_venue(v) for v in venues]
+        old_pos = {v["name"]: i for i, v in enumerate(self.venues)}
+        new_names = [v["name"] for v in new]
+        new_name_set = set(new_names)
+        diff: Dict[str, List[str]] = {
+            "added": [n for n in new_names if n not in old_pos],
+            "removed": [n for n in old_pos if n not in new_name_set],
+            "changed": [],
+        }
+
+        survivors = [old_pos[n] for n in new_names if n in old_pos]
+        incremental = (
+            len(old_pos) == len(self.venues)
+            and len(new_name_set) == len(new_names)
+            and all(a < b for a, b in zip(survivors, survivors[1:]))
+        )
+
+        dropped: List[Tuple[int, Dict[str, Any]]] = [(old_pos[n], self.venues[old_pos[n]]) for n in diff["removed"]]
+        added: List[Tuple[int, Dict[str, Any]]] = []
+        remap: Dict[int, int] = {}
+        for pos, v in enumerate(new):
+            name = v["name"]
+            if name not in old_pos:
+                added.append((pos, v))
+                continue
+            prev = self.venues[old_pos[name]]
+            remap[old_pos[name]] = pos
+            if v is prev or v == prev:
+                new[pos] = prev
+            else:
+                diff["changed"].append(name)
+                dropped.append((old_pos[name], prev))
+                added.append((pos, v))
+
+        catalog = Catalog.__new__(Catalog)
+        catalog.venues = tuple(new)
+        catalog.content_hash = content_hash
+        if incremental:
+            moved = any(old != pos for old, pos in remap.items()) or bool(diff["removed"])
+            catalog.index = self.index.patched(catalog.venues, dropped, added, remap if moved else None)
+        else:
+            catalog.index = VenueIndex(catalog.venues)
+        catalog.version = next(_CATALOG_VERSIONS)
+        catalog._text_index = None
+        return catalog, diff
+
+
+_DIGESTS: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+_DIGESTS_LOCK = threading.Lock()
+
+
+def content_digest(path: str) -> str:
+    """
+    sha256 of a file's bytes. The digest is memoized per (inode, mtime, size)
+    so an unchanged file costs one stat() per call, not a full read.
+    """
+    st = os.stat(path)
+    stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+    with _DIGESTS_LOCK:
+        hit = _DIGESTS.get(path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _DIGESTS_LOCK:
+        _DIGESTS[path] = (stamp, digest)
+    return digest
@@ -0,0 +1,192 @@
+"""
+Pre-normalized binary catalog snapshot (venues.catalog.bin next to venues.json).
+
+Layout, little-endian, columnar so the loader never parses JSON or re-runs
+normalize_venues:
+
+    header    magic, format version, NORMALIZE_VERSION, sha256 of the source
+              venues.json, venue / string / list-item counts, blob size
+    strings   u32 offsets[n_strings + 1] + one UTF-8 blob; every name, id,
+              category, vibe, theme and team is stored once
+    items     u32 string ids backing the vibes / themes / teams lists
+    records   one fixed-size struct per venue (string ids, list spans,
+              flags, lat, lon)
+
+A snapshot is only used when its source hash, format version and
+NORMALIZE_VERSION all match; otherwise callers fall back to venues.json.
+
+build_snapshot also writes the catalog's TravelMatrix (venues.catalog.travel.npz),
+checked against the same source hash and the venue ids when loaded.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+from catalog import NORMALIZE_VERSION, content_digest, normalize_venues
+from records import Venue
+from travel_matrix import TravelMatrix, travel_path_for
+
+
+MAGIC = b"PBCATSNP"
+FORMAT_VERSION = 1
+SNAPSHOT_SUFFIX = ".catalog.bin"
+
+_HEADER = struct.Struct("<8sII32sIIII")
+# id, name, category, price_tier (JSON text), area, flags,
+# vibes start/len, themes start/len, teams start/len, lat, lon
+_RECORD = struct.Struct("<12I2d")
+_HAS_LATLON = 1
+_HAS_AREA = 2
+
+
+def snapshot_path_for(venues_path: str) -> str:
+    return os.path.splitext(venues_path)[0] + SNAPSHOT_SUFFIX
+
+
+def write_snapshot(venues: Sequence[Dict[str, Any]], out_path: str, source_hash: str) -> None:
+    """Write normalized venues to out_path atomically."""
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+    items: List[int] = []
+    spans: Dict[tuple, List[int]] = {}
+
+    def sid(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    def span(values: Sequence[Any]) -> List[int]:
+        # Identical lists (most venues share a theme/vibe combination) are stored once.
+        key = tuple(str(x) for x in values)
+        if key not in spans:
+            spans[key] = [len(items), len(key)]
+            items.extend(sid(x) for x in key)
+        return spans[key]
+
+    records = []
+    for v in venues:
+        flags = 0
+        lat = lon = 0.0
+        if "lat" in v and "lon" in v:
+            flags |= _HAS_LATLON
+            lat, lon = float(v["lat"]), float(v["lon"])
+        area = 0
+        if "area" in v:
+            flags |= _HAS_AREA
+            area = sid(v["area"])
+        records.append(_RECORD.pack(
+            sid(v["id"]), sid(v["name"]), sid(v["category"]),
+            sid(json.dumps(v.get("price_tier", 0))), area, flags,
+            *span(v.get("vibes") or ()), *span(v.get("themes") or ()), *span(v.get("teams") or ()),
+            lat, lon,
+        ))
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+    blob = b"".join(encoded)
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, NORMALIZE_VERSION, bytes.fromhex(source_hash),
+        len(records), len(strings), len(items), len(blob),
+    )
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(blob)
+        f.write(struct.pack(f"<{len(items)}I", *items))
+        f.writelines(records)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, out_path)
+
+
+def build_snapshot(venues_path: str, out_path: Optional[str] = None) -> str:
+    """Normalize venues_path and write its snapshot and travel matrix; returns the snapshot path."""
+    out_path = out_path or snapshot_path_for(venues_path)
+    with open(venues_path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    venues = normalize_venues(raw)
+    digest = content_digest(venues_path)
+    write_snapshot(venues, out_path, digest)
+    TravelMatrix.from_venues(venues).save(travel_path_for(out_path), digest)
+    return out_path
+
+
+def _decode(buf: memoryview, expected_hash: Optional[str]) -> Optional[List[Venue]]:
+    if len(buf) < _HEADER.size:
+        return None
+    magic, fmt, norm, source, n_venues, n_strings, n_items, blob_len = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or fmt != FORMAT_VERSION or norm != NORMALIZE_VERSION:
+        return None
+    if expected_hash is not None and source.hex() != expected_hash:
+        return None
+
+    pos = _HEADER.size
+    offsets = struct.unpack_from(f"<{n_strings + 1}I", buf, pos)
+    pos += 4 * (n_strings + 1)
+    blob = buf[pos:pos + blob_len]
+    pos += blob_len
+    strings = [sys.intern(str(blob[offsets[i]:offsets[i + 1]], "utf-8")) for i in range(n_strings)]
+    items = struct.unpack_from(f"<{n_items}I", buf, pos)
+    pos += 4 * n_items
+    if len(buf) != pos + n_venues * _RECORD.size:
+        return None
+
+    price_cache: Dict[int, Any] = {}
+    span_cache: Dict[tuple, tuple] = {}
+
+    def lst(start: int, n: int) -> tuple:
+        # Spans are deduplicated on write, so (start, n) identifies the list.
+        t = span_cache.get((start, n))
+        if t is None:
+            t = span_cache[(start, n)] = tuple([strings[i] for i in items[start:start + n]])
+        return t
+
+    venues: List[Venue] = []
+    for (vid, name, category, price, area, flags, vs, vn, ts, tn, ms, mn, lat, lon) in _RECORD.iter_unpack(buf[pos:]):
+        if price not in price_cache:
+            price_cache[price] = json.loads(strings[price])
+        v: Dict[str, Any] = {
+            "id": strings[vid],
+            "name": strings[name],
+            "category": strings[category],
+            "price_tier": price_cache[price],
+            "vibes": lst(vs, vn),
+            "themes": lst(ts, tn),
+            "teams": lst(ms, mn),
+        }
+        if flags & _HAS_LATLON:
+            v["lat"] = lat
+            v["lon"] = lon
+        if flags & _HAS_AREA:
+            v["area"] = strings[area]
+        venues.append(Venue(**v))
+    return venues
+
+
+def load_snapshot(path: str, expected_hash: Optional[str] = None) -> Optional[List[Venue]]:
+    """
+    Memory-map a snapshot and return its frozen venues, or None when the file
+    is missing, corrupt, from another format/normalizer version, or was built
+    from a different venues.json (expected_hash mismatch).
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                buf = memoryview(mm)
+                try:
+                    return _decode(buf, expected_hash)
+                finally:
+                    buf.release()
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        return None
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from catalog import Catalog, content_digest, normalize_venues, raw_venue_records
+from catalog_snapshot import load_snapshot, snapshot_path_for
+from records import Venue, register_venues
+from travel_matrix import TravelMatrix, register_travel_matrix, travel_path_for
+
+
+class CatalogWatcher:
+    """
+    Keeps the process-wide Catalog in sync with venues.json.
+
+    A daemon thread polls the file every poll_secs (poll_secs <= 0 means no
+    thread; check() runs on every current() call instead). When the content
+    hash changes, the new file is diffed against the previous raw records by
+    venue name: only added and changed records are normalized, unchanged ones
+    reuse their frozen venue, and the index is patched rather than rebuilt
+    (Catalog.updated). The travel matrix is built (or loaded next to the
+    snapshot) before the swap, which is a single attribute assignment, so
+    readers always see a complete catalog; each swap bumps catalog.version.
+
+    A file that fails to parse (e.g. mid-edit) keeps the current catalog and
+    is reported through last_error.
+
+    live=True marks the process's serving catalog: each swap registers its
+    venues by id (records.register_venues), which is what itinerary slots
+    resolve against. Other watchers (CLIs, benches) leave the registry
+    alone.
+    """
+
+    def __init__(self, path: str, poll_secs: float = 2.0, snapshot_path: Optional[str] = None, live: bool = False):
+        self.path = path
+        self.poll_secs = poll_secs
+        self.live = live
+        self.snapshot_path = snapshot_path or snapshot_path_for(path)
+        self.catalog = Catalog([])
+        self.last_error: Optional[str] = None
+        self.last_diff: Dict[str, List[str]] = {}
+        self._raw_by_name: Optional[Dict[str, Any]] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.check()
+
+    def start(self) -> "CatalogWatcher":
+        if self.poll_secs > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_secs):
+            try:
+                self.check()
+            except Exception as e:
+                self.last_error = f"Catalog reload failed: {e}"
+
+    def current(self) -> Catalog:
+        if self._thread is None:
+            self.check()
+        return self.catalog
+
+    def check(self) -> bool:
+        """Reload if venues.json changed since the last check; True if the catalog was swapped."""
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            self.last_error = f"Could not load venues.json: {e}"
+            return False
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return False
+        with self._lock:
+            if stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            digest = content_digest(self.path)
+            if digest == self.catalog.content_hash:
+                return False
+            return self._reload(digest)
+
+    def _reload(self, digest: str) -> bool:
+        if not self.catalog.venues and self._raw_by_name is None:
+            venues = load_snapshot(self.snapshot_path, expected_hash=digest)
+            if venues is not None:
+                catalog = Catalog(venues, content_hash=digest)
+                travel = TravelMatrix.load(travel_path_for(self.snapshot_path), catalog.venues, digest)
+                self.catalog = self._publish(catalog, travel)
+                self.last_error = None
+                return True
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            self.last_error = f"Could not load venues.json: {e}"
+            return False
+
+        previous = self._raw_by_name or {}
+        raw_by_name: Dict[str, Any] = {}
+        venues: List[Dict[str, Any]] = []
+        for r in raw_venue_records(raw):
+            if not isinstance(r, dict):
+                continue
+            name = str(r.get("name", "")).strip()
+            raw_by_name.setdefault(name, r)
+            kept: Optional[Venue] = None
+            if name in previous and previous[name] == r:
+                kept = self.catalog.index.by_name(name)
+            if kept is not None:
+                venues.append(kept)
+            else:
+                venues.extend(normalize_venues([r]))
+
+        if self.catalog.venues:
+            catalog, self.last_diff = self.catalog.updated(venues, digest)
+        else:
+            catalog = Catalog(venues, content_hash=digest)
+        self.catalog = self._publish(catalog)
+        self._raw_by_name = raw_by_name
+        self.last_error = None
+        return True
+
+    def _publish(self, catalog: Catalog, travel: Optional[TravelMatrix] = None) -> Catalog:
+        # Build the drive-time matrix here, on the reload path, before the
+        # catalog is swapped in, so no request ever pays for it.
+        if travel is None:
+            travel = TravelMatrix.from_venues(catalog.venues)
+        register_travel_matrix(catalog.venues, travel)
+        if self.live:
+            register_venues(catalog.venues)
+        return catalog
@@ -0,0 +1,47 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Pattern
+
+
+class KeywordMatcher:
+    """
+    One compiled regex over a label -> phrases table.
+
+    labels(text) finds every label with at least one phrase occurring in the
+    text (plain substring semantics, overlaps included) in a single regex
+    scan. Matching is case-insensitive.
+
+    The pattern is a zero-width lookahead over all phrases, longest first, so
+    it reports the longest phrase starting at every position. Any other
+    phrase starting there is a prefix of that one, so each phrase carries
+    the labels of all its prefixes in the table.
+    """
+
+    def __init__(self, table: Mapping[str, Iterable[str]]):
+        self.order: List[str] = list(table)
+        own: Dict[str, FrozenSet[str]] = {}
+        for label, phrases in table.items():
+            for phrase in phrases:
+                phrase = phrase.lower()
+                if phrase:
+                    own[phrase] = own.get(phrase, frozenset()) | {label}
+        self._labels: Dict[str, FrozenSet[str]] = {
+            phrase: frozenset().union(*(own[phrase[:i]] for i in range(1, len(phrase) + 1) if phrase[:i] in own))
+            for phrase in own
+        }
+        self._pattern: Optional[Pattern[str]] = None
+        if own:
+            alternation = "|".join(re.escape(p) for p in sorted(own, key=len, reverse=True))
+            self._pattern = re.compile(f"(?=({alternation}))")
+
+    def labels(self, text: str) -> FrozenSet[str]:
+        if self._pattern is None:
+            return frozenset()
+        found = set(self._pattern.findall(text.lower()))
+        if not found:
+            return frozenset()
+        return frozenset().union(*(self._labels[p] for p in found))
+
+    def ordered_labels(self, text: str) -> List[str]:
+        """labels(text) in table order."""
+        found = self.labels(text)
+        return [label for label in self.order if label in found]
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class LLMCache:
+    """
+    Disk-backed, content-addressed cache for LLM completions shared by every
+    session and process on the host.
+
+    Entries are keyed by sha256(model, system prompt, user prompt), so an
+    identical prompt (e.g. WMPO day 2 of a 5-day trip) is answered locally no
+    matter who asks. Entries expire after ttl_secs; once the table grows past
+    max_entries the least recently used rows are evicted. hits/misses count
+    lookups made through this instance.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        key TEXT PRIMARY KEY,
+        model TEXT,
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at);
+    """
+
+    def __init__(self, db_path: str, ttl_secs: float = 7 * 24 * 3600, max_entries: int = 5000):
+        self.db_path = db_path
+        self.ttl_secs = ttl_secs
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(model: str, system: str, user: str) -> str:
+        payload = json.dumps([model, system, user], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, system: str, user: str) -> Optional[str]:
+        key = self.key(model, system, user)
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_secs:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, model: str, system: str, user: str, response: str) -> None:
+        if not response:
+            return
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                (self.key(model, system, user), model, response, now, now),
+            )
+            self._evict(conn, now)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_secs,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        try:
+            (entries,) = self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        except sqlite3.Error:
+            entries = 0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": entries,
+        }
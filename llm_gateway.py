@@ -0,0 +1,158 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+class LLMGateway:
+    """
+    One pooled OpenAI client for the whole process.
+
+    The client (and its keep-alive HTTP connection pool) is built once and
+    reused by every call, with explicit connect/read timeouts so a slow
+    upstream can't hang the Streamlit script thread. Retries are ours, not the
+    SDK's: at most max_retries extra attempts, exponential backoff with full
+    jitter, and never past retry_budget_secs of total wall time.
+
+    base_url points the gateway at any OpenAI-compatible server, e.g. a local
+    stub for tests (PLAYBOOK_LLM_BASE_URL=http://127.0.0.1:8765/v1).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 20.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4.0,
+        retry_budget_secs: float = 30.0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url or None
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget_secs = retry_budget_secs
+        self._client: Any = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, api_key: str) -> "LLMGateway":
+        """Gateway configured from PLAYBOOK_LLM_* environment variables."""
+        return cls(
+            api_key=api_key,
+            base_url=os.getenv("PLAYBOOK_LLM_BASE_URL") or None,
+            connect_timeout=_env_float("PLAYBOOK_LLM_CONNECT_TIMEOUT", 3.0),
+            read_timeout=_env_float("PLAYBOOK_LLM_READ_TIMEOUT", 20.0),
+            max_retries=int(_env_float("PLAYBOOK_LLM_MAX_RETRIES", 2)),
+            retry_budget_secs=_env_float("PLAYBOOK_LLM_RETRY_BUDGET", 30.0),
+        )
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import openai
+
+                    self._client = openai.OpenAI(
+                        api_key=self.api_key,
+                        base_url=self.base_url,
+                        timeout=openai.Timeout(self.read_timeout, connect=self.connect_timeout),
+                        max_retries=0,
+                    )
+        return self._client
+
+    def _timeout(self, read_timeout: Optional[float]) -> Any:
+        import openai
+
+        return openai.Timeout(read_timeout or self.read_timeout, connect=self.connect_timeout)
+
+    def _is_retryable(self, exc: Exception) -> bool:
+        import openai
+
+        return isinstance(
+            exc,
+            (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError, openai.InternalServerError),
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0.0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _with_retries(self, call: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return call()
+            except Exception as exc:
+                if attempt >= self.max_retries or not self._is_retryable(exc):
+                    raise
+                delay = self._backoff(attempt)
+                if time.monotonic() - started + delay > self.retry_budget_secs:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    def _create(self, system: str, user: str, max_tokens: int, model: str, read_timeout: Optional[float], stream: bool) -> Any:
+        return self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            max_tokens=max_tokens,
+            timeout=self._timeout(read_timeout),
+            stream=stream,
+        )
+
+    def chat(
+        self,
+        system: str,
+        user: str,
+        max_tokens: int,
+        model: str = DEFAULT_MODEL,
+        read_timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Single chat completion; returns the stripped text ("" if empty).
+        Raises the last error once retries or the retry budget run out.
+        """
+        r = self._with_retries(lambda: self._create(system, user, max_tokens, model, read_timeout, stream=False))
+        return (r.choices[0].message.content or "").strip()
+
+    def stream_chat(
+        self,
+        system: str,
+        user: str,
+        max_tokens: int,
+        model: str = DEFAULT_MODEL,
+        read_timeout: Optional[float] = None,
+    ) -> Iterator[str]:
+        """
+        Streaming chat completion; yields content deltas as they arrive.
+        Retries only cover opening the stream; an error mid-stream is raised
+        to the caller, which already holds the partial text.
+        """
+        stream = self._with_retries(lambda: self._create(system, user, max_tokens, model, read_timeout, stream=True))
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
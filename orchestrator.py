@@ -1,5 +1,10 @@
 import json
-from typing import List, Dict, Any, Tuple
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from text_index import text_index_for, venue_search_text
 
 
 def load_venues(path: str = "venues.json") -> List[Dict[str, Any]]:
@@ -27,9 +32,15 @@ def filter_by_must_haves(venues: List[Dict[str, Any]], must_haves: List[str]) ->
     if not mh:
         return venues
 
+    # Tuples (the shared catalog) go through their cached inverted index;
+    # a one-off list is cheaper to scan than to index.
+    if isinstance(venues, tuple):
+        index = text_index_for(venues)
+        return index.venues_at(index.containing_any(mh))
+
     filtered = []
     for v in venues:
-        hay = f"{v.get('name','')} {v.get('category','')} {' '.join(v.get('vibes', []))} {' '.join(v.get('themes', []))}".lower()
+        hay = venue_search_text(v)
         if any(token in hay for token in mh):
             filtered.append(v)
     return filtered
@@ -73,22 +84,241 @@ def score_venue(
     return (vibe * w_vibe) + (theme_rel * w_theme) + (budget_friendliness * w_budget)
 
 
+class ScoringEngine:
+    """
+    Vectorized score_venue over a fixed venue list.
+
+    Built once per list:
+      - vibe column matrix (venues x longest vibe list): each venue's vibes
+        as vocabulary columns in list order, padded with a column whose
+        weight is always 0.0 (a repeated vibe scores twice, like in
+        _vibe_score)
+      - theme indicator matrix (venues x lowercased themes)
+      - budget-friendliness column from price_tier
+
+    A batch of vibe-weight profiles is then one gather-and-add per vibe
+    position, and top-k an argpartition. The vibe sums are accumulated in
+    the same order as _vibe_score (not as a matmul, which may reorder the
+    additions), so scores are bit-identical to score_venue even with
+    fractional weights, and ordering matches sorted(..., reverse=True)
+    over the scalar scores, ties in list order.
+    """
+
+    def __init__(self, venues: Sequence[Dict[str, Any]]):
+        self.venues = venues
+        self.vibes: Dict[str, int] = {}
+        self.themes: Dict[str, int] = {}
+        by_category: Dict[Any, List[int]] = {}
+        self.names_lower: List[str] = []
+        rows: List[List[int]] = []
+        theme_rows: List[List[int]] = []
+        for i, v in enumerate(venues):
+            by_category.setdefault(v.get("category"), []).append(i)
+            self.names_lower.append(v.get("name", "").lower())
+            rows.append([self.vibes.setdefault(x, len(self.vibes)) for x in v.get("vibes", [])])
+            theme_rows.append([self.themes.setdefault(t.lower(), len(self.themes)) for t in v.get("themes", [])])
+
+        n = len(venues)
+        self.by_category = {c: np.array(ix, dtype=np.intp) for c, ix in by_category.items()}
+        # Padding points at the extra last column of every profile vector, which stays 0.0.
+        self.vibe_cols = np.full((n, max((len(r) for r in rows), default=0)), len(self.vibes), dtype=np.intp)
+        self.theme_matrix = np.zeros((n, max(len(self.themes), 1)), dtype=np.float64)
+        for i, (cols, tcols) in enumerate(zip(rows, theme_rows)):
+            self.vibe_cols[i, : len(cols)] = cols
+            self.theme_matrix[i, tcols] = 1.0
+        price = np.array([float(v.get("price_tier", 3)) for v in venues], dtype=np.float64)
+        self.budget = np.maximum(0.0, (5.0 - price) / 4.0)
+
+    def _profile_vector(self, vibe_weights: Dict[str, float]) -> np.ndarray:
+        w = np.zeros(len(self.vibes) + 1, dtype=np.float64)
+        for vibe, col in self.vibes.items():
+            w[col] = float(vibe_weights.get(vibe, 0.0))
+        return w
+
+    def _theme_column(self, theme: str) -> np.ndarray:
+        col = self.themes.get(theme.lower()) if theme else None
+        if col is None:
+            return np.zeros(len(self.venues), dtype=np.float64)
+        return self.theme_matrix[:, col]
+
+    def scores(
+        self,
+        vibe_weights: Dict[str, float],
+        theme: str,
+        weights: Tuple[float, float, float] = (0.55, 0.35, 0.10),
+    ) -> np.ndarray:
+        """score_venue for every venue, as one array."""
+        return self.score_batch([vibe_weights], theme, weights)[0]
+
+    def score_batch(
+        self,
+        profiles: Sequence[Dict[str, float]],
+        theme: str,
+        weights: Tuple[float, float, float] = (0.55, 0.35, 0.10),
+    ) -> np.ndarray:
+        """Scores for several vibe-weight profiles at once: shape (profiles, venues)."""
+        w_vibe, w_theme, w_budget = weights
+        if not profiles:
+            return np.zeros((0, len(self.venues)), dtype=np.float64)
+        W = np.stack([self._profile_vector(p) for p in profiles])
+        # 0.0 + w[vibe 1] + w[vibe 2] + ..., left to right like _vibe_score;
+        # padded positions add an exact 0.0.
+        vibe = np.zeros((len(profiles), len(self.venues)), dtype=np.float64)
+        for j in range(self.vibe_cols.shape[1]):
+            vibe += W[:, self.vibe_cols[:, j]]
+        # Same association as score_venue, term by term.
+        return (vibe * w_vibe + self._theme_column(theme) * w_theme) + self.budget * w_budget
+
+    @staticmethod
+    def order(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+        """
+        Positions by descending score, ties in list order (what a stable
+        sorted(reverse=True) gives); only the best k when k is set.
+        """
+        n = len(scores)
+        if k is None or k >= n:
+            return np.argsort(-scores, kind="stable")
+        if k <= 0:
+            return np.zeros(0, dtype=np.intp)
+        kth = np.partition(scores, n - k)[n - k]
+        # Everything strictly above the k-th score, then ties at it in list order.
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: k - len(above)]
+        picked = np.concatenate([above, ties])
+        return picked[np.argsort(-scores[picked], kind="stable")]
+
+    def rank(
+        self,
+        vibe_weights: Dict[str, float],
+        theme: str,
+        weights: Tuple[float, float, float] = (0.55, 0.35, 0.10),
+        k: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Same output as rank_venues (copies with a "score" key); top k only when k is set."""
+        scores = self.scores(vibe_weights, theme, weights)
+        out = []
+        for i in self.order(scores, k):
+            v2 = dict(self.venues[i])
+            v2["score"] = float(scores[i])
+            out.append(v2)
+        return out
+
+
+# Most recently used engines for tuples, by id; the engine holds its tuple,
+# so the id can't be reused while the entry lives.
+_ENGINES: "OrderedDict[int, ScoringEngine]" = OrderedDict()
+_MAX_ENGINES = 4
+
+
+def scoring_engine_for(venues: Sequence[Dict[str, Any]]) -> ScoringEngine:
+    """
+    Engine for this venue list. Tuples (e.g. the shared catalog) can't change
+    underneath it, so their engines are kept in a small LRU; lists get a
+    fresh one per call.
+    """
+    if not isinstance(venues, tuple):
+        return ScoringEngine(venues)
+    engine = _ENGINES.get(id(venues))
+    if engine is not None and engine.venues is venues:
+        _ENGINES.move_to_end(id(venues))
+        return engine
+    engine = _ENGINES[id(venues)] = ScoringEngine(venues)
+    while len(_ENGINES) > _MAX_ENGINES:
+        _ENGINES.popitem(last=False)
+    return engine
+
+
+class RankedCatalog:
+    """
+    One ranking of a venue list, without copying venues.
+
+    Scores live in a parallel array; queries return venue positions (use
+    venue() / score(), or entries() for the rank_venues dict shape). Venues
+    are grouped by category once per list (ScoringEngine.by_category) and each
+    query partitions only the bucket it reads for its top k, so assembling an
+    itinerary never sorts or rescans the whole ranking. Order is the same as
+    rank_venues: by score, ties in list order.
+    """
+
+    def __init__(
+        self,
+        venues: Sequence[Dict[str, Any]],
+        vibe_weights: Dict[str, float],
+        theme: str,
+        weights: Tuple[float, float, float] = (0.55, 0.35, 0.10),
+    ):
+        self.engine = scoring_engine_for(venues)
+        self.venues = self.engine.venues
+        self.scores = self.engine.scores(vibe_weights, theme, weights)
+
+    def __len__(self) -> int:
+        return len(self.venues)
+
+    def venue(self, pos: int) -> Dict[str, Any]:
+        return self.venues[pos]
+
+    def score(self, pos: int) -> float:
+        return float(self.scores[pos])
+
+    def entries(self, positions: Sequence[int]) -> List[Dict[str, Any]]:
+        """Copies with a "score" key, as rank_venues returns them."""
+        out = []
+        for i in positions:
+            v2 = dict(self.venues[i])
+            v2["score"] = float(self.scores[i])
+            out.append(v2)
+        return out
+
+    def top(self, k: int, category: Any = None) -> List[int]:
+        """Best k positions overall, or within one category."""
+        if category is None:
+            return ScoringEngine.order(self.scores, k).tolist()
+        bucket = self.engine.by_category.get(category)
+        if bucket is None:
+            return []
+        return bucket[ScoringEngine.order(self.scores[bucket], k)].tolist()
+
+    def top_by_category(
+        self,
+        category_targets: List[str],
+        limit_per_category: int = 1,
+        max_total: int = 6,
+    ) -> List[int]:
+        """pick_top_by_category, as positions."""
+        picked: List[int] = []
+        for cat in category_targets:
+            picked.extend(self.top(limit_per_category, cat))
+            if len(picked) >= max_total:
+                break
+        return picked[:max_total]
+
+    def best_excluding(self, exclude_names: List[str], k: int = 5) -> List[int]:
+        """alternatives, as positions."""
+        if k <= 0:
+            return []
+        excl = {n.lower() for n in exclude_names}
+        names = self.engine.names_lower
+        # Each excluded name can knock out several venues (names aren't unique),
+        # so widen the window until k survive or the list runs out.
+        window = k + len(excl)
+        while True:
+            out = [i for i in self.top(window) if names[i] not in excl][:k]
+            if len(out) >= k or window >= len(self.venues):
+                return out
+            window *= 2
+
+
 def rank_venues(
     venues: List[Dict[str, Any]],
     vibe_weights: Dict[str, float],
     theme: str,
     weights: Tuple[float, float, float] = (0.55, 0.35, 0.10),
 ) -> List[Dict[str, Any]]:
-    scored = []
-    for v in venues:
-        v2 = dict(v)
-        v2["score"] = score_venue(v2, vibe_weights, theme, weights)
-        scored.append(v2)
-    return sorted(scored, key=lambda x: x["score"], reverse=True)
+    return scoring_engine_for(venues).rank(vibe_weights, theme, weights)
 
 
 def pick_top_by_category(
-    ranked: List[Dict[str, Any]],
+    ranked: Any,
     category_targets: List[str],
     limit_per_category: int = 1,
     max_total: int = 6,
@@ -96,18 +326,24 @@ def pick_top_by_category(
     """
     Build an itinerary by category order (ex: brunch, activity, dinner, nightlife, transport).
     Deterministic: take top N per category in order.
+    ranked is a rank_venues list or a RankedCatalog.
     """
+    if isinstance(ranked, RankedCatalog):
+        return ranked.entries(ranked.top_by_category(category_targets, limit_per_category, max_total))
+    by_cat: Dict[Any, List[Dict[str, Any]]] = {}
+    for v in ranked:
+        by_cat.setdefault(v.get("category"), []).append(v)
     picked = []
     for cat in category_targets:
-        cat_matches = [v for v in ranked if v.get("category") == cat]
-        picked.extend(cat_matches[:limit_per_category])
+        picked.extend(by_cat.get(cat, [])[:limit_per_category])
         if len(picked) >= max_total:
             break
     return picked[:max_total]
 
 
-def alternatives(ranked: List[Dict[str, Any]], exclude_names: List[str], k: int = 5) -> List[Dict[str, Any]]:
+def alternatives(ranked: Any, exclude_names: List[str], k: int = 5) -> List[Dict[str, Any]]:
+    if isinstance(ranked, RankedCatalog):
+        return ranked.entries(ranked.best_excluding(exclude_names, k))
     excl = set([n.lower() for n in exclude_names])
     alts = [v for v in ranked if v.get("name", "").lower() not in excl]
     return alts[:k]
-
@@ -0,0 +1,110 @@
+"""
+PlayBook planning engine, importable without Streamlit.
+
+    venue_tables venues.json location, teams, venue-name keyword labels,
+                 booking hints
+    filtering    theme/vibe/category filters and venue pickers
+    scheduling   build_itinerary / build_plans (greedy, or beam search
+                 against a PlanObjective), swap_alternatives, travel times,
+                 compare_plans
+    preferences  vote reconciliation, must-have extraction, trip clusters
+    exports      iCal / HTML exports, day headlines, trip summaries
+    memo         PlanMemo, a bounded process-wide cache of built itineraries
+
+app.py is the Streamlit UI on top of this package; workers and CLI tools
+(python -m planning) import it directly.
+
+The package builds on the top-level modules next to it (catalog, records,
+keywords, orchestrator, text_index, travel_matrix, venue_rules), so the repo root must
+be on sys.path: run from the project folder (as streamlit run app.py and
+python -m planning do) or set PYTHONPATH to it.
+"""
+
+from .venue_tables import (
+    TEAM_KEY_TO_VENUE_NAMES,
+    TEAM_OPTIONS,
+    category_reservation_providers,
+    team_label_from_key,
+    venue_booking_hint,
+    venue_labels,
+    venue_name_labels,
+    venues_json_path,
+)
+from .exports import (
+    bachelorette_day_headline,
+    generate_html,
+    generate_ical,
+    parse_emails,
+    static_day_description,
+    theme_summary,
+)
+from .filtering import bachelorette_ok_venue, filter_venues, pick_best, pick_best_rotating
+from .memo import PlanMemo
+from .preferences import (
+    MUST_HAVE_KEYWORDS,
+    TRIP_CLUSTERS,
+    extract_must_haves_from_text,
+    get_recommended_cluster,
+    must_haves_from_votes,
+    preferences_to_vibes,
+    reconcile_preferences,
+)
+from .scheduling import (
+    CandidatePools,
+    PlanObjective,
+    add_travel_times_to_slots,
+    build_itinerary,
+    build_plans,
+    candidate_pools,
+    compare_plans,
+    evaluate_plan,
+    fmt_day,
+    swap_alternatives,
+    time_to_minutes,
+)
+
+__all__ = [
+    # venue_tables
+    "TEAM_KEY_TO_VENUE_NAMES",
+    "TEAM_OPTIONS",
+    "category_reservation_providers",
+    "team_label_from_key",
+    "venue_booking_hint",
+    "venue_labels",
+    "venue_name_labels",
+    "venues_json_path",
+    # filtering
+    "bachelorette_ok_venue",
+    "filter_venues",
+    "pick_best",
+    "pick_best_rotating",
+    # scheduling
+    "CandidatePools",
+    "PlanObjective",
+    "add_travel_times_to_slots",
+    "build_itinerary",
+    "build_plans",
+    "candidate_pools",
+    "compare_plans",
+    "evaluate_plan",
+    "fmt_day",
+    "swap_alternatives",
+    "time_to_minutes",
+    # preferences
+    "MUST_HAVE_KEYWORDS",
+    "TRIP_CLUSTERS",
+    "extract_must_haves_from_text",
+    "get_recommended_cluster",
+    "must_haves_from_votes",
+    "preferences_to_vibes",
+    "reconcile_preferences",
+    # exports
+    "bachelorette_day_headline",
+    "generate_html",
+    "generate_ical",
+    "parse_emails",
+    "static_day_description",
+    "theme_summary",
+    # memo
+    "PlanMemo",
+]
@@ -0,0 +1,495 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+
+from asset_pipeline import BANNER_BOX, AssetPipeline
+from catalog import Catalog, content_digest, normalize_venues, raw_venue_records
+from catalog_snapshot import build_snapshot, load_snapshot
+from catalog_watcher import CatalogWatcher
+from orchestrator import RankedCatalog, ScoringEngine, alternatives, load_venues, pick_top_by_category, score_venue, scoring_engine_for
+from records import Venue
+from travel_matrix import (
+    TRAVEL_SUFFIX,
+    TravelMatrix,
+    drive_minutes,
+    drive_minutes_between,
+    haversine_miles,
+    travel_path_for,
+)
+from trip_store import SQLITE_DB_NAME, migrate_json_to_sqlite
+
+from . import PlanMemo, PlanObjective, build_itinerary, build_plans, compare_plans, evaluate_plan, venues_json_path
+from .preferences import reconcile_preferences
+
+_PROBE = (
+    "import sys, time\n"
+    "t0 = time.perf_counter()\n"
+    "import planning\n"
+    "print((time.perf_counter() - t0) * 1000, 'streamlit' in sys.modules)\n"
+)
+
+
+def _import_time(runs: int) -> None:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _PROBE], cwd=root, capture_output=True, text=True, check=True)
+        ms, streamlit_loaded = out.stdout.split()
+        if streamlit_loaded != "False":
+            raise SystemExit("importing planning pulled in streamlit")
+        times.append(float(ms))
+    print(f"import planning: median {statistics.median(times):.1f} ms, min {min(times):.1f} ms over {runs} runs (no streamlit)")
+
+
+def _load_catalog(path: str) -> Catalog:
+    path = path or venues_json_path()
+    if not path:
+        raise SystemExit("venues.json not found")
+    # Load it the way the app does, so the travel matrix is registered.
+    return CatalogWatcher(path, poll_secs=0).catalog
+
+
+def _plans_check(args: argparse.Namespace) -> None:
+    catalog = _load_catalog(args.venues)
+    venues = catalog.venues
+    arrival = date(2026, 3, 5)
+    cases = [
+        (theme, vibes, arrival + timedelta(days=nights), team, must_haves)
+        for theme in ("spring_training", "bachelorette", "wmpo", "other")
+        for vibes in ([], ["party"], ["golf", "party"], ["relax", "foodie"])
+        for nights in (1, 3, 6)
+        for team in ("cubs", "giants")
+        for must_haves in ([], ["pool", "nice_dinner"], ["spa"])
+    ]
+    t0 = time.perf_counter()
+    separate = []
+    for theme, vibes, departure, team, mh in cases:
+        a = build_itinerary(venues, theme, vibes, arrival, departure, team, "premium", mh)
+        b = build_itinerary(venues, theme, vibes, arrival, departure, team, "balanced", mh)
+        separate.append((a, b, compare_plans(a, b, venues)))
+    t_separate = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    together = [build_plans(venues, theme, vibes, arrival, departure, team, ("premium", "balanced"), mh)
+                for theme, vibes, departure, team, mh in cases]
+    t_together = time.perf_counter() - t0
+
+    for (a, b, comparison), built in zip(separate, together):
+        assert [dict(s) for s in built["plans"]["premium"]] == [dict(s) for s in a]
+        assert [dict(s) for s in built["plans"]["balanced"]] == [dict(s) for s in b]
+        assert built["comparison"] == comparison
+    print(f"{len(cases)} Plan A/B requests: two build_itinerary calls + compare_plans {t_separate * 1000:.0f} ms, "
+          f"build_plans {t_together * 1000:.0f} ms; outputs identical")
+
+    # Long trips: the day loop reuses the pools built once per request, so the
+    # per-day cost stays flat as the trip grows.
+    for nights in (3, 14, 30):
+        departure = arrival + timedelta(days=nights)
+        t0 = time.perf_counter()
+        for theme in ("spring_training", "bachelorette", "wmpo", "other"):
+            build_plans(venues, theme, ["party"], arrival, departure, "cubs", ("premium", "balanced"), ["pool", "spa", "nice_dinner"])
+        elapsed = (time.perf_counter() - t0) * 1000
+        print(f"{nights + 1}-day trips: {elapsed:.1f} ms for 4 themes ({elapsed / (4 * (nights + 1)):.2f} ms/day)")
+
+
+def _memo_check(args: argparse.Namespace) -> None:
+    catalog = _load_catalog(args.venues)
+    memo = PlanMemo()
+    arrival = date(2026, 3, 5)
+    cases = [
+        (theme, vibes, arrival + timedelta(days=nights), mh)
+        for theme in ("spring_training", "bachelorette", "wmpo", "other")
+        for vibes in ([], ["party"], ["golf", "party"])
+        for nights in (2, 4)
+        for mh in ([], ["pool", "nice_dinner"])
+    ]
+    for label in ("cold", "repeat"):
+        t0 = time.perf_counter()
+        for theme, vibes, departure, mh in cases:
+            slots = memo.itinerary(catalog, theme, list(reversed(vibes)), arrival, departure, "cubs", "balanced", mh)
+            built = memo.plans(catalog, theme, vibes, arrival, departure, "cubs", ("premium", "balanced"), mh)
+            if label == "repeat":
+                continue
+            expected = build_itinerary(catalog.venues, theme, vibes, arrival, departure, "cubs", "balanced", mh)
+            assert [dict(s) for s in slots] == [dict(s) for s in expected]
+            assert built == build_plans(catalog.venues, theme, vibes, arrival, departure, "cubs", ("premium", "balanced"), mh)
+        elapsed = (time.perf_counter() - t0) * 1e6 / (2 * len(cases))
+        print(f"{label:>6}: {elapsed:,.1f} us per request")
+
+    # Copies are independent: editing one session's plan leaves the memo intact.
+    theme, vibes, departure, mh = cases[0]
+    first = memo.itinerary(catalog, theme, vibes, arrival, departure, "cubs", "balanced", mh)
+    first[0]["travel_minutes"] = -1
+    first[0]["venue"] = {"name": "Edited"}
+    again = memo.itinerary(catalog, theme, vibes, arrival, departure, "cubs", "balanced", mh)
+    assert again[0].get("travel_minutes") != -1 and again[0]["venue"]["name"] != "Edited"
+    stats = memo.stats()
+    print(f"{stats['entries']} entries, {stats['hits']} hits / {stats['misses']} misses (hit rate {stats['hit_rate']:.0%}); outputs identical")
+
+
+def _beam_bench(args: argparse.Namespace) -> None:
+    catalog = _load_catalog(args.venues)
+    venues = catalog.venues
+    arrival = date(2026, 3, 5)
+    cases = [
+        (theme, prefs, nights, variant, mh)
+        for theme in ("spring_training", "bachelorette", "wmpo", "other")
+        for prefs in ({}, {"party": 1.0, "relax": 0.4}, {"golf": 1.0, "foodie": 0.7})
+        for nights in (2, 4, 7)
+        for variant in ("balanced", "premium")
+        for mh in ([], ["pool", "nice_dinner"])
+    ]
+    totals = {"greedy": {}, "beam": {}}
+    latency = {"greedy": [], "beam": []}
+    wins = 0
+    for theme, prefs, nights, variant, mh in cases:
+        departure = arrival + timedelta(days=nights)
+        vibes = list(prefs)
+        objective = PlanObjective.for_trip(vibes, prefs, args.budget_min, args.budget_max, time_budget_ms=args.budget_ms)
+        results = {}
+        for mode, obj in (("greedy", None), ("beam", objective)):
+            t0 = time.perf_counter()
+            slots = build_itinerary(venues, theme, vibes, arrival, departure, "cubs", variant, mh, obj)
+            latency[mode].append((time.perf_counter() - t0) * 1000)
+            results[mode] = evaluate_plan(venues, slots, objective, theme, variant, mh)
+            for k, v in results[mode].items():
+                totals[mode][k] = totals[mode].get(k, 0.0) + v
+        greedy, beam = results["greedy"], results["beam"]
+        assert beam["repeats"] <= greedy["repeats"]
+        if not greedy["repeats"]:
+            assert beam["objective"] >= greedy["objective"] - 1e-9
+        wins += beam["objective"] > greedy["objective"] + 1e-9
+
+    n = len(cases)
+    print(f"{n} requests, budget ${args.budget_min:.0f}-${args.budget_max:.0f}, beam time budget {args.budget_ms:.0f} ms")
+    print(f"{'':<7}{'objective':>10}{'score':>8}{'travel min':>11}{'spend $':>9}{'must-haves':>11}{'repeats':>8}{'p50 ms':>8}{'max ms':>8}")
+    for mode in ("greedy", "beam"):
+        t = totals[mode]
+        print(f"{mode:<7}{t['objective'] / n:>10.2f}{t['score'] / n:>8.2f}{t['travel_minutes'] / n:>11.0f}{t['spend'] / n:>9.0f}"
+              f"{t['must_haves_covered'] / n:>11.2f}{t['repeats'] / n:>8.2f}"
+              f"{statistics.median(latency[mode]):>8.1f}{max(latency[mode]):>8.1f}")
+    print(f"(per-request means) beam scored higher on {wins}/{n} plans, never lower where greedy has no repeats, "
+          f"and never repeats more")
+
+
+def _venues_file(path: str) -> str:
+    path = path or venues_json_path()
+    if not path:
+        raise SystemExit("venues.json not found")
+    return path
+
+
+def _scoring_bench(args: argparse.Namespace) -> None:
+    """ScoringEngine and RankedCatalog against the scalar score_venue path."""
+    raw = load_venues(_venues_file(args.venues))
+    base = raw.get("venues", []) if isinstance(raw, dict) else raw
+    venues = [dict(v, name=f"{v.get('name', '')} #{i}") for i in range(args.scale) for v in base]
+    vocab = sorted({x for v in base for x in v.get("vibes", [])})
+    rng = random.Random(7)
+    profiles = [{x: rng.choice([0.0, 0.25, 0.5, 1.0, 2.0]) for x in vocab} for _ in range(args.profiles // 2)]
+    # Group profiles as the app builds them: fractional weights (1/3, 5/7, ...)
+    # whose sums round differently depending on the order of the additions.
+    while len(profiles) < args.profiles:
+        votes = [{"vibes": rng.sample(vocab, rng.randint(1, 3))} for _ in range(rng.randint(2, 7))]
+        profiles.append(reconcile_preferences(votes, len(votes)))
+    themes = sorted({t for v in base for t in v.get("themes", [])}) or [""]
+
+    def scalar_rank(profile: Dict[str, float], theme: str) -> List[Dict[str, Any]]:
+        ranked = []
+        for v in venues:
+            v2 = dict(v)
+            v2["score"] = score_venue(v, profile, theme, (0.55, 0.35, 0.10))
+            ranked.append(v2)
+        ranked.sort(key=lambda x: x["score"], reverse=True)
+        return ranked
+
+    t0 = time.perf_counter()
+    expected = [scalar_rank(p, themes[i % len(themes)]) for i, p in enumerate(profiles)]
+    t_scalar = time.perf_counter() - t0
+
+    engine = ScoringEngine(venues)
+    t0 = time.perf_counter()
+    got = [engine.rank(p, themes[i % len(themes)]) for i, p in enumerate(profiles)]
+    t_rank = time.perf_counter() - t0
+    for e, g in zip(expected, got):
+        assert [v["name"] for v in e] == [v["name"] for v in g]
+        assert all(a["score"] == b["score"] for a, b in zip(e, g))
+
+    t0 = time.perf_counter()
+    batch = engine.score_batch(profiles, themes[0])
+    top = [engine.order(row, 10) for row in batch]
+    t_batch = time.perf_counter() - t0
+    assert [venues[i]["name"] for i in top[0]] == [v["name"] for v in expected[0][:10]]
+
+    targets = ["brunch", "activity", "dinner", "nightlife", "golf", "transport"]
+    excluded = [v["name"] for v in expected[0][:3]] + [venues[-1]["name"]]
+    t0 = time.perf_counter()
+    for e in expected:
+        pick_top_by_category(e, targets, limit_per_category=2, max_total=8)
+        alternatives(e, excluded, k=5)
+    t_lists = time.perf_counter() - t0
+    catalog = tuple(venues)
+    scoring_engine_for(catalog)
+    t0 = time.perf_counter()
+    results = []
+    for i, p in enumerate(profiles):
+        rc = RankedCatalog(catalog, p, themes[i % len(themes)])
+        results.append((pick_top_by_category(rc, targets, limit_per_category=2, max_total=8), alternatives(rc, excluded, k=5)))
+    t_ranked = time.perf_counter() - t0
+    for e, (picks, alts) in zip(expected, results):
+        assert picks == pick_top_by_category(e, targets, limit_per_category=2, max_total=8)
+        assert alts == alternatives(e, excluded, k=5)
+
+    print(f"{len(venues)} venues x {len(profiles)} profiles: scalar {t_scalar * 1000:.0f} ms, "
+          f"engine rank {t_rank * 1000:.0f} ms, batch scores + top-10 {t_batch * 1000:.1f} ms")
+    print(f"itinerary picks: ranked lists {t_lists * 1000:.0f} ms (after ranking), RankedCatalog {t_ranked * 1000:.0f} ms (incl. scoring)")
+    print("engine scores (bit for bit), rankings and RankedCatalog picks match the scalar path")
+
+
+def _travel_bench(args: argparse.Namespace) -> None:
+    """TravelMatrix against scalar haversine per pair."""
+    with open(_venues_file(args.venues), "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    base = raw.get("venues", []) if isinstance(raw, dict) else raw
+    rng = random.Random(7)
+    venues = []
+    for i in range(args.scale):
+        for v in base:
+            v = dict(v, id=f"{v.get('id', v.get('name', ''))}-{i}")
+            if v.get("lat") is not None and v.get("lon") is not None and i:
+                v["lat"] = float(v["lat"]) + rng.uniform(-0.05, 0.05)
+                v["lon"] = float(v["lon"]) + rng.uniform(-0.05, 0.05)
+            venues.append(v)
+    located = [v for v in venues if v.get("lat") is not None and v.get("lon") is not None]
+
+    t0 = time.perf_counter()
+    expected = {
+        (a["id"], b["id"]): drive_minutes(haversine_miles(float(a["lat"]), float(a["lon"]), float(b["lat"]), float(b["lon"])))
+        for a in located
+        for b in located
+    }
+    t_scalar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    matrix = TravelMatrix.from_venues(venues)
+    t_matrix = time.perf_counter() - t0
+
+    by_id = {v["id"]: v for v in venues}
+    assert all(matrix.minutes_between(by_id[a], by_id[b]) == m for (a, b), m in expected.items())
+    assert len(matrix) == len(located) and all(matrix.position(v) is None for v in venues if v not in located)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "venues" + TRAVEL_SUFFIX)
+        matrix.save(path, "0" * 64)
+        t0 = time.perf_counter()
+        loaded = TravelMatrix.load(path, venues, "0" * 64)
+        t_load = time.perf_counter() - t0
+        assert loaded is not None and np.array_equal(loaded.minutes, matrix.minutes, equal_nan=True)
+        assert TravelMatrix.load(path, venues, "1" * 64) is None
+        size = os.path.getsize(path)
+
+    pairs = [(by_id[a], by_id[b]) for a, b in rng.sample(list(expected), min(len(expected), 100_000))]
+    t0 = time.perf_counter()
+    for a, b in pairs:
+        drive_minutes_between(matrix, a, b)
+    t_lookup = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for a, b in pairs:
+        drive_minutes_between(None, a, b)
+    t_haversine = time.perf_counter() - t0
+
+    print(f"{len(venues)} venues ({len(located)} located): scalar pairs {t_scalar * 1000:.0f} ms, "
+          f"matrix build {t_matrix * 1000:.1f} ms, load {t_load * 1000:.1f} ms ({size} bytes)")
+    print(f"{len(pairs)} lookups: matrix {t_lookup * 1e9 / len(pairs):.0f} ns, haversine {t_haversine * 1e9 / len(pairs):.0f} ns each; "
+          "minutes match scalar drive_minutes(haversine_miles())")
+
+
+def _snapshot(args: argparse.Namespace) -> None:
+    out = build_snapshot(_venues_file(args.venues), args.out)
+    travel = travel_path_for(out)
+    print(f"wrote {out} ({os.path.getsize(out)} bytes), {travel} ({os.path.getsize(travel)} bytes)")
+
+
+def _snapshot_bench(args: argparse.Namespace) -> None:
+    """JSON + normalize_venues against loading the binary snapshot."""
+    with open(_venues_file(args.venues), "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    base = normalize_venues(raw)
+    scaled = [dict(v, name=f"{v['name']} #{i}", id=f"{v['id']}-{i}") for i in range(args.scale) for v in base]
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "venues.json")
+        with open(src, "w", encoding="utf-8") as f:
+            json.dump({"venues": scaled}, f)
+        out = build_snapshot(src)
+
+        t0 = time.perf_counter()
+        with open(src, "r", encoding="utf-8") as f:
+            from_json = [Venue.from_dict(v) for v in normalize_venues(json.load(f))]
+        t_json = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        from_snap = load_snapshot(out, content_digest(src))
+        t_snap = time.perf_counter() - t0
+
+        assert from_snap is not None and list(from_snap) == from_json
+        print(f"{len(scaled)} venues: json+normalize {t_json * 1000:.1f} ms, snapshot {t_snap * 1000:.1f} ms "
+              f"({os.path.getsize(src)} -> {os.path.getsize(out)} bytes)")
+
+
+def _reload_bench(args: argparse.Namespace) -> None:
+    """A full catalog build against CatalogWatcher's incremental reload."""
+    with open(_venues_file(args.venues), "r", encoding="utf-8") as f:
+        base = raw_venue_records(json.load(f))
+    records = [dict(r, name=f"{r['name']} #{i}") for i in range(args.scale) for r in base]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "venues.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"venues": records}, f)
+
+        t0 = time.perf_counter()
+        watcher = CatalogWatcher(path, poll_secs=0)
+        print(f"full build of {len(watcher.catalog)} venues: {(time.perf_counter() - t0) * 1000:.1f} ms (v{watcher.catalog.version})")
+
+        # One ops fix: change a price tier, drop a venue, add a new one.
+        records[5] = dict(records[5], price_tier=4)
+        del records[10]
+        records.append(dict(base[0], name="Pop-up Venue"))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"venues": records}, f)
+
+        t0 = time.perf_counter()
+        watcher.check()
+        elapsed = (time.perf_counter() - t0) * 1000
+        print(f"incremental reload: {elapsed:.1f} ms (v{watcher.catalog.version}) diff={watcher.last_diff}")
+
+        fresh = Catalog(normalize_venues({"venues": records}))
+        for theme in ("wmpo", "spring_training", "bachelorette"):
+            for cat in ("brunch", "dinner", "nightlife", "activity", "golf"):
+                for vibes in ([], ["party"], ["active", "relax"]):
+                    assert watcher.catalog.index.filter(theme, vibes, cat) == fresh.index.filter(theme, vibes, cat)
+        assert watcher.catalog.venues == fresh.venues
+        print("patched index matches a full rebuild")
+
+
+def _assets(args: argparse.Namespace) -> None:
+    """Encoded sizes and cold/warm encode times for image assets."""
+    w, h = (int(x) for x in args.box.lower().split("x"))
+    pipeline = AssetPipeline()
+    for p in args.paths:
+        t0 = time.perf_counter()
+        uri = pipeline.data_uri(p, (w, h))
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        pipeline.data_uri(p, (w, h))
+        warm = time.perf_counter() - t0
+        raw = os.path.getsize(p) if os.path.exists(p) else 0
+        print(f"{p}: raw {raw / 1024:.0f} KiB -> uri {len(uri or '') / 1024:.0f} KiB, cold {cold * 1000:.0f} ms, warm {warm * 1000:.2f} ms")
+
+
+def _migrate_trips(args: argparse.Namespace) -> None:
+    count = migrate_json_to_sqlite(args.trips_dir, args.db)
+    print(f"Imported {count} trip(s) into {args.db or os.path.join(args.trips_dir, SQLITE_DB_NAME)}")
+
+
+def _plan(args: argparse.Namespace) -> None:
+    catalog = _load_catalog(args.venues)
+    arrival = date.fromisoformat(args.arrival) if args.arrival else date.today()
+    departure = arrival + timedelta(days=args.nights)
+    vibes = [v for v in args.vibes.split(",") if v]
+    must_haves = [m for m in args.must_haves.split(",") if m]
+
+    t0 = time.perf_counter()
+    objective = PlanObjective.for_trip(vibes, None, args.budget_min, args.budget_max) if args.beam else None
+    slots = build_itinerary(catalog.venues, args.theme, vibes, arrival, departure, args.team, args.variant, must_haves, objective)
+    elapsed = (time.perf_counter() - t0) * 1000
+    for s in slots:
+        venue = s.get("venue") or {}
+        travel = f"  (~{s['travel_minutes']} min)" if s.get("travel_minutes") else ""
+        print(f"{s['day_label']:<11} {s['time']:>8}  {s['type']}: {venue.get('name', '—')}{travel}")
+    print(f"{len(slots)} slots in {elapsed:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m planning", description="Headless PlayBook planning engine.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_import = sub.add_parser("import-time", help="measure a cold `import planning` in fresh interpreters")
+    p_import.add_argument("--runs", type=int, default=5)
+    p_plans = sub.add_parser("plans", help="check build_plans against per-variant build_itinerary calls")
+    p_plans.add_argument("--venues", default=None)
+    p_memo = sub.add_parser("memo", help="check PlanMemo against uncached builds and time repeat lookups")
+    p_memo.add_argument("--venues", default=None)
+    p_beam = sub.add_parser("beam", help="compare beam-search plans with the greedy scheduler (quality and latency)")
+    p_beam.add_argument("--venues", default=None)
+    p_beam.add_argument("--budget-min", type=float, default=600)
+    p_beam.add_argument("--budget-max", type=float, default=1200)
+    p_beam.add_argument("--budget-ms", type=float, default=300, help="beam search time budget per plan")
+    p_scoring = sub.add_parser("scoring", help="check and time ScoringEngine / RankedCatalog against scalar score_venue")
+    p_scoring.add_argument("--venues", default=None)
+    p_scoring.add_argument("--scale", type=int, default=50, help="replicate the catalog N times")
+    p_scoring.add_argument("--profiles", type=int, default=64)
+    p_travel = sub.add_parser("travel", help="check and time TravelMatrix against per-pair haversine")
+    p_travel.add_argument("--venues", default=None)
+    p_travel.add_argument("--scale", type=int, default=10, help="replicate the catalog N times (jittered coordinates)")
+    p_snapshot = sub.add_parser("snapshot", help="write venues.catalog.bin and venues.catalog.travel.npz from venues.json")
+    p_snapshot.add_argument("--venues", default=None)
+    p_snapshot.add_argument("--out", default=None)
+    p_snapshot_bench = sub.add_parser("snapshot-bench", help="compare JSON+normalize against snapshot load")
+    p_snapshot_bench.add_argument("--venues", default=None)
+    p_snapshot_bench.add_argument("--scale", type=int, default=1, help="replicate the catalog N times")
+    p_reload = sub.add_parser("reload", help="time a full catalog build against an incremental reload")
+    p_reload.add_argument("--venues", default=None)
+    p_reload.add_argument("--scale", type=int, default=200, help="replicate the catalog N times")
+    p_assets = sub.add_parser("assets", help="report encoded sizes for image assets")
+    p_assets.add_argument("paths", nargs="+")
+    p_assets.add_argument("--box", default="%dx%d" % BANNER_BOX, help="display box WxH")
+    p_migrate = sub.add_parser("migrate-trips", help="import trips/*.json into the SQLite trip store")
+    p_migrate.add_argument("--trips-dir", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trips"))
+    p_migrate.add_argument("--db", default=None, help=f"defaults to <trips-dir>/{SQLITE_DB_NAME}")
+    p_plan = sub.add_parser("plan", help="print an itinerary without the UI")
+    p_plan.add_argument("--venues", default=None)
+    p_plan.add_argument("--theme", default="spring_training")
+    p_plan.add_argument("--vibes", default="", help="comma-separated")
+    p_plan.add_argument("--arrival", default=None, help="YYYY-MM-DD (default today)")
+    p_plan.add_argument("--nights", type=int, default=4)
+    p_plan.add_argument("--team", default="cubs")
+    p_plan.add_argument("--variant", default="balanced", choices=["balanced", "premium"])
+    p_plan.add_argument("--must-haves", default="", help="comma-separated: pool, spa, nice_dinner, ...")
+    p_plan.add_argument("--beam", action="store_true", help="beam-search the plan instead of the greedy pass")
+    p_plan.add_argument("--budget-min", type=float, default=600)
+    p_plan.add_argument("--budget-max", type=float, default=1200)
+    args = parser.parse_args()
+
+    if args.cmd == "import-time":
+        _import_time(args.runs)
+    elif args.cmd == "plans":
+        _plans_check(args)
+    elif args.cmd == "memo":
+        _memo_check(args)
+    elif args.cmd == "beam":
+        _beam_bench(args)
+    elif args.cmd == "scoring":
+        _scoring_bench(args)
+    elif args.cmd == "travel":
+        _travel_bench(args)
+    elif args.cmd == "snapshot":
+        _snapshot(args)
+    elif args.cmd == "snapshot-bench":
+        _snapshot_bench(args)
+    elif args.cmd == "reload":
+        _reload_bench(args)
+    elif args.cmd == "assets":
+        _assets(args)
+    elif args.cmd == "migrate-trips":
+        _migrate_trips(args)
+    else:
+        _plan(args)
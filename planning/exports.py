@@ -0,0 +1,196 @@
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .scheduling import time_to_minutes
+
+
+def generate_ical(itinerary: List[Dict[str, Any]]) -> str:
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//PlayBook//EN"]
+    for s in itinerary:
+        if s.get("venue") or s.get("type") == "Transportation":
+            day = s.get("day", "")
+            time_str = (s.get("time") or "12:00 PM").replace(".", "").strip()
+            try:
+                dt_str = f"{day} {time_str}"
+                dt_obj = datetime.strptime(dt_str, "%Y-%m-%d %I:%M %p")
+            except Exception:
+                dt_obj = datetime.strptime(day + " 12:00", "%Y-%m-%d %H:%M")
+            start = dt_obj.strftime("%Y%m%dT%H%M00")
+            end_dt = dt_obj + timedelta(hours=1)
+            end = end_dt.strftime("%Y%m%dT%H%M00")
+            v = s.get("venue") or {}
+            name = v.get("name", s.get("type", "Event"))
+            desc = s.get("type", "")
+            lines.append("BEGIN:VEVENT")
+            lines.append(f"DTSTART:{start}")
+            lines.append(f"DTEND:{end}")
+            lines.append(f"SUMMARY:{name} ({desc})")
+            lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines)
+
+
+def generate_html(itinerary: List[Dict[str, Any]], title: str = "PlayBook Plan", theme: str = "", day_descriptions: Optional[Dict[str, str]] = None) -> str:
+    by_day_iso: Dict[str, List[Dict]] = {}
+    for s in itinerary:
+        by_day_iso.setdefault(s.get("day", ""), []).append(s)
+    for slist in by_day_iso.values():
+        slist.sort(key=lambda x: (time_to_minutes(x.get("time") or ""), x.get("type") or ""))
+    day_order = sorted(by_day_iso.keys())
+    total_days = len(day_order)
+    day_descriptions = day_descriptions or {}
+
+    rows = []
+    for day_index, day_iso in enumerate(day_order):
+        slots = by_day_iso[day_iso]
+        day_label = slots[0].get("day_label", day_iso) if slots else day_iso
+        is_arrival = day_index == 0
+        is_departure = day_index == total_days - 1
+        day_key = f"{theme}_{day_index}"
+        desc = day_descriptions.get(day_key)
+
+        if theme == "bachelorette":
+            headline, one_liner, _ = bachelorette_day_headline(day_index, is_arrival, is_departure, total_days)
+            desc = desc or one_liner
+            rows.append(f"<h2>{day_label} — <em>{headline}</em></h2>")
+        else:
+            if not desc and theme == "spring_training":
+                _, desc = _spring_training_day_headline(day_index, is_arrival, is_departure, total_days)
+            if not desc and theme == "wmpo":
+                _, desc = _wmpo_day_headline(day_index, is_arrival, is_departure, total_days)
+            rows.append(f"<h2>{day_label}</h2>")
+        if desc:
+            desc_html = (desc or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\n", "<br/>")
+            rows.append(f"<p class=\"day-intro\">{desc_html}</p>")
+
+        for s in slots:
+            v = s.get("venue") or {}
+            name = v.get("name", "—")
+            rows.append(f"<p><strong>{s.get('time', '')}</strong> {s.get('type', '')}: {name}</p>")
+    body = "\n".join(rows)
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title>
+<style>body{{font-family:sans-serif;max-width:640px;margin:2rem auto;padding:1rem;}} h1{{margin-bottom:0.5rem;}} h2{{margin-top:1.5rem;margin-bottom:0.25rem;}} .day-intro{{margin-top:0;margin-bottom:1rem;opacity:0.9;font-size:0.95rem;}} p{{margin:0.4rem 0;}}</style></head>
+<body><h1>{title}</h1>{body}</body></html>"""
+
+
+def parse_emails(text: str) -> List[str]:
+    if not text:
+        return []
+    parts = re.split(r"[,\n; ]+", text.strip())
+    emails = []
+    for p in parts:
+        if re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", p):
+            emails.append(p)
+    seen = set()
+    out = []
+    for e in emails:
+        if e not in seen:
+            seen.add(e)
+            out.append(e)
+    return out
+
+
+def bachelorette_day_headline(day_index: int, is_arrival: bool, is_departure: bool, total_days: int) -> Tuple[str, str, str]:
+    if is_arrival:
+        return (
+            "We're here — let's get this weekend started",
+            "Welcome drinks at the place, then we're hitting dinner and going out. The ultimate Scottsdale weekend starts now.",
+            "Your table and experience are ready for the squad.",
+        )
+    if is_departure:
+        return (
+            "One last brunch before we head out",
+            "Final brunch and one more photo op. Don't forget Old Town or a cactus pic on the way.",
+            "One last stop in Old Town or at a cactus garden if you have time.",
+        )
+    if day_index == 1:
+        return (
+            "Brunch, pool & bottle service",
+            "The full day: brunch, pool or cabana, then dinner and going out. This is what we came for.",
+            "Reserve cabana or glam ahead if you want the full vibe.",
+        )
+    if day_index >= 2:
+        return (
+            "Recovery & recharge — your pace",
+            "Spa or chill time, then dinner and nightlife. We can go hard or take it easy—your call.",
+            "Yoga by the pool, ATV, hot air balloon, or wine tasting—on the table if the squad wants it.",
+        )
+    return ("Your day in Scottsdale", "Brunch, activity, dinner, and nightlife—built for the ultimate weekend.", "")
+
+
+def _spring_training_day_headline(day_index: int, is_arrival: bool, is_departure: bool, total_days: int) -> Tuple[str, str]:
+    if is_arrival:
+        return ("Touchdown — let's go", "Welcome to Scottsdale. Check in, then dinner and a night out to start the trip.\nGet some rest — game day is tomorrow.")
+    if is_departure:
+        return ("One more brunch, then head out", "Final brunch and hit the road.\nSafe travels — see you next spring.")
+    if day_index == 1:
+        return ("Game day — early game", "Brunch, then head to the ballpark for a 1 PM game.\nAfter the game, dinner and nightlife.")
+    if day_index == 2:
+        return ("Game day — evening game", "Brunch and activity or rest during the day.\n6 PM game, then dinner and nightlife.")
+    return ("Spring Training in Scottsdale", "Brunch, baseball, dinner, and nightlife.\nFull day at the ballpark and around town.")
+
+
+def _wmpo_day_headline(day_index: int, is_arrival: bool, is_departure: bool, total_days: int) -> Tuple[str, str]:
+    if is_arrival:
+        return (
+            "Arrival — warm up",
+            "You’ll roll in, grab dinner, and get ready for golf and the tournament. Think of this as your warm‑up day before the WM Phoenix Open action.",
+        )
+    if is_departure:
+        return (
+            "Last round or brunch, then out",
+            "You’ll squeeze in one more round or brunch, then head out after an easy morning. Travel day, with one last Scottsdale stop if you want it.",
+        )
+    if day_index == 1:
+        return (
+            "Tournament day + Birds Nest",
+            "You’ll spend the day at the WM Phoenix Open with on-course food, drinks, cabanas, and party tents, then head to the Coors Light Birds Nest or another concert that night.",
+        )
+    if day_index == 2:
+        return (
+            "More WM Phoenix Open action",
+            "You’ll be back at the WM Phoenix Open or on the course all day with plenty of food and drinks on-site, then go out for a concert, Birds Nest, or Old Town afterward.",
+        )
+    return (
+        "Golf and Scottsdale",
+        "You’ll mix tee times or tournament time with dinners and nightlife around Scottsdale, keeping the WM Phoenix Open energy going.",
+    )
+
+
+def static_day_description(theme: str, day_index: int, is_arrival: bool, is_departure: bool, total_days: int) -> str:
+    if theme == "bachelorette":
+        _, one_liner, _ = bachelorette_day_headline(day_index, is_arrival, is_departure, total_days)
+        return one_liner
+    if theme == "spring_training":
+        _, one_liner = _spring_training_day_headline(day_index, is_arrival, is_departure, total_days)
+        return one_liner
+    if theme == "wmpo":
+        _, one_liner = _wmpo_day_headline(day_index, is_arrival, is_departure, total_days)
+        return one_liner
+    return "Your day in Scottsdale."
+
+
+def theme_summary(theme: str, vibes: List[str], arrival: date, departure: date, team_label: str) -> str:
+    days = (departure - arrival).days + 1
+    vibe_txt = ", ".join([v.title() for v in vibes]) if vibes else "Balanced"
+
+    if theme == "spring_training":
+        return (
+            f"Your {days}-day Scottsdale trip will be a mix of a friends trip and baseball. Spring Training with {vibe_txt}, "
+            f"team: {team_label}. Games, dinners, and nightlife—confirm or swap any slot, then lock in tickets and reservations."
+        )
+    if theme == "bachelorette":
+        return (
+            f"Your {days}-day Scottsdale bachelorette will be planned for the ultimate weekend. "
+            f"Welcome drinks, brunch, pool, spa, dinner, and nightlife will all be lined up so you and the squad can focus on having the best time."
+        )
+    if theme == "wmpo":
+        return (
+            f"Your {days}-day Scottsdale trip will be built for the WM Phoenix Open—golf, watching golf, and going out. "
+            f"Tee times, dinners, and nightlife will be set up for the crew. Confirm or swap slots, then lock in reservations."
+        )
+    return (
+        f"Your {days}-day Scottsdale trip will be reserved and curated with {vibe_txt}. "
+        f"Confirm or swap any slot, then export and invite your group."
+    )
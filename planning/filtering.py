@@ -0,0 +1,59 @@
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional
+
+from catalog import venue_index_for
+from records import Venue, vibe_mask_of
+
+from .venue_tables import BASEBALL_VIBE, GOLF_VIBE, venue_labels
+
+
+def bachelorette_ok_venue(v: Dict[str, Any]) -> bool:
+    if type(v) is Venue:
+        return v.bachelorette_ok
+    if not isinstance(v, Mapping):
+        return False
+    if "not_bachelorette" in venue_labels(v) or vibe_mask_of(v) & (GOLF_VIBE | BASEBALL_VIBE):
+        return False
+    return True
+
+
+def filter_venues(
+    venues: List[Dict[str, Any]],
+    theme: str,
+    vibes: List[str],
+    category: str,
+) -> List[Dict[str, Any]]:
+    # ANDs the catalog index's category / theme / vibe bitmask columns (see
+    # VenueIndex.filter); the cached catalog reuses one index, ad-hoc lists
+    # get a throwaway one.
+    return venue_index_for(venues).filter(theme, vibes, category)
+
+
+def pick_best(candidates: List[Dict[str, Any]], exclude_names: Optional[set] = None) -> Optional[Dict[str, Any]]:
+    if not candidates:
+        return None
+    exclude_names = exclude_names or set()
+    for v in candidates:
+        if v.get("name") not in exclude_names:
+            return v
+    return candidates[0]
+
+
+def pick_best_rotating(
+    candidates: List[Dict[str, Any]],
+    used_names: set,
+    day_index: int,
+    last_used_name: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    if not candidates:
+        return None
+    available = [v for v in candidates if v.get("name") not in used_names]
+    if available:
+        if last_used_name and len(available) > 1:
+            available = [v for v in available if v.get("name") != last_used_name] or available
+        return available[day_index % len(available)]
+    if last_used_name:
+        other = [v for v in candidates if v.get("name") != last_used_name]
+        if other:
+            return other[day_index % len(other)]
+    return candidates[day_index % len(candidates)]
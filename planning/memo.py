@@ -0,0 +1,165 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from catalog import Catalog
+from records import Slot, Venue
+
+from .scheduling import PlanObjective, build_itinerary, build_plans
+
+# One slot as stored in the memo: (id, day, day_label, time, type, venue,
+# extras). Catalog venues are shared read-only records; ad-hoc venues are
+# frozen copies.
+SlotTemplate = Tuple[str, str, str, str, str, Optional[Mapping], Tuple[Tuple[str, Any], ...]]
+PlanTemplate = Tuple[SlotTemplate, ...]
+
+
+def freeze_plan(slots: Iterable[Mapping]) -> PlanTemplate:
+    out = []
+    for s in slots:
+        venue = s.get("venue")
+        if venue is not None and not isinstance(venue, Venue):
+            venue = MappingProxyType(dict(venue))
+        extras = tuple((k, s[k]) for k in s if k not in Slot._KEYS)
+        out.append((s["id"], s["day"], s["day_label"], s["time"], s["type"], venue, extras))
+    return tuple(out)
+
+
+def thaw_plan(template: PlanTemplate) -> List[Slot]:
+    """Fresh, independently mutable slots for one session."""
+    slots = []
+    for slot_id, day, day_label, time, slot_type, venue, extras in template:
+        if venue is not None and not isinstance(venue, Venue):
+            venue = dict(venue)
+        slot = Slot(id=slot_id, day=day, day_label=day_label, time=time, type=slot_type, venue=venue)
+        for k, v in extras:
+            slot[k] = v
+        slots.append(slot)
+    return slots
+
+
+class PlanMemo:
+    """
+    Bounded, process-wide memo in front of build_itinerary / build_plans.
+
+    Requests are keyed by (catalog version, theme, sorted vibes, arrival,
+    departure, team, variant, sorted must-haves), plus the PlanObjective for
+    beam-searched plans: vibe and must-have order never changes a plan, and
+    a catalog reload gets a new version, so stale plans are never served.
+    Plans are stored as immutable templates and every lookup returns fresh
+    Slot objects, so one session editing its itinerary (swaps, travel times)
+    can't leak into another's. The least recently used entries are evicted
+    past max_entries; hits/misses count lookups made through this instance.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        catalog_version: int,
+        theme: str,
+        vibes: Iterable[str],
+        arrival: date,
+        departure: date,
+        team: str,
+        variant: Any,
+        must_haves: Optional[Iterable[str]],
+    ) -> Tuple[Any, ...]:
+        return (
+            catalog_version,
+            theme,
+            tuple(sorted(set(vibes or ()))),
+            arrival,
+            departure,
+            team,
+            variant,
+            tuple(sorted(set(must_haves or ()))),
+        )
+
+    def _get(self, key: Tuple[Any, ...]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _put(self, key: Tuple[Any, ...], entry: Any) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def itinerary(
+        self,
+        catalog: Catalog,
+        theme: str,
+        vibes: List[str],
+        arrival: date,
+        departure: date,
+        team: str,
+        variant: str = "balanced",
+        must_haves: Optional[List[str]] = None,
+        objective: Optional[PlanObjective] = None,
+    ) -> List[Slot]:
+        """build_itinerary(catalog.venues, ...), served from the memo when possible."""
+        key = ("itinerary",) + self.key(catalog.version, theme, vibes, arrival, departure, team, variant, must_haves) + (objective,)
+        template = self._get(key)
+        if template is None:
+            template = freeze_plan(
+                build_itinerary(catalog.venues, theme, vibes, arrival, departure, team, variant, must_haves, objective)
+            )
+            self._put(key, template)
+        return thaw_plan(template)
+
+    def plans(
+        self,
+        catalog: Catalog,
+        theme: str,
+        vibes: List[str],
+        arrival: date,
+        departure: date,
+        team: str,
+        variants: Tuple[str, ...] = ("premium", "balanced"),
+        must_haves: Optional[List[str]] = None,
+        objective: Optional[PlanObjective] = None,
+    ) -> Dict[str, Any]:
+        """build_plans(catalog.venues, ...), served from the memo when possible."""
+        variants = tuple(variants)
+        key = ("plans",) + self.key(catalog.version, theme, vibes, arrival, departure, team, variants, must_haves) + (objective,)
+        entry = self._get(key)
+        if entry is None:
+            built = build_plans(catalog.venues, theme, vibes, arrival, departure, team, variants, must_haves, objective)
+            entry = (
+                tuple((v, freeze_plan(slots)) for v, slots in built["plans"].items()),
+                MappingProxyType({k: tuple(v) if isinstance(v, list) else v for k, v in built["comparison"].items()}),
+            )
+            self._put(key, entry)
+        plans, comparison = entry
+        return {
+            "plans": {v: thaw_plan(template) for v, template in plans},
+            "comparison": {k: list(v) if isinstance(v, tuple) else v for k, v in comparison.items()},
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,125 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional
+
+from keywords import KeywordMatcher
+
+
+def reconcile_preferences(votes: List[Dict[str, Any]], group_size: int) -> Dict[str, float]:
+    """
+    Reconcile group votes into a weighted preference profile.
+    Returns a dict mapping vibe names to weights (0.0 to 1.0).
+    """
+    if not votes:
+        return {}
+    
+    # Count votes per vibe
+    vibe_counts: Dict[str, int] = {}
+    total_voters = len(votes)
+    
+    for vote in votes:
+        vibes = vote.get("vibes", [])
+        for vibe in vibes:
+            vibe_counts[vibe] = vibe_counts.get(vibe, 0) + 1
+    
+    # Convert counts to weights (normalize by total voters)
+    # Also apply a boost for vibes that appear in multiple votes
+    reconciled: Dict[str, float] = {}
+    for vibe, count in vibe_counts.items():
+        # Base weight: percentage of voters who selected this vibe
+        base_weight = count / total_voters
+        
+        # Boost: if a vibe appears in many votes, it's more important
+        # This handles conflicts: if 70% vote "party" and 30% vote "relax",
+        # party gets 0.7 weight, relax gets 0.3 weight
+        reconciled[vibe] = min(1.0, base_weight * 1.2)  # Slight boost for consensus
+    
+    # Normalize so top vibes are more prominent
+    if reconciled:
+        max_weight = max(reconciled.values())
+        if max_weight > 0:
+            for vibe in reconciled:
+                reconciled[vibe] = reconciled[vibe] / max_weight
+    
+    return reconciled
+
+
+# Must-have keywords: free text phrase -> internal key
+MUST_HAVE_KEYWORDS: Dict[str, List[str]] = {
+    "pool": ["pool", "pool day", "must have pool"],
+    "spa": ["spa", "spa day", "must have spa"],
+    "nice_dinner": ["nice dinner", "fancy dinner", "one nice dinner", "upscale dinner", "fine dining"],
+    "golf": ["golf", "tee time", "round of golf"],
+    "baseball": ["baseball", "game", "spring training", "ball game"],
+    "brunch": ["brunch", "must have brunch"],
+}
+MUST_HAVE_MATCHER = KeywordMatcher(MUST_HAVE_KEYWORDS)
+
+
+def extract_must_haves_from_text(text: Optional[str]) -> List[str]:
+    """
+    Extract must-have preferences from free text (e.g. "must have pool day", "we want spa").
+    Returns a list of normalized keys: pool, spa, nice_dinner, golf, baseball, brunch.
+    """
+    if not text or not str(text).strip():
+        return []
+    return MUST_HAVE_MATCHER.ordered_labels(str(text).strip())
+
+
+# Trip clusters: theme + area recommendations (e.g. "WMPO + North Scottsdale")
+TRIP_CLUSTERS = [
+    {"theme": "wmpo", "area": "North Scottsdale", "label": "WMPO + North Scottsdale"},
+    {"theme": "wmpo", "area": "Old Town", "label": "WMPO + Old Town"},
+    {"theme": "bachelorette", "area": "Old Town", "label": "Bachelorette + Old Town"},
+    {"theme": "bachelorette", "area": "North Scottsdale", "label": "Bachelorette + North Scottsdale"},
+    {"theme": "spring_training", "area": "Old Town", "label": "Spring Training + Old Town"},
+    {"theme": "spring_training", "area": "Talking Stick", "label": "Spring Training + Talking Stick"},
+]
+
+
+def get_recommended_cluster(theme: str, vibes: List[str], venues: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Recommend a trip cluster (theme + area) based on theme and vibes.
+    Uses venue counts per area for the theme; returns cluster label or None.
+    """
+    if not theme or not venues:
+        return None
+    theme_lower = (theme or "").lower()
+    area_counts: Dict[str, int] = {}
+    for v in venues:
+        if not isinstance(v, Mapping):
+            continue
+        if theme_lower not in [t.lower() for t in (v.get("themes") or [])]:
+            continue
+        area = (v.get("area") or "").strip()
+        if not area:
+            continue
+        area_counts[area] = area_counts.get(area, 0) + 1
+    if not area_counts:
+        return None
+    best_area = max(area_counts, key=area_counts.get)
+    for c in TRIP_CLUSTERS:
+        if c.get("theme", "").lower() == theme_lower and (c.get("area") or "").strip() == best_area:
+            return c.get("label")
+    return f"{theme.replace('_', ' ').title()} + {best_area}"
+
+
+def must_haves_from_votes(votes: Iterable[Dict[str, Any]]) -> List[str]:
+    """Union of the must-have keys found in every vote's free text."""
+    all_keys: set = set()
+    for v in votes:
+        for key in extract_must_haves_from_text(v.get("free_text")):
+            all_keys.add(key)
+    return list(all_keys)
+
+
+def preferences_to_vibes(preferences: Dict[str, float], max_vibes: int = 3) -> List[str]:
+    """
+    Convert weighted preferences back to a list of vibes.
+    Takes top N vibes by weight.
+    """
+    if not preferences:
+        return []
+    
+    # Sort by weight (descending) and take top N
+    sorted_vibes = sorted(preferences.items(), key=lambda x: x[1], reverse=True)
+    return [vibe for vibe, weight in sorted_vibes[:max_vibes]]
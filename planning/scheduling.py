@@ -0,0 +1,944 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from catalog import VenueIndex, venue_index_for
+from orchestrator import score_venue
+from records import THEME_BITS, Slot, theme_mask_of, vibe_mask_of
+from travel_matrix import TravelMatrix, drive_minutes_between, travel_matrix_for, venue_coords
+
+from .venue_tables import GOLF_VIBE, TEAM_KEY_TO_VENUE_NAMES, venue_labels
+from .filtering import bachelorette_ok_venue, filter_venues, pick_best, pick_best_rotating
+
+
+def time_to_minutes(time_str: str) -> int:
+    if not time_str or not isinstance(time_str, str):
+        return 0
+    time_str = time_str.strip().upper()
+    try:
+        parts = time_str.replace(".", "").split()
+        if len(parts) < 2:
+            return 0
+        hm = parts[0]
+        am_pm = parts[1] if len(parts) > 1 else ""
+        if ":" in hm:
+            h, m = hm.split(":", 1)
+            hour, minute = int(h.strip()), int(m.strip()[:2])
+        else:
+            hour, minute = int(hm[:2]), 0
+        if "PM" in am_pm and hour != 12:
+            hour += 12
+        elif "AM" in am_pm and hour == 12:
+            hour = 0
+        return hour * 60 + minute
+    except (ValueError, IndexError):
+        return 0
+
+
+def fmt_day(d: date) -> str:
+    if hasattr(d, "strftime"):
+        try:
+            return d.strftime("%a %b %-d")
+        except ValueError:
+            day_str = d.strftime("%d").lstrip("0") or "0"
+            return d.strftime(f"%a %b {day_str}")
+    return str(d)
+
+
+# ----------------------------
+# Travel time (distance-based)
+# ----------------------------
+def add_travel_times_to_slots(slots: List[Dict[str, Any]], venues: List[Dict[str, Any]]) -> None:
+    """
+    Fill travel_minutes (and from/to names) on transport slots: from the
+    catalog's travel matrix when it has one, else haversine per leg. Safe to
+    rerun after a swap: legs that can no longer be measured drop their old
+    values.
+    """
+    index = venue_index_for(venues)
+    travel = travel_matrix_for(venues)
+
+    for i, slot in enumerate(slots):
+        if "Transport" not in (slot.get("type") or ""):
+            continue
+        prev_slot = slots[i - 1] if i > 0 else None
+        next_slot = slots[i + 1] if i < len(slots) - 1 else None
+        prev_venue = (prev_slot or {}).get("venue") or {}
+        next_venue = (next_slot or {}).get("venue") or {}
+        prev_name = prev_venue.get("name") if isinstance(prev_venue, Mapping) else None
+        next_name = next_venue.get("name") if isinstance(next_venue, Mapping) else None
+
+        # Look up full venue for coords (slot venue may be minimal)
+        from_venue = index.by_name(prev_name) if prev_name else prev_venue
+        to_venue = index.by_name(next_name) if next_name else next_venue
+        minutes = drive_minutes_between(travel, from_venue, to_venue)
+
+        if minutes is not None:
+            slot["travel_minutes"] = minutes
+            slot["from_venue_name"] = prev_name
+            slot["to_venue_name"] = next_name
+        else:
+            for key in ("travel_minutes", "from_venue_name", "to_venue_name"):
+                slot.pop(key, None)
+
+
+def _plan_drive_minutes(plan: List[Mapping], index: VenueIndex, travel: Optional[TravelMatrix]) -> int:
+    """Total drive minutes between consecutive venues of each day (transport slots skipped)."""
+    total = 0
+    last = last_day = None
+    for slot in plan:
+        venue = slot.get("venue")
+        if not isinstance(venue, Mapping) or "Transport" in (slot.get("type") or ""):
+            continue
+        venue = index.by_name(venue.get("name")) or venue
+        if slot.get("day") == last_day:
+            total += drive_minutes_between(travel, last, venue) or 0
+        last, last_day = venue, slot.get("day")
+    return total
+
+
+# ----------------------------
+# Beam-search scheduling
+# ----------------------------
+# Rough per-person spend for one outing at each price tier, for checking a
+# plan against the trip's budget_min / budget_max.
+PRICE_TIER_COST = {1: 15.0, 2: 35.0, 3: 70.0, 4: 120.0}
+
+# Slot types the beam search re-picks. Welcome drinks, transport, baseball
+# games and WMPO days stay where the greedy pass put them.
+BEAM_SLOT_TYPES = ("Breakfast / Brunch", "Activity", "Dinner", "Nightlife")
+
+_BEAM_BRANCH = 6  # unused candidates tried per beam entry and slot
+
+
+@dataclass(frozen=True)
+class PlanObjective:
+    """
+    What the beam scheduler maximizes over a whole trip:
+
+        sum of score_venue(v, vibe_weights, theme, weights)
+        - travel_weight * drive minutes between consecutive venues of a day
+        - budget_weight * spend outside the budget window / budget_max
+        + must_have_bonus for each requested must-have the plan covers
+
+    with no venue used twice. The window is [budget_min, budget_max] for the
+    balanced variant and its upper half for premium; a budget_max of 0 turns
+    the budget term off. The search widens its beam (1, 2, 4, ...,
+    max_beam_width) until time_budget_ms runs out and keeps the best complete
+    plan. Frozen, so it can be part of a memo key.
+    """
+
+    vibe_weights: Tuple[Tuple[str, float], ...] = ()
+    budget_min: float = 0.0
+    budget_max: float = 0.0
+    weights: Tuple[float, float, float] = (0.55, 0.35, 0.10)
+    travel_weight: float = 0.01
+    budget_weight: float = 1.0
+    must_have_bonus: float = 1.0
+    time_budget_ms: float = 300.0
+    max_beam_width: int = 64
+
+    @classmethod
+    def for_trip(
+        cls,
+        vibes: Optional[List[str]],
+        preferences: Optional[Dict[str, float]] = None,
+        budget_min: float = 0.0,
+        budget_max: float = 0.0,
+        **kwargs: Any,
+    ) -> "PlanObjective":
+        """Objective from reconciled vote weights (or 1.0 per selected vibe) and the trip budget."""
+        vibe_weights = dict(preferences) if preferences else {v: 1.0 for v in vibes or ()}
+        return cls(
+            vibe_weights=tuple(sorted(vibe_weights.items())),
+            budget_min=float(budget_min or 0),
+            budget_max=float(budget_max or 0),
+            **kwargs,
+        )
+
+
+class _PlanScorer:
+    """Per-venue objective terms for one request, memoized by venue identity."""
+
+    def __init__(
+        self,
+        objective: PlanObjective,
+        travel: Optional[TravelMatrix],
+        theme: str,
+        variant: str,
+        must_haves: Optional[List[str]],
+    ):
+        self.objective = objective
+        self.travel_matrix = travel
+        self.vibe_weights = dict(objective.vibe_weights)
+        self.theme = theme
+        self.must_haves = frozenset(must_haves or ())
+        self.hi = objective.budget_max
+        self.lo = min(objective.budget_min, self.hi)
+        if variant == "premium":
+            self.lo = (self.lo + self.hi) / 2
+        self._terms: Dict[Tuple[int, bool], Tuple[float, Optional[int], float, frozenset]] = {}
+        # Located venues seen by this scorer; terms() hands out their index
+        # and travel() memoizes weighted minutes per index pair.
+        self._located: List[Mapping] = []
+        self._loc_of: Dict[int, Optional[int]] = {}
+        self._pairs: Dict[Tuple[int, int], float] = {}
+
+    def _loc(self, venue: Mapping) -> Optional[int]:
+        key = id(venue)
+        if key not in self._loc_of:
+            if venue_coords(venue) is not None:
+                self._loc_of[key] = len(self._located)
+                self._located.append(venue)
+            else:
+                self._loc_of[key] = None
+        return self._loc_of[key]
+
+    def terms(self, venue: Mapping, slot_type: str) -> Tuple[float, Optional[int], float, frozenset]:
+        """(score, location index, spend, must-haves covered) for venue in a slot of slot_type."""
+        is_dinner = slot_type == "Dinner"
+        key = (id(venue), is_dinner)
+        hit = self._terms.get(key)
+        if hit is not None:
+            return hit
+        category = venue.get("category")
+        tier = venue.get("price_tier")
+        covers = set()
+        if category in ("pool", "spa"):
+            covers.add(category)
+        if is_dinner and (tier or 0) >= 3:
+            covers.add("nice_dinner")
+        hit = self._terms[key] = (
+            score_venue(venue, self.vibe_weights, self.theme, self.objective.weights),
+            self._loc(venue),
+            PRICE_TIER_COST.get(tier, 0.0),
+            frozenset(covers) & self.must_haves,
+        )
+        return hit
+
+    def travel(self, a: Optional[int], b: Optional[int]) -> float:
+        """Weighted drive minutes between two location indexes (0 if either venue isn't located)."""
+        if a is None or b is None:
+            return 0.0
+        weighted = self._pairs.get((a, b))
+        if weighted is None:
+            minutes = drive_minutes_between(self.travel_matrix, self._located[a], self._located[b]) or 0
+            weighted = self._pairs[(a, b)] = self.objective.travel_weight * minutes
+        return weighted
+
+    def over_budget(self, spend: float) -> float:
+        if self.hi <= 0:
+            return 0.0
+        return self.objective.budget_weight * max(0.0, spend - self.hi) / self.hi
+
+    def under_budget(self, spend: float, fraction: float = 1.0) -> float:
+        """Shortfall below the window's floor (pro-rated for a partial plan)."""
+        if self.hi <= 0:
+            return 0.0
+        return self.objective.budget_weight * max(0.0, self.lo * fraction - spend) / self.hi
+
+
+def _scored(slot: Mapping) -> bool:
+    venue = slot.get("venue")
+    return bool(venue) and "Transport" not in (slot.get("type") or "") and venue.get("category") != "welcome"
+
+
+def evaluate_plan(
+    venues: List[Dict[str, Any]],
+    slots: List[Mapping],
+    objective: PlanObjective,
+    theme: str,
+    variant: str = "balanced",
+    must_haves: Optional[List[str]] = None,
+) -> Dict[str, float]:
+    """Score any plan (greedy or beam) under objective; "objective" is the value the beam search maximizes."""
+    scorer = _PlanScorer(objective, travel_matrix_for(venues), theme, variant, must_haves)
+    score = travel = spend = 0.0
+    covered: set = set()
+    seen: set = set()
+    repeats = 0
+    last: Optional[int] = None
+    last_day = None
+    for s in slots:
+        if not _scored(s):
+            continue
+        venue = s["venue"]
+        value, loc, cost, covers = scorer.terms(venue, s.get("type") or "")
+        name = venue.get("name")
+        repeats += name in seen
+        seen.add(name)
+        score += value
+        spend += cost
+        covered |= covers
+        if s.get("day") == last_day:
+            travel += scorer.travel(last, loc)
+        last, last_day = loc, s.get("day")
+    budget = scorer.over_budget(spend) + scorer.under_budget(spend)
+    bonus = objective.must_have_bonus * len(covered)
+    return {
+        "objective": score - travel - budget + bonus,
+        "score": score,
+        "travel_minutes": travel / objective.travel_weight if objective.travel_weight else 0.0,
+        "spend": spend,
+        "budget_penalty": budget,
+        "must_haves_covered": len(covered),
+        "repeats": repeats,
+    }
+
+
+def _beam_candidates(scorer: _PlanScorer, slot_type: str, pool: List[Mapping], needed: int) -> List[Tuple[Any, ...]]:
+    """(venue, name, score, location index, spend, covers) for the best needed + slack venues of a pool, best first."""
+    out = []
+    seen: set = set()
+    for v in pool:
+        name = v.get("name") if isinstance(v, Mapping) else None
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        out.append((v, name) + scorer.terms(v, slot_type))
+    out.sort(key=lambda c: -c[2])
+    # Must-have venues stay in reach even when they score low.
+    keep = needed + 2 * _BEAM_BRANCH
+    return out[:keep] + [c for c in out[keep:] if c[5]]
+
+
+def _beam_refine(
+    venues: List[Dict[str, Any]],
+    slots: List[Slot],
+    choices: Dict[str, List[Mapping]],
+    theme: str,
+    variant: str,
+    must_haves: Optional[List[str]],
+    objective: PlanObjective,
+) -> None:
+    """Re-pick the BEAM_SLOT_TYPES venues of a greedy plan in place to maximize objective."""
+    deadline = perf_counter() + objective.time_budget_ms / 1000.0
+    scorer = _PlanScorer(objective, travel_matrix_for(venues), theme, variant, must_haves)
+
+    # Steps in slot order: fixed venues only move the travel chain; choice
+    # steps carry their candidate list.
+    positions = [i for i, s in enumerate(slots) if s.get("type") in BEAM_SLOT_TYPES and choices.get(s.get("type"))]
+    needed: Dict[str, int] = {}
+    for i in positions:
+        needed[slots[i]["type"]] = needed.get(slots[i]["type"], 0) + 1
+    candidates = {t: _beam_candidates(scorer, t, choices[t], n) for t, n in needed.items()}
+    choice_positions = set(positions)
+    steps = []
+    fixed_names = set()
+    for i, s in enumerate(slots):
+        if i in choice_positions:
+            steps.append((s.get("day"), s["type"], candidates[s["type"]], s.get("venue")))
+        elif _scored(s):
+            fixed_names.add(s["venue"].get("name"))
+            steps.append((s.get("day"), s.get("type") or "", None, s["venue"]))
+    if not positions:
+        return
+
+    def run(width: int, timed: bool, forced: Optional[Tuple[Mapping, ...]] = None) -> Optional[Tuple[float, Tuple[Mapping, ...]]]:
+        # Beam entry: (value, spend, used names, last location, last day, covered must-haves, picks).
+        # Entries are ranked against a pro-rated spend floor so the beam doesn't
+        # fill up on cheap plans that only miss budget_min at the end.
+        beam = [(0.0, 0.0, frozenset(fixed_names), None, None, frozenset(), ())]
+        for k, (day, slot_type, cands, current) in enumerate(steps, 1):
+            if timed and perf_counter() > deadline:
+                return None
+            expanded = []
+            for val, spend, used, last, last_day, covered, picks in beam:
+                if cands is None:
+                    options = [(current, None) + scorer.terms(current, slot_type)]
+                elif forced is not None:
+                    pick = forced[len(picks)]
+                    options = [(pick, pick.get("name")) + scorer.terms(pick, slot_type)]
+                else:
+                    options = [c for c in cands if c[1] not in used][:_BEAM_BRANCH]
+                    if not options:
+                        if not current:
+                            expanded.append((val, spend, used, None, day, covered, picks + (current,)))
+                            continue
+                        # Pool exhausted: keep the greedy pick, like pick_best_rotating would repeat.
+                        options = [(current, current.get("name")) + scorer.terms(current, slot_type)]
+                for venue, name, value, loc, cost, covers in options:
+                    expanded.append((
+                        val + value - (scorer.travel(last, loc) if last_day == day else 0.0)
+                        - scorer.over_budget(spend + cost) + scorer.over_budget(spend)
+                        + objective.must_have_bonus * len(covers - covered),
+                        spend + cost,
+                        used if name is None else used | {name},
+                        loc,
+                        day,
+                        covered | covers,
+                        picks if cands is None else picks + (venue,),
+                    ))
+            pace = k / len(steps)
+            expanded.sort(key=lambda e: -(e[0] - scorer.under_budget(e[1], pace)))
+            beam = expanded[:width]
+        finals = [(val - scorer.under_budget(spend), picks) for val, spend, _, _, _, _, picks in beam]
+        return max(finals, key=lambda f: f[0])
+
+    best = run(1, timed=False)
+    # The greedy plan competes too when it already has no repeats.
+    greedy = tuple(slots[i]["venue"] for i in positions)
+    greedy_names = [v.get("name") for v in greedy if v]
+    if len(greedy) == len(greedy_names) and len(set(greedy_names)) == len(greedy_names) and not fixed_names & set(greedy_names):
+        seeded = run(1, timed=False, forced=greedy)
+        if seeded[0] > best[0]:
+            best = seeded
+    width = 2
+    while width <= objective.max_beam_width and perf_counter() < deadline:
+        result = run(width, timed=True)
+        if result is None:
+            break
+        if result[0] > best[0]:
+            best = result
+        width *= 2
+
+    for i, venue in zip(positions, best[1]):
+        slots[i]["venue"] = venue
+
+
+# ----------------------------
+# Itinerary generation
+# ----------------------------
+@dataclass
+class CandidatePools:
+    """
+    Variant-independent candidates for one request: the filter_venues passes,
+    the spring-training baseball scan, the transport fallback and the
+    theme-only pools the day loop draws from (bachelorette spa/pool, WMPO
+    tournament and golf-entertainment venues). Every plan variant, and every
+    day of it, is scheduled from the same pools.
+    """
+
+    index: VenueIndex
+    brunch: List[Dict[str, Any]]
+    dining: List[Dict[str, Any]]
+    nightlife: List[Dict[str, Any]]
+    activities: List[Dict[str, Any]]
+    transport: List[Dict[str, Any]]
+    shopping: List[Dict[str, Any]]
+    baseball: List[Dict[str, Any]]
+    spa: List[Dict[str, Any]]
+    pool: List[Dict[str, Any]]
+    tournament: List[Dict[str, Any]]
+    golf_entertainment: List[Dict[str, Any]]
+
+
+def candidate_pools(venues: List[Dict[str, Any]], theme: str, vibes: List[str], team: str) -> CandidatePools:
+    index = venue_index_for(venues)
+    transport = filter_venues(venues, theme, vibes, "transport")
+
+    team_venue_names = TEAM_KEY_TO_VENUE_NAMES.get(team, [])
+    baseball_venues = []
+    if theme == "spring_training":
+        baseball_venues = index.where(
+            category="activity", any_vibes=["baseball"], theme=theme, any_teams=team_venue_names or None
+        )
+        if not baseball_venues:
+            baseball_venues = index.where(category="activity", any_vibes=["baseball"])
+
+    spa_venues: List[Dict[str, Any]] = []
+    pool_venues: List[Dict[str, Any]] = []
+    if theme == "bachelorette":
+        spa_venues = index.where(category="spa", theme=theme)
+        pool_venues = index.where(category="pool", theme=theme)
+
+    # WM Phoenix Open theme: the actual tournament days, then golf /
+    # golf-entertainment (Topgolf, PopStroke, Puttshack, etc.).
+    tournament_venues: List[Dict[str, Any]] = []
+    golf_entertainment: List[Dict[str, Any]] = []
+    if theme == "wmpo":
+        for v in index.category("activity"):
+            labels = venue_labels(v)
+            if "wmpo" in labels:
+                tournament_venues.append(v)
+            elif vibe_mask_of(v) & GOLF_VIBE or "golf_or_putt" in labels:
+                golf_entertainment.append(v)
+
+    return CandidatePools(
+        index=index,
+        brunch=filter_venues(venues, theme, vibes, "brunch"),
+        dining=filter_venues(venues, theme, vibes, "dining"),
+        nightlife=filter_venues(venues, theme, vibes, "nightlife"),
+        activities=filter_venues(venues, theme, vibes, "activity"),
+        transport=transport or index.category("transport"),
+        shopping=filter_venues(venues, theme, vibes, "shopping"),
+        baseball=baseball_venues,
+        spa=spa_venues,
+        pool=pool_venues,
+        tournament=tournament_venues,
+        golf_entertainment=golf_entertainment,
+    )
+
+
+def apply_variant_preference(venue_list: List[Dict[str, Any]], variant: str) -> List[Dict[str, Any]]:
+    """Premium prefers higher price_tier; balanced keeps the filtered (vibe) order."""
+    if not venue_list or variant == "balanced":
+        return venue_list
+    # Premium: sort by price_tier descending (higher tier first)
+    if variant == "premium":
+        return sorted(venue_list, key=lambda v: v.get("price_tier", 0), reverse=True)
+    return venue_list
+
+
+def build_itinerary(
+    venues: List[Dict[str, Any]],
+    theme: str,
+    vibes: List[str],
+    arrival: date,
+    departure: date,
+    team: str,
+    variant: str = "balanced",  # "premium" or "balanced"
+    must_haves: Optional[List[str]] = None,  # from free text: pool, spa, nice_dinner, etc.
+    objective: Optional[PlanObjective] = None,  # set: beam-search the plan against it
+) -> List[Dict[str, Any]]:
+    if departure <= arrival:
+        raise ValueError("Departure date must be after arrival date.")
+    pools = candidate_pools(venues, theme, vibes, team)
+    return _schedule(venues, pools, theme, arrival, departure, variant, must_haves, objective)
+
+
+def build_plans(
+    venues: List[Dict[str, Any]],
+    theme: str,
+    vibes: List[str],
+    arrival: date,
+    departure: date,
+    team: str,
+    variants: Tuple[str, ...] = ("premium", "balanced"),
+    must_haves: Optional[List[str]] = None,
+    objective: Optional[PlanObjective] = None,
+) -> Dict[str, Any]:
+    """
+    Every variant's itinerary from one set of candidate pools.
+
+    Returns {"plans": {variant: slots}, "comparison": compare_plans(first, second)}
+    (comparison is {} unless exactly two variants are given). Each plan is the
+    same as build_itinerary(..., variant=variant, ...).
+    """
+    if departure <= arrival:
+        raise ValueError("Departure date must be after arrival date.")
+    pools = candidate_pools(venues, theme, vibes, team)
+    plans = {v: _schedule(venues, pools, theme, arrival, departure, v, must_haves, objective) for v in variants}
+    comparison: Dict[str, Any] = {}
+    if len(variants) == 2:
+        comparison = compare_plans(plans[variants[0]], plans[variants[1]], venues)
+    return {"plans": plans, "comparison": comparison}
+
+
+def _schedule(
+    venues: List[Dict[str, Any]],
+    pools: CandidatePools,
+    theme: str,
+    arrival: date,
+    departure: date,
+    variant: str,
+    must_haves: Optional[List[str]],
+    objective: Optional[PlanObjective] = None,
+) -> List[Dict[str, Any]]:
+    days: List[date] = []
+    d = arrival
+    while d <= departure:
+        days.append(d)
+        d += timedelta(days=1)
+
+    index = pools.index
+    brunch = apply_variant_preference(pools.brunch, variant) or index.category("brunch")
+    dining = apply_variant_preference(pools.dining, variant) or index.category("dining")
+    nightlife = apply_variant_preference(pools.nightlife, variant) or index.category("nightlife")
+    activities = apply_variant_preference(pools.activities, variant)
+    transport = pools.transport
+    shopping = pools.shopping
+    baseball_venues = pools.baseball
+
+    slots: List[Dict[str, Any]] = []
+    slot_id = 0
+
+    used_brunch_names: set = set()
+    used_dining_names: set = set()
+    used_nightlife_names: set = set()
+    used_activity_names: set = set()
+    used_golf_names: set = set()
+    used_transport_names: set = set()
+
+    last_brunch_name: Optional[str] = None
+    last_dining_name: Optional[str] = None
+    last_nightlife_name: Optional[str] = None
+    last_activity_name: Optional[str] = None
+    last_golf_name: Optional[str] = None
+    last_transport_name: Optional[str] = None
+
+    # Simple, predictable rotation for transport recommendations so it
+    # doesn't always suggest "Party Bus".
+    transport_rotation = ["Lyft", "Uber", "Party Bus", "Private SUV"]
+    transport_index = 0
+
+    def next_transport_slot() -> Optional[Dict[str, Any]]:
+        nonlocal transport_index, last_transport_name
+        # If we ever want to return real transport venues from venues.json again,
+        # we can fall back to pick_best_rotating here.
+        if transport_rotation:
+            name = transport_rotation[transport_index % len(transport_rotation)]
+            transport_index += 1
+            last_transport_name = name
+            return {"name": name, "category": "transport"}
+        # Fallback to venue-based transport list (not expected for now)
+        v = pick_best_rotating(transport, used_transport_names, transport_index, last_used_name=last_transport_name)
+        if v:
+            used_transport_names.add(v.get("name"))
+            last_transport_name = v.get("name")
+        return v
+
+    def add_slot(day: date, time_label: str, slot_type: str, venue: Optional[Dict[str, Any]]):
+        nonlocal slot_id
+        slot_id += 1
+        slots.append(
+            Slot(
+                id=f"s{slot_id}",
+                day=day.isoformat(),
+                day_label=fmt_day(day),
+                time=time_label,
+                type=slot_type,
+                venue=venue,
+            )
+        )
+
+    game_times_by_day = ["1:00 PM", "6:00 PM"]  # Day 2 = 1 PM, Day 3 = 6 PM
+
+    must_haves_set = set(must_haves or [])
+    placed_nice_dinner = False
+    placed_pool = False
+    placed_spa = False
+
+    # Pools that don't change from day to day, built once per plan.
+    high_tier_dining = [v for v in dining if (v.get("price_tier") or 0) >= 3] if "nice_dinner" in must_haves_set else []
+    spa_venues = pools.spa
+    pool_venues = pools.pool
+    bachelorette_activities: List[Dict[str, Any]] = []
+    if theme == "bachelorette":
+        bachelorette_activities = [v for v in (activities + pool_venues + shopping) if isinstance(v, Mapping) and bachelorette_ok_venue(v)]
+        if not bachelorette_activities:
+            bachelorette_activities = [{"name": "Hiking", "category": "activity"}, {"name": "Pool Day", "category": "pool"}, {"name": "Shopping at Fashion Square Mall", "category": "shopping"}, {"name": "Rancher Hat Bar", "category": "activity"}]
+    tournament_venues = pools.tournament
+    golf_entertainment = pools.golf_entertainment
+
+    for i, day in enumerate(days):
+        is_arrival_day = (day == arrival)
+        is_departure_day = (day == departure)
+        # Full days are days[1:-1] (none for trips of two days or fewer).
+        full_day_index = i - 1 if 0 < i < len(days) - 1 else -1
+
+        if is_arrival_day:
+            add_slot(day, "5:30 PM", "Welcome drinks at accommodations", {"name": "At your accommodations", "category": "welcome"})
+            # Must-have: one "nice dinner" from free text -> prefer high-tier dining
+            if "nice_dinner" in must_haves_set and not placed_nice_dinner:
+                dinner_venue = pick_best_rotating(high_tier_dining or dining, used_dining_names, i, last_used_name=last_dining_name)
+                if dinner_venue:
+                    placed_nice_dinner = True
+            else:
+                dinner_venue = pick_best_rotating(dining, used_dining_names, i, last_used_name=last_dining_name)
+            if dinner_venue:
+                used_dining_names.add(dinner_venue.get("name"))
+                last_dining_name = dinner_venue.get("name")
+
+            transport_venue = next_transport_slot()
+
+            add_slot(day, "6:00 PM", "Transportation", transport_venue)
+            add_slot(day, "7:30 PM", "Dinner", dinner_venue)
+
+            night_venue = pick_best_rotating(
+                nightlife, used_nightlife_names, i, last_used_name=last_nightlife_name
+            )
+            if night_venue:
+                used_nightlife_names.add(night_venue.get("name"))
+                last_nightlife_name = night_venue.get("name")
+            add_slot(day, "10:15 PM", "Nightlife", night_venue)
+
+            transport_venue2 = next_transport_slot()
+            add_slot(day, "11:30 PM", "Transportation", transport_venue2)
+            continue
+
+        if is_departure_day:
+            brunch_venue = pick_best_rotating(brunch, used_brunch_names, i, last_used_name=last_brunch_name)
+            if brunch_venue:
+                used_brunch_names.add(brunch_venue.get("name"))
+                last_brunch_name = brunch_venue.get("name")
+            add_slot(day, "9:00 AM", "Breakfast / Brunch", brunch_venue)
+
+            dep_transport = next_transport_slot()
+            add_slot(day, "10:30 AM", "Transportation (departure)", dep_transport)
+            continue
+
+        brunch_venue = pick_best_rotating(brunch, used_brunch_names, i, last_used_name=last_brunch_name)
+        if brunch_venue:
+            used_brunch_names.add(brunch_venue.get("name"))
+            last_brunch_name = brunch_venue.get("name")
+        add_slot(day, "10:00 AM", "Breakfast / Brunch", brunch_venue)
+
+        transport_am = next_transport_slot()
+        add_slot(day, "11:45 AM", "Transportation", transport_am)
+
+        if theme == "spring_training" and baseball_venues and 0 <= full_day_index < len(game_times_by_day):
+            game_time = game_times_by_day[full_day_index]
+            add_slot(day, game_time, "Baseball Game", pick_best(baseball_venues))
+        elif theme == "bachelorette":
+            # Must-haves from free text: prefer pool or spa on one day if requested
+            if "pool" in must_haves_set and not placed_pool and pool_venues:
+                act_venue = pick_best(pool_venues, exclude_names=used_activity_names)
+                if act_venue:
+                    placed_pool = True
+                    used_activity_names.add(act_venue.get("name"))
+                    last_activity_name = act_venue.get("name")
+            elif "spa" in must_haves_set and not placed_spa and spa_venues:
+                act_venue = pick_best(spa_venues, exclude_names=used_activity_names)
+                if act_venue:
+                    placed_spa = True
+                    used_activity_names.add(act_venue.get("name"))
+                    last_activity_name = act_venue.get("name")
+            else:
+                act_venue = None
+            if not act_venue:
+                act_venue = pick_best_rotating(bachelorette_activities, used_activity_names, i, last_used_name=last_activity_name)
+            if act_venue:
+                used_activity_names.add(act_venue.get("name"))
+                last_activity_name = act_venue.get("name")
+            add_slot(day, "12:30 PM", "Activity", act_venue)
+        elif theme == "wmpo":
+            # WM Phoenix Open theme: ALWAYS prioritize the actual tournament day
+            # over golf entertainment venues like PopStroke/Topgolf.
+            # CRITICAL: Always try tournament venues first, only fall back to
+            # golf entertainment if all tournament days are already used.
+            day_venue = None
+            if tournament_venues:
+                # Try to pick an unused tournament venue.
+                available_tournament = [
+                    v for v in tournament_venues if v.get("name") not in used_golf_names
+                ]
+                if available_tournament:
+                    day_venue = available_tournament[i % len(available_tournament)]
+                elif tournament_venues:
+                    # All tournament venues used, but still prefer tournament over golf entertainment.
+                    day_venue = tournament_venues[i % len(tournament_venues)]
+            
+            # Only if no tournament venues exist or all are exhausted, use golf entertainment.
+            if not day_venue and golf_entertainment:
+                day_venue = pick_best_rotating(
+                    golf_entertainment, used_golf_names, i, last_used_name=last_golf_name
+                )
+            
+            # Final fallback to generic activities.
+            if not day_venue:
+                day_venue = pick_best(activities)
+
+            if day_venue:
+                used_golf_names.add(day_venue.get("name"))
+                last_golf_name = day_venue.get("name")
+
+            is_tournament = "wmpo" in venue_labels(day_venue or {})
+            slot_label = (
+                "WM Phoenix Open — Tournament Day"
+                if is_tournament
+                else "Golf / WM Phoenix Open Day"
+            )
+            add_slot(day, "12:30 PM", slot_label, day_venue)
+        else:
+            add_slot(day, "12:30 PM", "Activity", pick_best(activities))
+
+        # Must-have: one "nice dinner" on a full day if not yet placed
+        if "nice_dinner" in must_haves_set and not placed_nice_dinner:
+            dinner_venue = pick_best_rotating(high_tier_dining or dining, used_dining_names, i, last_used_name=last_dining_name)
+            if dinner_venue:
+                placed_nice_dinner = True
+        else:
+            dinner_venue = pick_best_rotating(dining, used_dining_names, i, last_used_name=last_dining_name)
+        if dinner_venue:
+            used_dining_names.add(dinner_venue.get("name"))
+            last_dining_name = dinner_venue.get("name")
+        add_slot(day, "7:30 PM", "Dinner", dinner_venue)
+
+        night_venue = pick_best_rotating(nightlife, used_nightlife_names, i, last_used_name=last_nightlife_name)
+        if night_venue:
+            used_nightlife_names.add(night_venue.get("name"))
+            last_nightlife_name = night_venue.get("name")
+        add_slot(day, "10:15 PM", "Nightlife", night_venue)
+
+        transport_pm = next_transport_slot()
+        add_slot(day, "11:30 PM", "Transportation", transport_pm)
+
+    if objective is not None:
+        choices = {
+            "Breakfast / Brunch": brunch,
+            "Dinner": dining,
+            "Nightlife": nightlife,
+            "Activity": bachelorette_activities + spa_venues if theme == "bachelorette" else activities,
+        }
+        _beam_refine(venues, slots, choices, theme, variant, must_haves, objective)
+    add_travel_times_to_slots(slots, venues)
+    return slots
+
+
+def swap_alternatives(
+    venues: List[Dict[str, Any]],
+    theme: str,
+    vibes: List[str],
+    slot: Dict[str, Any],
+    k: int = 2,
+) -> List[Dict[str, Any]]:
+    venue = slot.get("venue") or {}
+    category = ""
+    slot_type = slot.get("type", "").lower()
+    if "breakfast" in slot_type or "brunch" in slot_type:
+        category = "brunch"
+    elif "dinner" in slot_type:
+        category = "dining"
+    elif "nightlife" in slot_type:
+        category = "nightlife"
+    elif "transport" in slot_type:
+        category = "transport"
+    else:
+        category = "activity"
+
+    # Special handling for WMPO tournament day swaps: include golf entertainment
+    # (PopStroke, Topgolf, Puttshack) and actual golf tee times as alternatives.
+    is_wmpo_tournament_swap = (
+        theme == "wmpo"
+        and ("wm phoenix open" in slot_type.lower() or "wmpo" in venue_labels(venue))
+    )
+
+    if is_wmpo_tournament_swap:
+        # Collect golf-related alternatives:
+        # 1) Golf entertainment venues (PopStroke, Topgolf, Puttshack)
+        golf_ent = [
+            v
+            for v in venue_index_for(venues).where(category="activity", theme=theme)
+            if (
+                vibe_mask_of(v) & GOLF_VIBE
+                or "golf_entertainment_or_putt" in venue_labels(v)
+            )
+        ]
+
+        # 2) Actual golf courses (category "golf" or venues with golf tee time vibes)
+        theme_bit = THEME_BITS.lookup([theme])
+        golf_courses = [
+            v
+            for v in venues
+            if isinstance(v, Mapping)
+            and (
+                (v.get("category") or "").lower() == "golf"
+                or (
+                    (v.get("category") or "").lower() == "activity"
+                    and vibe_mask_of(v) & GOLF_VIBE
+                    and theme_mask_of(v) & theme_bit
+                    and "golf_entertainment_or_putt" not in venue_labels(v)
+                )
+            )
+        ]
+
+        # Combine: golf entertainment first, then golf courses
+        cands = golf_ent + golf_courses
+        current_name = (venue.get("name") or "").strip()
+        exclude = {current_name} if current_name else set()
+
+        out = []
+        for v in cands:
+            if v.get("name") in exclude:
+                continue
+            out.append(v)
+            if len(out) >= k:
+                break
+
+        # If we still need more options, fall back to generic activity filtering
+        if len(out) < k:
+            fallback = filter_venues(venues, theme, vibes, "activity")
+            for v in fallback:
+                if v.get("name") in exclude or v in out:
+                    continue
+                out.append(v)
+                if len(out) >= k:
+                    break
+
+        return out
+
+    # Standard swap logic for non-WMPO tournament swaps
+    cands = filter_venues(venues, theme, vibes, category)
+    if theme == "bachelorette":
+        cands = [v for v in cands if bachelorette_ok_venue(v)]
+    current_name = (venue.get("name") or "").strip()
+    exclude = {current_name} if current_name else set()
+
+    out = []
+    for v in cands:
+        if v.get("name") in exclude:
+            continue
+        out.append(v)
+        if len(out) >= k:
+            break
+
+    if len(out) < k:
+        all_in_category = venue_index_for(venues).category(category)
+        if theme == "bachelorette":
+            all_in_category = [v for v in all_in_category if bachelorette_ok_venue(v)]
+        for v in all_in_category:
+            if v.get("name") in exclude or v in out:
+                continue
+            out.append(v)
+            if len(out) >= k:
+                break
+    return out
+
+
+def compare_plans(plan_a: List[Dict[str, Any]], plan_b: List[Dict[str, Any]], venues: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compare Plan A and Plan B to generate trade-off metrics.
+    Returns a dict with comparison data.
+    """
+    index = venue_index_for(venues)
+    travel = travel_matrix_for(venues)
+
+    def get_venue_price_tier(slot: Dict[str, Any]) -> int:
+        venue = slot.get("venue") or {}
+        venue_name = venue.get("name", "")
+        if not venue_name:
+            return 0
+        v = index.by_name(venue_name)
+        return v.get("price_tier", 0) if v else 0
+    
+    def calculate_avg_price_tier(plan: List[Dict[str, Any]]) -> float:
+        price_tiers = [get_venue_price_tier(slot) for slot in plan if slot.get("venue")]
+        if not price_tiers:
+            return 0.0
+        return sum(price_tiers) / len(price_tiers)
+    
+    def count_venue_types(plan: List[Dict[str, Any]]) -> Dict[str, int]:
+        counts = {}
+        for slot in plan:
+            venue = slot.get("venue") or {}
+            category = venue.get("category", "")
+            if category:
+                counts[category] = counts.get(category, 0) + 1
+        return counts
+    
+    avg_tier_a = calculate_avg_price_tier(plan_a)
+    avg_tier_b = calculate_avg_price_tier(plan_b)
+    
+    venues_a = count_venue_types(plan_a)
+    venues_b = count_venue_types(plan_b)
+    
+    # Estimate budget difference (rough: higher price_tier = higher cost)
+    budget_diff_per_person = int((avg_tier_a - avg_tier_b) * 50)  # Rough estimate
+    
+    return {
+        "plan_a_avg_price_tier": round(avg_tier_a, 1),
+        "plan_b_avg_price_tier": round(avg_tier_b, 1),
+        "plan_a_drive_minutes": _plan_drive_minutes(plan_a, index, travel),
+        "plan_b_drive_minutes": _plan_drive_minutes(plan_b, index, travel),
+        "budget_difference_per_person": budget_diff_per_person,
+        "plan_a_label": "Premium Experience",
+        "plan_b_label": "Balanced & Value",
+        "key_differences": [
+            f"Plan A focuses on higher-end venues (avg tier {avg_tier_a:.1f})",
+            f"Plan B balances quality and value (avg tier {avg_tier_b:.1f})",
+            f"Estimated difference: ${abs(budget_diff_per_person)}/person" if budget_diff_per_person != 0 else "Similar budget impact",
+        ],
+    }
@@ -0,0 +1,57 @@
+import os
+from collections.abc import Mapping
+from typing import FrozenSet, Optional
+
+from records import VIBE_BITS, Venue
+from venue_rules import category_reservation_providers, venue_name_labels
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def venues_json_path() -> Optional[str]:
+    path = os.path.join(_REPO_DIR, "venues.json")
+    if not os.path.exists(path):
+        path = os.path.join(os.getcwd(), "venues.json")
+    return path if os.path.exists(path) else None
+
+
+TEAM_OPTIONS = [
+    {"key": "dbacks", "label": "Diamondbacks", "logo": "assets/dbacks.png"},
+    {"key": "rockies", "label": "Rockies", "logo": "assets/rockies.png"},
+    {"key": "cubs", "label": "Cubs", "logo": "assets/cubs.png"},
+    {"key": "as", "label": "A's", "logo": "assets/as.png"},
+    {"key": "giants", "label": "SF Giants", "logo": "assets/giants.png"},
+]
+TEAM_KEY_TO_VENUE_NAMES = {
+    "dbacks": ["AZ Diamondbacks"],
+    "rockies": ["CO Rockies"],
+    "cubs": ["Chicago Cubs"],
+    "as": ["A's"],
+    "giants": ["SF Giants"],
+}
+
+
+def team_label_from_key(key: str) -> str:
+    for t in TEAM_OPTIONS:
+        if t["key"] == key:
+            return t["label"]
+    return key
+
+
+def venue_labels(venue: Mapping) -> FrozenSet[str]:
+    """Name labels of a venue: precomputed on catalog records, matched by name otherwise."""
+    if type(venue) is Venue:
+        return venue.name_labels
+    return venue_name_labels(venue.get("name"))
+
+
+def venue_booking_hint(venue: Mapping, category: Optional[str] = None) -> str:
+    """category_reservation_providers for a venue (category defaults to its own), precomputed for catalog records."""
+    if type(venue) is Venue and category in (None, venue.category):
+        return venue.booking_hint
+    return category_reservation_providers(venue.get("category", "") if category is None else category, venue.get("name", ""))
+
+
+# Vibe bitmasks (see records.BitVocabulary) for venue membership tests.
+GOLF_VIBE = VIBE_BITS.bit("golf")
+BASEBALL_VIBE = VIBE_BITS.bit("baseball")
@@ -0,0 +1,307 @@
+import sys
+import threading
+import weakref
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, Optional, Tuple
+
+from venue_rules import VENUE_NAME_MATCHER, category_reservation_providers
+
+
+_MISSING = object()
+
+
+class BitVocabulary:
+    """
+    Append-only term -> bit map shared by the whole process. A term keeps its
+    bit for the life of the process, so masks computed for one catalog stay
+    valid after a reload adds new terms.
+    """
+
+    def __init__(self) -> None:
+        self._bits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def bit(self, term: str) -> int:
+        b = self._bits.get(term)
+        if b is None:
+            with self._lock:
+                b = self._bits.setdefault(term, 1 << len(self._bits))
+        return b
+
+    def mask(self, terms: Iterable[str]) -> int:
+        """Mask for catalog terms, assigning bits to new ones."""
+        m = 0
+        for t in terms:
+            m |= self.bit(t)
+        return m
+
+    def lookup(self, terms: Iterable[str]) -> int:
+        """Mask for query terms; unknown terms contribute nothing (and get no bit)."""
+        m = 0
+        for t in terms:
+            m |= self._bits.get(t, 0)
+        return m
+
+
+VIBE_BITS = BitVocabulary()
+THEME_BITS = BitVocabulary()
+TEAM_BITS = BitVocabulary()
+
+# Vibes that keep a venue out of bachelorette activity slots.
+_NOT_BACHELORETTE_VIBES = VIBE_BITS.bit("golf") | VIBE_BITS.bit("baseball")
+
+
+def _vibe_terms(vibes: Iterable[Any]) -> Iterator[str]:
+    return (str(x).lower() for x in vibes)
+
+
+def _theme_terms(themes: Iterable[Any]) -> Iterator[str]:
+    return (str(x).strip().lower() for x in themes)
+
+
+def _tuple_mask(vocab: BitVocabulary, terms: Tuple[str, ...], normalize: Any) -> int:
+    key = (id(vocab), terms)
+    m = _MASKS.get(key)
+    if m is None:
+        m = _MASKS.setdefault(key, vocab.mask(normalize(terms)))
+    return m
+
+
+def vibe_mask_of(v: Mapping) -> int:
+    if isinstance(v, Venue):
+        return v.vibe_mask
+    return VIBE_BITS.mask(_vibe_terms(v.get("vibes") or ()))
+
+
+def theme_mask_of(v: Mapping) -> int:
+    if isinstance(v, Venue):
+        return v.theme_mask
+    return THEME_BITS.mask(_theme_terms(v.get("themes") or ()))
+
+
+def team_mask_of(v: Mapping) -> int:
+    if isinstance(v, Venue):
+        return v.team_mask
+    return TEAM_BITS.mask(str(x) for x in (v.get("teams") or ()))
+
+
+# Venues share a small number of distinct vibe/theme/team lists; each one is
+# interned (and its mask computed) once and then shared by every venue using it.
+_TUPLES: Dict[Tuple[Any, ...], Tuple[str, ...]] = {}
+_MASKS: Dict[Tuple[int, Tuple[str, ...]], int] = {}
+
+
+_LABEL_SETS: Dict[FrozenSet[str], FrozenSet[str]] = {}
+
+
+def _intern_labels(labels: FrozenSet[str]) -> FrozenSet[str]:
+    return _LABEL_SETS.setdefault(labels, labels)
+
+
+def _intern_all(values: Iterable[Any]) -> Tuple[str, ...]:
+    key = values if isinstance(values, tuple) else tuple(values)
+    t = _TUPLES.get(key)
+    if t is None:
+        t = _TUPLES.setdefault(key, tuple(sys.intern(str(x)) for x in key))
+    return t
+
+
+class Venue(Mapping):
+    """
+    Catalog venue with fixed slots instead of a per-record dict. Shared by
+    every session, so treat it as read-only (it has no __setitem__).
+
+    It is a Mapping with the same keys, in the same order, that
+    normalize_venues produces (lat/lon/area only when present), so
+    v.get("vibes"), v["name"], dict(v) and {**v} keep working. Catalog strings
+    (category, vibes, themes, teams, area) are interned, and list fields are
+    tuples. Use dict(v) for a mutable copy.
+
+    vibe_mask / theme_mask / team_mask encode the lists against the
+    process-wide bit vocabularies, so membership tests are a bitwise AND.
+    name_labels (venue_rules.VENUE_NAME_KEYWORDS found in the name),
+    bachelorette_ok and booking_hint are derived once, when the record is
+    built at catalog load.
+    """
+
+    _KEYS = ("id", "name", "category", "price_tier", "vibes", "themes", "teams", "lat", "lon", "area")
+    __slots__ = _KEYS + (
+        "vibe_mask", "theme_mask", "team_mask", "name_labels", "bachelorette_ok", "booking_hint", "__weakref__",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        category: str,
+        price_tier: Any = 0,
+        vibes: Iterable[str] = (),
+        themes: Iterable[str] = (),
+        teams: Iterable[str] = (),
+        lat: Any = _MISSING,
+        lon: Any = _MISSING,
+        area: Any = _MISSING,
+    ):
+        self.id = sys.intern(str(id))
+        self.name = str(name)
+        self.category = sys.intern(str(category))
+        self.price_tier = price_tier
+        self.vibes = _intern_all(vibes)
+        self.themes = _intern_all(themes)
+        self.teams = _intern_all(teams)
+        self.lat = lat
+        self.lon = lon
+        self.area = sys.intern(str(area)) if area is not _MISSING else _MISSING
+        self.vibe_mask = _tuple_mask(VIBE_BITS, self.vibes, _vibe_terms)
+        self.theme_mask = _tuple_mask(THEME_BITS, self.themes, _theme_terms)
+        self.team_mask = _tuple_mask(TEAM_BITS, self.teams, iter)
+        self.name_labels: FrozenSet[str] = _intern_labels(VENUE_NAME_MATCHER.labels(self.name))
+        self.bachelorette_ok = "not_bachelorette" not in self.name_labels and not self.vibe_mask & _NOT_BACHELORETTE_VIBES
+        self.booking_hint = sys.intern(category_reservation_providers(self.category, self.name, self.name_labels))
+
+    @classmethod
+    def from_dict(cls, v: Mapping) -> "Venue":
+        if isinstance(v, Venue):
+            return v
+        return cls(**{k: v[k] for k in cls._KEYS if k in v})
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._KEYS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (k for k in self._KEYS if getattr(self, k) is not _MISSING)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        # id, name, category, ... are always set, so skip counting keys for
+        # the `slot.get("venue") or {}` idiom.
+        return True
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._KEYS and getattr(self, key) is not _MISSING  # type: ignore[arg-type]
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, k) for k in self._KEYS)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Venue):
+            return self._values() == other._values()
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __copy__(self) -> "Venue":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "Venue":
+        return self
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (Venue.from_dict, (dict(self),))
+
+
+# Latest record for every venue id of the live catalog (registered by the
+# app's CatalogWatcher on each swap, never by other Catalog builds), so a
+# slot resolves to the current record after a reload changes its venue.
+# Values are weak: once no catalog (or slot) holds a record, its entry goes
+# away, so hot reloads don't grow the registry. Each slot also keeps the
+# record it was given, so it still resolves after its venue leaves the
+# catalog.
+_VENUES_BY_ID: "weakref.WeakValueDictionary[str, Venue]" = weakref.WeakValueDictionary()
+
+
+def register_venues(venues: Iterable[Venue]) -> None:
+    for v in venues:
+        _VENUES_BY_ID[v.id] = v
+
+
+def venue_for_id(venue_id: Optional[str]) -> Optional[Venue]:
+    return _VENUES_BY_ID.get(venue_id) if venue_id else None
+
+
+class Slot(MutableMapping):
+    """
+    One itinerary slot, stored per session with fixed slots.
+
+    Live catalog venues are held by id and resolved through the registry
+    (venue_for_id), falling back to the record the slot was given; ad-hoc
+    venues that aren't catalog records, e.g. {"name": "At your
+    accommodations", ...}, are kept inline. It behaves like
+    the slot dicts it replaces: slot["venue"], slot.get("time"),
+    slot["travel_minutes"] = 12, and any other key lands in a small extras
+    dict.
+    """
+
+    __slots__ = ("id", "day", "day_label", "time", "type", "venue_id", "_venue", "_extra")
+    _KEYS = ("id", "day", "day_label", "time", "type", "venue")
+
+    def __init__(self, id: str, day: str, day_label: str, time: str, type: str, venue: Optional[Mapping] = None):
+        self.id = id
+        self.day = sys.intern(day)
+        self.day_label = sys.intern(day_label)
+        self.time = sys.intern(time)
+        self.type = sys.intern(type)
+        self._extra: Optional[Dict[str, Any]] = None
+        self._set_venue(venue)
+
+    def _set_venue(self, venue: Optional[Mapping]) -> None:
+        if isinstance(venue, Venue) and _VENUES_BY_ID.get(venue.id) is venue:
+            self.venue_id: Optional[str] = venue.id
+        else:
+            self.venue_id = None
+        self._venue: Optional[Mapping] = venue
+
+    @property
+    def venue(self) -> Optional[Mapping]:
+        if self.venue_id is not None:
+            current = _VENUES_BY_ID.get(self.venue_id)
+            if current is not None:
+                return current
+        return self._venue
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "venue":
+            return self.venue
+        if key in self._KEYS:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "venue":
+            self._set_venue(value)
+        elif key in self._KEYS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._KEYS
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return len(self._KEYS) + len(self._extra or ())
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from trip_store import open_trip_store
+
+THREADS = 16
+VOTERS = 200
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+@pytest.mark.parametrize("shared_store", [True, False], ids=["shared-store", "store-per-vote"])
+def test_concurrent_votes_are_not_lost(tmp_path, backend, shared_store):
+    store = open_trip_store(backend, str(tmp_path))
+    store.save("stress", {"trip_id": "stress", "votes": []})
+
+    def _vote(n: int) -> bool:
+        # A fresh store per vote stands in for other processes: nothing is
+        # shared in memory, so only the file lock / SQLite transaction orders
+        # the writes.
+        target = store if shared_store else open_trip_store(backend, str(tmp_path))
+        return target.record_vote("stress", {"voter_name": f"voter-{n}", "vibes": ["party"]})
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        accepted = sum(pool.map(_vote, range(VOTERS)))
+
+    votes = (open_trip_store(backend, str(tmp_path)).load("stress") or {}).get("votes", [])
+    assert accepted == VOTERS
+    assert sorted(v["voter_name"] for v in votes) == sorted(f"voter-{n}" for n in range(VOTERS))
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_concurrent_revotes_keep_one_vote_per_voter(tmp_path, backend):
+    store = open_trip_store(backend, str(tmp_path))
+    store.save("stress", {"trip_id": "stress", "votes": []})
+
+    def _vote(n: int) -> bool:
+        name = f"Voter-{n % 20}" if n % 2 else f"voter-{n % 20}"
+        return store.record_vote("stress", {"voter_name": name, "vibes": ["party"]})
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        assert all(pool.map(_vote, range(VOTERS)))
+
+    votes = store.load("stress")["votes"]
+    assert sorted(v["voter_name"].lower() for v in votes) == sorted(f"voter-{n}" for n in range(20))
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_vote_on_missing_trip_is_rejected(tmp_path, backend):
+    store = open_trip_store(backend, str(tmp_path))
+    assert store.record_vote("nope", {"voter_name": "a"}) is False
+    assert store.load("nope") is None
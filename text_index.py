@@ -0,0 +1,110 @@
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Set
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+GRAM = 3
+
+
+def venue_search_text(v: Mapping) -> str:
+    """The text must-have filtering searches: name, category, vibes and themes, lowercased."""
+    return f"{v.get('name','')} {v.get('category','')} {' '.join(v.get('vibes', []))} {' '.join(v.get('themes', []))}".lower()
+
+
+def tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class TextIndex:
+    """
+    Inverted index over a list of lowercased texts (doc id = list position).
+
+    Two posting maps are built once:
+      - every substring of up to GRAM characters -> doc ids, so
+        containing(s) answers "s in text" exactly: short strings are a
+        single lookup, longer ones intersect their n-gram postings and
+        verify the few candidates
+      - word tokens -> doc ids, for whole-word free-text search()
+    """
+
+    def __init__(self, texts: Iterable[str]):
+        self.texts: List[str] = list(texts)
+        self._grams: Dict[str, Set[int]] = {}
+        self._tokens: Dict[str, Set[int]] = {}
+        for i, text in enumerate(self.texts):
+            seen = set()
+            for n in range(1, GRAM + 1):
+                for j in range(len(text) - n + 1):
+                    seen.add(text[j:j + n])
+            for g in seen:
+                self._grams.setdefault(g, set()).add(i)
+            for tok in set(tokens(text)):
+                self._tokens.setdefault(tok, set()).add(i)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def containing(self, sub: str) -> Set[int]:
+        """Doc ids whose text contains sub (plain substring test, like `sub in text`)."""
+        if not sub:
+            return set(range(len(self.texts)))
+        if len(sub) <= GRAM:
+            return set(self._grams.get(sub, ()))
+        postings = []
+        for j in range(len(sub) - GRAM + 1):
+            p = self._grams.get(sub[j:j + GRAM])
+            if not p:
+                return set()
+            postings.append(p)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates &= p
+            if not candidates:
+                return candidates
+        return {i for i in candidates if sub in self.texts[i]}
+
+    def containing_any(self, subs: Iterable[str]) -> List[int]:
+        """Sorted doc ids containing at least one of subs (a union of posting lists)."""
+        hits: Set[int] = set()
+        for s in subs:
+            hits |= self.containing(s)
+        return sorted(hits)
+
+    def search(self, query: str) -> List[int]:
+        """Sorted doc ids sharing at least one whole word with query."""
+        hits: Set[int] = set()
+        for tok in set(tokens(query)):
+            hits |= self._tokens.get(tok, set())
+        return sorted(hits)
+
+
+class VenueTextIndex(TextIndex):
+    """TextIndex over venue_search_text for a venue list; hits map back to venues."""
+
+    def __init__(self, venues: Sequence[Mapping]):
+        self.venues = venues
+        super().__init__(venue_search_text(v) for v in venues)
+
+    def venues_at(self, ids: Iterable[int]) -> List[Any]:
+        return [self.venues[i] for i in ids]
+
+
+# Most recently used indexes for tuples (the shared catalog), by id; the
+# index holds its tuple, so the id can't be reused while the entry lives.
+_INDEXES: "OrderedDict[int, VenueTextIndex]" = OrderedDict()
+_MAX_INDEXES = 4
+
+
+def text_index_for(venues: Sequence[Mapping]) -> VenueTextIndex:
+    """Index for this venue list; cached for tuples, rebuilt for lists (they may change)."""
+    if not isinstance(venues, tuple):
+        return VenueTextIndex(venues)
+    index = _INDEXES.get(id(venues))
+    if index is not None and index.venues is venues:
+        _INDEXES.move_to_end(id(venues))
+        return index
+    index = _INDEXES[id(venues)] = VenueTextIndex(venues)
+    while len(_INDEXES) > _MAX_INDEXES:
+        _INDEXES.popitem(last=False)
+    return index
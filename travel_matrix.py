@@ -0,0 +1,207 @@
+import math
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from records import Venue
+
+EARTH_RADIUS_MILES = 3959
+DRIVE_MPH = 25.0  # rough metro-area average
+MIN_DRIVE_MINUTES = 5
+TRAVEL_SUFFIX = ".travel.npz"
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance between two points in miles (Haversine)."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlam = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_MILES * c
+
+
+def drive_minutes(miles: float) -> int:
+    """Rough drive time in minutes (~25 mph avg in metro area)."""
+    if miles <= 0:
+        return 0
+    return max(MIN_DRIVE_MINUTES, int(round((miles / DRIVE_MPH) * 60)))
+
+
+def haversine_matrix(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Pairwise haversine_miles over coordinate arrays (float64, n x n)."""
+    phi = np.radians(lat)
+    dphi = np.radians(lat[None, :] - lat[:, None])
+    dlam = np.radians(lon[None, :] - lon[:, None])
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(dlam / 2) ** 2
+    return EARTH_RADIUS_MILES * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+
+
+def drive_minutes_matrix(miles: np.ndarray) -> np.ndarray:
+    """drive_minutes applied elementwise."""
+    return np.where(miles > 0, np.maximum(MIN_DRIVE_MINUTES, np.round(miles / DRIVE_MPH * 60)), 0.0)
+
+
+def venue_coords(venue: object) -> Optional[Tuple[float, float]]:
+    """(lat, lon) if venue is a mapping with usable coordinates, else None."""
+    if not isinstance(venue, Mapping):
+        return None
+    lat, lon = venue.get("lat"), venue.get("lon")
+    if lat is not None and lon is not None:
+        try:
+            return (float(lat), float(lon))
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+def _venue_id(venue: Mapping) -> Any:
+    # Catalog venues are records.Venue; skip Mapping.get on the hot path.
+    return venue.id if type(venue) is Venue else venue.get("id")
+
+
+class TravelMatrix:
+    """
+    Pairwise distances and drive-time estimates between the located venues
+    of a catalog.
+
+    miles and minutes are float32 (n x n) matrices over the venues that have
+    lat/lon, in catalog order; pos maps venue id -> row. Venues without
+    coordinates get no row at all, so the matrix is only as big as the set
+    of venues it can measure. Built with NumPy when the catalog is (re)loaded
+    (minutes are rounded from the float64 distances, so they match
+    drive_minutes(haversine_miles(...)) exactly) and can be saved next to the
+    catalog snapshot.
+    """
+
+    def __init__(self, ids: Sequence[str], miles: np.ndarray, minutes: np.ndarray):
+        self.ids: List[str] = list(ids)
+        self.pos: Dict[str, int] = {}
+        for i, vid in enumerate(self.ids):
+            self.pos.setdefault(vid, i)
+        self.miles = miles
+        self.minutes = minutes
+
+    @staticmethod
+    def located(venues: Sequence[Mapping]) -> List[Tuple[str, float, float]]:
+        """(id, lat, lon) for every venue with coordinates, in order."""
+        out = []
+        for v in venues:
+            coords = venue_coords(v)
+            if coords is not None:
+                out.append((str(v.get("id", "")), coords[0], coords[1]))
+        return out
+
+    @classmethod
+    def from_venues(cls, venues: Sequence[Mapping]) -> "TravelMatrix":
+        located = cls.located(venues)
+        lat = np.array([c[1] for c in located], dtype=np.float64)
+        lon = np.array([c[2] for c in located], dtype=np.float64)
+        miles = haversine_matrix(lat, lon)
+        return cls(
+            [c[0] for c in located],
+            miles.astype(np.float32),
+            drive_minutes_matrix(miles).astype(np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, venue: object) -> bool:
+        """Whether venue has a row (is a located catalog venue)."""
+        return isinstance(venue, Mapping) and _venue_id(venue) in self.pos
+
+    def position(self, venue: Optional[Mapping]) -> Optional[int]:
+        """Row of a located catalog venue, else None."""
+        if venue is None:
+            return None
+        return self.pos.get(_venue_id(venue))
+
+    def minutes_between(self, a: Optional[Mapping], b: Optional[Mapping]) -> Optional[int]:
+        """Drive minutes between two located catalog venues, else None."""
+        if a is None or b is None:
+            return None
+        pos = self.pos
+        i, j = pos.get(_venue_id(a)), pos.get(_venue_id(b))
+        if i is None or j is None:
+            return None
+        return int(self.minutes.item(i, j))
+
+    def save(self, path: str, source_hash: str) -> None:
+        """Write the matrix atomically (uncompressed .npz, no pickles)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                ids=np.array(self.ids, dtype=str),
+                miles=self.miles,
+                minutes=self.minutes,
+                source=np.array(source_hash),
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, venues: Sequence[Mapping], expected_hash: str) -> Optional["TravelMatrix"]:
+        """Saved matrix for exactly these venues (same located ids, same order, same source hash), else None."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["source"]) != expected_hash:
+                    return None
+                ids = data["ids"].tolist()
+                if ids != [c[0] for c in cls.located(venues)]:
+                    return None
+                return cls(ids, data["miles"], data["minutes"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def travel_path_for(snapshot_path: str) -> str:
+    """venues.catalog.bin -> venues.catalog.travel.npz, next to the catalog snapshot."""
+    return os.path.splitext(snapshot_path)[0] + TRAVEL_SUFFIX
+
+
+# Matrices for the most recent catalog tuples, by id; the entry holds its
+# tuple, so the id can't be reused while the entry lives. Only catalogs
+# that were registered (CatalogWatcher does it on every reload) have one.
+_MATRICES: "OrderedDict[int, tuple]" = OrderedDict()
+_MAX_MATRICES = 4
+
+
+def register_travel_matrix(venues: tuple, matrix: TravelMatrix) -> None:
+    """Use matrix for travel lookups against this catalog tuple."""
+    _MATRICES[id(venues)] = (venues, matrix)
+    _MATRICES.move_to_end(id(venues))
+    while len(_MATRICES) > _MAX_MATRICES:
+        _MATRICES.popitem(last=False)
+
+
+def travel_matrix_for(venues: Sequence[Mapping]) -> Optional[TravelMatrix]:
+    """
+    The registered matrix for this catalog tuple, else None. Never builds
+    one: ad-hoc lists and unregistered catalogs use per-pair haversine
+    (drive_minutes_between), which is cheaper than an n x n build per call.
+    """
+    entry = _MATRICES.get(id(venues))
+    if entry is not None and entry[0] is venues:
+        return entry[1]
+    return None
+
+
+def drive_minutes_between(travel: Optional[TravelMatrix], a: Optional[Mapping], b: Optional[Mapping]) -> Optional[int]:
+    """Matrix lookup when both venues have a row, else haversine on their own lat/lon (None if either has none)."""
+    if travel is not None:
+        minutes = travel.minutes_between(a, b)
+        if minutes is not None:
+            return minutes
+    a_coords = venue_coords(a)
+    if a_coords is None:
+        return None
+    b_coords = venue_coords(b)
+    if b_coords is None:
+        return None
+    return drive_minutes(haversine_miles(a_coords[0], a_coords[1], b_coords[0], b_coords[1]))
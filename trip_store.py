@@ -0,0 +1,371 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only.
+    fcntl = None
+
+
+def _copy_json(obj: Any) -> Any:
+    """Cheap deep copy for JSON-shaped data (dict/list/scalars)."""
+    if isinstance(obj, dict):
+        return {k: _copy_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_json(v) for v in obj]
+    return obj
+
+
+def _voter_key(vote: Dict[str, Any]) -> str:
+    return (vote.get("voter_name") or "").strip().lower()
+
+
+class TripStore:
+    """
+    Storage backend interface for trips. Backends: JsonTripStore (default,
+    one file per trip) and SqliteTripStore (single WAL-mode database).
+    """
+
+    def save(self, trip_id: str, trip_data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def load(self, trip_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def update(self, trip_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        """
+        Atomic read-modify-write: applies mutate(trip) in place and saves.
+        Returns the saved trip, or None if the trip doesn't exist.
+        """
+        raise NotImplementedError
+
+    def trip_ids(self) -> List[str]:
+        raise NotImplementedError
+
+    def record_vote(self, trip_id: str, vote: Dict[str, Any]) -> bool:
+        """Add a vote, replacing any earlier vote from the same voter (case-insensitive name)."""
+        def _apply(trip: Dict[str, Any]) -> None:
+            votes = trip.setdefault("votes", [])
+            key = _voter_key(vote)
+            for idx, existing in enumerate(votes):
+                if _voter_key(existing) == key:
+                    votes[idx] = vote
+                    return
+            votes.append(vote)
+
+        return self.update(trip_id, _apply) is not None
+
+
+class JsonTripStore(TripStore):
+    """
+    Trip repository over one JSON file per trip (trips/<trip_id>.json).
+
+    Reads go through a bounded LRU cache keyed by trip_id. Each entry remembers
+    the file's (inode, mtime_ns, size) and is only served while the file still
+    matches, so edits from other processes are picked up on the next read.
+    Writes drop the cached entry. Callers always get their own copy, so
+    mutating a loaded trip never leaks into the cache.
+
+    Writes go to a temp file that is renamed over the trip file, so a crash
+    never leaves a truncated trip behind. Read-modify-write (votes, reconciled
+    preferences) runs under a per-trip lock: a thread lock within the process
+    plus an flock on trips/<trip_id>.lock across processes. The thread locks
+    are a fixed pool of lock_stripes locks picked by hashing the trip id, so
+    their number doesn't grow with the trips seen (two trips on one stripe
+    just take turns).
+    """
+
+    def __init__(self, trips_dir: str, cache_size: int = 256, lock_stripes: int = 64):
+        self.trips_dir = trips_dir
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._trip_locks: List[threading.Lock] = [threading.Lock() for _ in range(max(1, lock_stripes))]
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(trips_dir, exist_ok=True)
+
+    def path(self, trip_id: str) -> str:
+        return os.path.join(self.trips_dir, f"{trip_id}.json")
+
+    def save(self, trip_id: str, trip_data: Dict[str, Any]) -> None:
+        """Atomically replace the trip file (write temp file, fsync, rename)."""
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{trip_id}.", suffix=".tmp", dir=self.trips_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(trip_data, f, indent=2, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path(trip_id))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        finally:
+            self.invalidate(trip_id)
+
+    @contextmanager
+    def locked(self, trip_id: str) -> Iterator[None]:
+        """Hold the per-trip lock (threads in this process + other processes)."""
+        thread_lock = self._trip_locks[zlib.crc32(trip_id.encode("utf-8")) % len(self._trip_locks)]
+        with thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.trips_dir, f"{trip_id}.lock"), "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def update(self, trip_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        """Locked read-modify-write; re-reads the trip from disk, never the cache."""
+        if not os.path.exists(self.path(trip_id)):
+            return None
+        with self.locked(trip_id):
+            trip = self._read(trip_id)
+            if trip is None:
+                return None
+            mutate(trip)
+            self.save(trip_id, trip)
+            return trip
+
+    def trip_ids(self) -> List[str]:
+        return sorted(
+            name[: -len(".json")]
+            for name in os.listdir(self.trips_dir)
+            if name.endswith(".json") and not name.startswith(".")
+        )
+
+    def _read(self, trip_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(trip_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def load(self, trip_id: str) -> Optional[Dict[str, Any]]:
+        trip_file = self.path(trip_id)
+        try:
+            stat = os.stat(trip_file)
+        except OSError:
+            self.invalidate(trip_id)
+            return None
+        # Atomic saves swap in a new inode, so include it alongside mtime/size
+        # in case two writes land within the filesystem's timestamp granularity.
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._cache.get(trip_id)
+            if entry is not None and entry[0] == stamp:
+                self._cache.move_to_end(trip_id)
+                self.hits += 1
+                return _copy_json(entry[1])
+
+        data = self._read(trip_id)
+        if data is None:
+            return None
+
+        with self._lock:
+            self.misses += 1
+            self._cache[trip_id] = (stamp, data)
+            self._cache.move_to_end(trip_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return _copy_json(data)
+
+    def invalidate(self, trip_id: str) -> None:
+        with self._lock:
+            self._cache.pop(trip_id, None)
+
+
+class SqliteTripStore(TripStore):
+    """
+    Trips in a single SQLite database (WAL mode, one connection per thread).
+
+    Tables are normalized: ``trips`` holds one row per trip with the queryable
+    fields as columns (indexed on created_at) plus the remaining trip document
+    as JSON, and ``votes`` holds one row per voter (indexed on trip_id, unique
+    per voter name). A vote is a single upsert, so concurrent voters never
+    contend on a whole-trip rewrite.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS trips (
+        trip_id TEXT PRIMARY KEY,
+        created_at TEXT,
+        theme TEXT,
+        arrival TEXT,
+        departure TEXT,
+        group_size INTEGER,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_trips_created_at ON trips(created_at);
+    CREATE TABLE IF NOT EXISTS votes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        trip_id TEXT NOT NULL REFERENCES trips(trip_id) ON DELETE CASCADE,
+        voter_key TEXT NOT NULL,
+        voter_name TEXT,
+        vibes TEXT,
+        free_text TEXT,
+        submitted_at TEXT,
+        UNIQUE (trip_id, voter_key)
+    );
+    CREATE INDEX IF NOT EXISTS idx_votes_trip_id ON votes(trip_id);
+    """
+
+    UPSERT_VOTE = """
+    INSERT INTO votes (trip_id, voter_key, voter_name, vibes, free_text, submitted_at)
+    SELECT ?, ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM trips WHERE trip_id = ?)
+    ON CONFLICT (trip_id, voter_key) DO UPDATE SET
+        voter_name = excluded.voter_name,
+        vibes = excluded.vibes,
+        free_text = excluded.free_text,
+        submitted_at = excluded.submitted_at
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; writes open explicit BEGIN IMMEDIATE transactions.
+            conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _vote_params(self, trip_id: str, vote: Dict[str, Any]) -> Tuple[Any, ...]:
+        return (
+            trip_id,
+            _voter_key(vote),
+            vote.get("voter_name"),
+            json.dumps(vote.get("vibes") or []),
+            vote.get("free_text"),
+            vote.get("submitted_at"),
+            trip_id,
+        )
+
+    def _save(self, conn: sqlite3.Connection, trip_id: str, trip_data: Dict[str, Any]) -> None:
+        # Round-trip through JSON so stored values match the file backend (default=str).
+        doc = json.loads(json.dumps(trip_data, default=str))
+        votes = doc.get("votes") or []
+        if "votes" in doc:
+            doc["votes"] = None  # keeps the key's position; rows live in the votes table
+        conn.execute(
+            "INSERT INTO trips (trip_id, created_at, theme, arrival, departure, group_size, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (trip_id) DO UPDATE SET created_at = excluded.created_at, theme = excluded.theme, "
+            "arrival = excluded.arrival, departure = excluded.departure, "
+            "group_size = excluded.group_size, data = excluded.data",
+            (
+                trip_id,
+                doc.get("created_at"),
+                doc.get("theme"),
+                doc.get("arrival"),
+                doc.get("departure"),
+                doc.get("group_size"),
+                json.dumps(doc),
+            ),
+        )
+        conn.execute("DELETE FROM votes WHERE trip_id = ?", (trip_id,))
+        conn.executemany(self.UPSERT_VOTE, [self._vote_params(trip_id, v) for v in votes])
+
+    def _load(self, conn: sqlite3.Connection, trip_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute("SELECT data FROM trips WHERE trip_id = ?", (trip_id,)).fetchone()
+        if row is None:
+            return None
+        trip = json.loads(row[0])
+        votes = [
+            {
+                "voter_name": voter_name,
+                "vibes": json.loads(vibes or "[]"),
+                "free_text": free_text,
+                "submitted_at": submitted_at,
+            }
+            for voter_name, vibes, free_text, submitted_at in conn.execute(
+                "SELECT voter_name, vibes, free_text, submitted_at FROM votes WHERE trip_id = ? ORDER BY id",
+                (trip_id,),
+            )
+        ]
+        if "votes" in trip or votes:
+            trip["votes"] = votes
+        return trip
+
+    def save(self, trip_id: str, trip_data: Dict[str, Any]) -> None:
+        with self._transaction() as conn:
+            self._save(conn, trip_id, trip_data)
+
+    def load(self, trip_id: str) -> Optional[Dict[str, Any]]:
+        return self._load(self._conn(), trip_id)
+
+    def update(self, trip_id: str, mutate: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        with self._transaction() as conn:
+            trip = self._load(conn, trip_id)
+            if trip is None:
+                return None
+            mutate(trip)
+            self._save(conn, trip_id, trip)
+            return trip
+
+    def record_vote(self, trip_id: str, vote: Dict[str, Any]) -> bool:
+        with self._transaction() as conn:
+            cur = conn.execute(self.UPSERT_VOTE, self._vote_params(trip_id, vote))
+            return cur.rowcount > 0
+
+    def trip_ids(self) -> List[str]:
+        return [row[0] for row in self._conn().execute("SELECT trip_id FROM trips ORDER BY created_at")]
+
+
+SQLITE_DB_NAME = "trips.db"
+
+
+def open_trip_store(backend: str, trips_dir: str) -> TripStore:
+    """Backend factory: "json" (default, trips/<id>.json) or "sqlite" (trips/trips.db)."""
+    backend = (backend or "json").strip().lower()
+    if backend == "json":
+        return JsonTripStore(trips_dir)
+    if backend == "sqlite":
+        return SqliteTripStore(os.path.join(trips_dir, SQLITE_DB_NAME))
+    raise ValueError(f"Unknown trip store backend: {backend!r} (expected 'json' or 'sqlite')")
+
+
+def migrate_json_to_sqlite(trips_dir: str, db_path: Optional[str] = None) -> int:
+    """Import every trips/*.json file into the SQLite store. Re-running is safe (upserts)."""
+    source = JsonTripStore(trips_dir)
+    target = SqliteTripStore(db_path or os.path.join(trips_dir, SQLITE_DB_NAME))
+    imported = 0
+    for trip_id in source.trip_ids():
+        trip = source.load(trip_id)
+        if trip is None:
+            continue
+        target.save(trip_id, trip)
+        imported += 1
+    return imported
@@ -0,0 +1,102 @@
+"""
+Venue-name rules shared by the catalog and the planner: which keyword
+labels a venue name carries, and the booking hint shown for a venue.
+
+records.Venue applies them once per record when the catalog is built
+(name_labels, bachelorette_ok, booking_hint), so planning and rendering
+read precomputed fields instead of re-matching names on every call.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from keywords import KeywordMatcher
+
+
+# Venue-name keyword tables, all matched in one pass (see venue_name_labels).
+VENUE_NAME_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    # Concerts, WMPO, stadium/arena/ballpark-style events.
+    "ticketed_event": ("concert", "birds nest", "wm phoenix open", "stadium", "ballpark", "arena", "game"),
+    "wmpo": ("wm phoenix open",),
+    # Topgolf / PopStroke / Puttshack and similar golf-entertainment venues.
+    "golf_entertainment": ("topgolf", "popstroke", "puttshack"),
+    "golf_entertainment_or_putt": ("topgolf", "popstroke", "putt", "puttshack"),
+    "golf_or_putt": ("golf", "topgolf", "popstroke", "putt", "puttshack"),
+    # Golf and ballpark venues that don't fit a bachelorette activity slot.
+    "not_bachelorette": (
+        "golf", "baseball", "popstroke", "topgolf", "puttshack", "stadium", "sloan",
+        "salt river", "talking stick", "hohokam", "diablo", "dback", "octane",
+        "dbat", "taroko", "baseballism",
+    ),
+}
+VENUE_NAME_MATCHER = KeywordMatcher(VENUE_NAME_KEYWORDS)
+_NAME_LABELS: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+_NAME_LABELS_MAX = 4096
+_NAME_LABELS_LOCK = threading.Lock()
+
+
+def venue_name_labels(name: Any) -> FrozenSet[str]:
+    """
+    VENUE_NAME_KEYWORDS labels found in a name. Catalog venues carry theirs
+    (Venue.name_labels); other names go through a small LRU memo.
+    """
+    key = str(name or "")
+    with _NAME_LABELS_LOCK:
+        labels = _NAME_LABELS.get(key)
+        if labels is not None:
+            _NAME_LABELS.move_to_end(key)
+            return labels
+    labels = VENUE_NAME_MATCHER.labels(key)
+    with _NAME_LABELS_LOCK:
+        _NAME_LABELS[key] = labels
+        while len(_NAME_LABELS) > _NAME_LABELS_MAX:
+            _NAME_LABELS.popitem(last=False)
+    return labels
+
+
+def category_reservation_providers(category: str, provider_name: str = "", name_labels: Optional[FrozenSet[str]] = None) -> str:
+    """
+    Human-friendly hint for how bookings are handled.
+    
+    PlayBook handles all bookings via APIs (OpenTable, Resy, Ticketmaster, etc.),
+    so these messages indicate what PlayBook will book, not what the user needs to do.
+    """
+    category = (category or "").lower()
+    if name_labels is None:
+        name_labels = venue_name_labels(provider_name)
+
+    # Concerts, WMPO, stadium/arena/ballpark-style events -> tickets via PlayBook.
+    if "ticketed_event" in name_labels:
+        return "PlayBook will book tickets via Ticketmaster or event site"
+
+    # Golf-specific booking via PlayBook.
+    if category == "golf":
+        return "PlayBook will book tee times via GolfNow"
+
+    # Ball games that are categorized as baseball.
+    if category == "baseball":
+        return "PlayBook will book tickets via MLB or Ticketmaster"
+
+    # Topgolf / PopStroke / Puttshack and similar golf-entertainment venues.
+    if "golf_entertainment" in name_labels:
+        return "PlayBook will handle reservations"
+
+    # Dining / brunch / nightlife (restaurants, bars, clubs).
+    if category in {"dining", "brunch", "nightlife"}:
+        return "PlayBook will book via OpenTable, Resy, or venue"
+
+    if category == "activity":
+        return "PlayBook will handle booking"
+    if category == "spa":
+        return "PlayBook will book via resort or spa site"
+    if category == "pool":
+        return "PlayBook will book resort or daybed reservation"
+    if category == "shopping":
+        return "PlayBook will coordinate shopping stops"
+    if category == "transport":
+        pretty_name = provider_name.strip() if provider_name else ""
+        if pretty_name:
+            return f"PlayBook will arrange {pretty_name}"
+        return "PlayBook will arrange transportation"
+    return ""